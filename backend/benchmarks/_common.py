@@ -0,0 +1,79 @@
+import json
+import os
+import statistics
+import sys
+import time
+
+# 벤치마크 스크립트에서 src 아래의 app 패키지를 import할 수 있도록 경로를 추가합니다.
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+# 가상 클라이언트 몇 명이 많은 요청을 보내므로 요청 횟수 제한은 끕니다. (app이 import되기 전에 정해야 함)
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+
+# Redis 서버 없이 실행할 때 app의 Redis 클라이언트를 fakeredis로 바꿔 끼웁니다.
+# app 모듈들은 import 시점에 클라이언트를 가져가므로, 반드시 app의 다른 모듈을 import하기 전에 호출해야 합니다.
+def use_fake_redis():
+    import fakeredis
+
+    from app.core import redis_config
+
+    server = fakeredis.FakeServer()
+    redis_config.redis_client = fakeredis.FakeRedis(server=server, decode_responses=True)
+    redis_config.async_redis_client = fakeredis.FakeAsyncRedis(
+        server=server, decode_responses=True
+    )
+
+
+# 측정값(초) 목록을 받아서 p50/p95/p99(마이크로초)와 처리량을 계산합니다.
+def summarize(samples, elapsed=None):
+    ordered = sorted(samples)
+
+    def percentile(p):
+        index = min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))
+        return ordered[index] * 1_000_000
+
+    result = {
+        "count": len(ordered),
+        "mean_us": statistics.fmean(ordered) * 1_000_000,
+        "p50_us": percentile(50),
+        "p95_us": percentile(95),
+        "p99_us": percentile(99),
+    }
+    if elapsed:
+        result["ops_per_sec"] = len(ordered) / elapsed
+    return result
+
+
+# 비동기 함수를 iterations번 실행하면서 호출마다 걸린 시간을 잽니다.
+async def measure_async(func, iterations):
+    samples = []
+    started = time.perf_counter()
+    for i in range(iterations):
+        t0 = time.perf_counter()
+        await func(i)
+        samples.append(time.perf_counter() - t0)
+    return summarize(samples, time.perf_counter() - started)
+
+
+def measure(func, iterations):
+    samples = []
+    started = time.perf_counter()
+    for i in range(iterations):
+        t0 = time.perf_counter()
+        func(i)
+        samples.append(time.perf_counter() - t0)
+    return summarize(samples, time.perf_counter() - started)
+
+
+# 결과를 JSON으로 출력합니다. --output 경로가 있으면 파일로도 저장해서 실행 간에 비교할 수 있게 합니다.
+def emit(name, results, output=None):
+    report = {"benchmark": name, "python": sys.version.split()[0], "results": results}
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    print(text)
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    return report
@@ -0,0 +1,68 @@
+"""
+블랙리스트 확인(get_current_user의 인증 경로) 지연시간 벤치마크
+
+블룸 필터를 켰을 때와 껐을 때 블랙리스트에 없는 토큰을 확인하는 데 걸리는 시간(p50/p95/p99)을 비교합니다.
+
+    # 로컬 Redis(REDIS_HOST/REDIS_PORT)에 대해 실행
+    python benchmarks/bench_blacklist.py
+    # Redis 없이 fakeredis로 실행
+    python benchmarks/bench_blacklist.py --fake
+"""
+import argparse
+import asyncio
+
+import _common
+
+
+async def run(args):
+    from app.core.redis_config import async_redis_client
+    from app.services.token_service import TOKEN_BLACKLIST_PREFIX, TokenService, blacklist_filter
+    from app.utils.auth import create_access_token, verify_token
+
+    # 이미 로그아웃된 토큰 args.revoked개를 블랙리스트에 넣어둡니다.
+    async with async_redis_client.pipeline() as pipe:
+        for i in range(args.revoked):
+            pipe.set(f"{TOKEN_BLACKLIST_PREFIX}bench-revoked-{i}", "1", ex=600)
+        await pipe.execute()
+
+    tokens = [
+        create_access_token({"username": f"user{i}", "user_id": i})
+        for i in range(args.tokens)
+    ]
+
+    async def check(i):
+        token = tokens[i % len(tokens)]
+        await TokenService.is_token_blacklisted_async(token)
+        verify_token(token)
+
+    results = {}
+
+    blacklist_filter.enabled = False
+    results["without_filter"] = await _common.measure_async(check, args.iterations)
+
+    blacklist_filter.enabled = True
+    await blacklist_filter.rebuild()
+    results["with_filter"] = await _common.measure_async(check, args.iterations)
+    results["filter"] = blacklist_filter.stats()
+
+    async with async_redis_client.pipeline() as pipe:
+        for i in range(args.revoked):
+            pipe.delete(f"{TOKEN_BLACKLIST_PREFIX}bench-revoked-{i}")
+        await pipe.execute()
+
+    _common.emit("blacklist_check", results, args.output)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fake", action="store_true", help="Redis 대신 fakeredis 사용")
+    parser.add_argument("--iterations", type=int, default=5000)
+    parser.add_argument("--tokens", type=int, default=500, help="확인할 서로 다른 토큰 수")
+    parser.add_argument("--revoked", type=int, default=10000, help="미리 넣어둘 블랙리스트 토큰 수")
+    parser.add_argument("--output", help="결과 JSON을 저장할 파일 경로")
+    args = parser.parse_args()
+
+    if args.fake:
+        _common.use_fake_redis()
+
+    asyncio.run(run(args))
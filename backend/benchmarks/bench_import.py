@@ -0,0 +1,102 @@
+"""
+import 시간 측정 (콜드 스타트)
+
+새 파이썬 프로세스에서 `python -X importtime`으로 모듈을 import해서 걸린 시간을 잽니다.
+워커 프로세스가 새로 뜰 때(재시작, 오토스케일링) 요청을 받기 전까지 기다리는 시간의 대부분이 여기서 나옵니다.
+- main: app 전체 (라우터, 서비스, DB/Redis 설정)
+- hash_worker: bcrypt 프로세스 풀의 자식 프로세스가 import하는 모듈 (app.utils.password)
+
+가장 오래 걸린 최상위 패키지와 app 모듈도 함께 출력합니다.
+main의 중간값이 --budget-ms를 넘으면 종료 코드 1로 끝나므로 CI에서 import 시간 예산 검사로 쓸 수 있습니다.
+
+    python benchmarks/bench_import.py
+    python benchmarks/bench_import.py --runs 10 --budget-ms 1500 --output import.json
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+from collections import defaultdict
+
+import _common
+
+TARGETS = {
+    "main": "main",
+    "hash_worker": "app.utils.password",
+}
+
+
+# -X importtime 출력 한 줄: "import time:      self [us] |   cumulative | name" (마이크로초)
+def parse_importtime(stderr):
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def import_once(module, work_dir):
+    env = dict(os.environ, PYTHONPATH=_common.SRC_DIR)
+    # 임시 폴더에서 실행해서 SQLite 파일 등이 src에 생기지 않게 합니다.
+    env.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{os.path.join(work_dir, 'bench_import.db')}")
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=work_dir, env=env, capture_output=True, text=True, check=True,
+    )
+    rows = parse_importtime(completed.stderr)
+    # 인터프리터 시작 때 import하는 site까지는 대상 모듈과 관계없으므로 뺍니다.
+    names = [name for name, *_ in rows]
+    return rows[names.index("site") + 1:] if "site" in names else rows
+
+
+def top(rows, predicate, key, count):
+    totals = defaultdict(int)
+    for name, self_us, cumulative_us in rows:
+        if predicate(name):
+            totals[name] = max(totals[name], self_us if key == "self" else cumulative_us)
+    ranked = sorted(totals.items(), key=lambda item: item[1], reverse=True)[:count]
+    return {name: round(us / 1000, 2) for name, us in ranked}
+
+
+def run(args):
+    results = {}
+    with tempfile.TemporaryDirectory() as work_dir:
+        for name, module in TARGETS.items():
+            samples = []
+            rows = []
+            # 첫 실행은 .pyc를 만드는 시간이 섞이므로 버립니다.
+            import_once(module, work_dir)
+            for _ in range(args.runs):
+                rows = import_once(module, work_dir)
+                total_us = next(cumulative for mod, _, cumulative in rows if mod == module)
+                samples.append(total_us / 1_000_000)
+            results[name] = _common.summarize(samples)
+
+            if name == "main":
+                # 마지막 실행 기준: 최상위 패키지별 누적 시간 / app 모듈별 자체 시간(ms)
+                results["main_top_packages_ms"] = top(
+                    rows, lambda mod: "." not in mod and mod != module, "cumulative", args.top
+                )
+                results["main_top_app_modules_ms"] = top(
+                    rows, lambda mod: mod.split(".")[0] in ("app", "schemas", "migrate"), "self", args.top
+                )
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="모듈마다 import를 반복할 횟수")
+    parser.add_argument("--budget-ms", type=float, default=1500.0, help="main import 시간(중간값) 예산")
+    parser.add_argument("--top", type=int, default=10, help="출력할 느린 패키지/모듈 수")
+    parser.add_argument("--output", help="결과 JSON을 저장할 파일 경로")
+    args = parser.parse_args()
+
+    results = run(args)
+    _common.emit("import_time", results, args.output)
+
+    median_ms = results["main"]["p50_us"] / 1000
+    if median_ms > args.budget_ms:
+        sys.exit(f"main import 시간 {median_ms:.0f}ms가 예산 {args.budget_ms:.0f}ms를 넘었습니다.")
@@ -0,0 +1,169 @@
+"""
+ASGI 부하 시나리오 벤치마크
+
+서버를 띄우지 않고 httpx의 ASGITransport로 app에 직접 요청을 보내서, 미들웨어/의존성/서비스/DB/Redis를 모두 거친
+요청 단위의 처리량(ops_per_sec)과 지연시간(p50/p95/p99)을 잽니다. 요청 종류별로도 따로 집계합니다.
+
+시나리오
+- read_heavy: 게시판 읽기 위주. 목록(다음 페이지 포함)과 게시글 조회가 대부분이고 가끔 글을 씁니다.
+- login_storm: 여러 사용자가 동시에 로그인 (bcrypt 검증 + 토큰 발급 + refresh 토큰 저장)
+- write_burst: 여러 사용자가 동시에 글을 씀 (get_current_user + 쓰기 큐 + 캐시/알림)
+
+임시 폴더에 SQLite DB를 새로 만들고 --users명, --posts개를 넣은 뒤 실행합니다. (--seed가 같으면 같은 데이터, 같은 요청 순서)
+Redis는 --fake로 fakeredis를 쓸 수 있습니다.
+
+    python benchmarks/bench_load.py --fake
+    python benchmarks/bench_load.py --fake --scenarios read_heavy write_burst --concurrency 100 --output load.json
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+from collections import defaultdict
+
+import _common
+from bench_micro import PASSWORD, seed
+
+
+class Recorder:
+    def __init__(self, client):
+        self.client = client
+        self.samples = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    async def request(self, name, method, url, expected=(200,), **kwargs):
+        t0 = time.perf_counter()
+        response = await self.client.request(method, url, **kwargs)
+        self.samples[name].append(time.perf_counter() - t0)
+        if response.status_code not in expected:
+            self.errors[name] += 1
+        return response
+
+    def summary(self, elapsed):
+        every = [sample for samples in self.samples.values() for sample in samples]
+        result = {"total": _common.summarize(every, elapsed)}
+        for name, samples in sorted(self.samples.items()):
+            result[name] = _common.summarize(samples)
+            result[name]["errors"] = self.errors[name]
+        result["total"]["errors"] = sum(self.errors.values())
+        return result
+
+
+async def login(client, n):
+    response = await client.post(
+        "/login", json={"email": f"user{n}@bench.com", "password": PASSWORD}
+    )
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def read_heavy(args, client, rng):
+    recorder = Recorder(client)
+    headers = [await login(client, n % args.users) for n in range(args.concurrency)]
+    plans = [[rng.random() for _ in range(args.requests)] for _ in range(args.concurrency)]
+    post_ids = [[rng.randint(1, args.posts) for _ in range(args.requests)] for _ in range(args.concurrency)]
+
+    async def virtual_client(n):
+        cursor = None
+        for i, roll in enumerate(plans[n]):
+            if roll < 0.55:
+                params = {"limit": 20}
+                if cursor:
+                    params["cursor"] = cursor
+                response = await recorder.request("list", "GET", "/posts/posts/", params=params)
+                # 가끔 첫 페이지로 돌아가고, 아니면 다음 페이지를 이어서 읽습니다.
+                cursor = response.json().get("next_cursor") if roll < 0.4 else None
+            elif roll < 0.95:
+                await recorder.request(
+                    "detail", "GET", f"/posts/posts/{post_ids[n][i]}", expected=(200, 404)
+                )
+            else:
+                await recorder.request(
+                    "create", "POST", "/posts/create",
+                    json={"title": f"c{n}-{i}", "content": "bench"}, headers=headers[n],
+                )
+
+    started = time.perf_counter()
+    await asyncio.gather(*(virtual_client(n) for n in range(args.concurrency)))
+    return recorder.summary(time.perf_counter() - started)
+
+
+async def login_storm(args, client, rng):
+    recorder = Recorder(client)
+    users = [[rng.randrange(args.users) for _ in range(args.logins)] for _ in range(args.concurrency)]
+
+    async def virtual_client(n):
+        for user in users[n]:
+            await recorder.request(
+                "login", "POST", "/login",
+                json={"email": f"user{user}@bench.com", "password": PASSWORD},
+            )
+
+    started = time.perf_counter()
+    await asyncio.gather(*(virtual_client(n) for n in range(args.concurrency)))
+    return recorder.summary(time.perf_counter() - started)
+
+
+async def write_burst(args, client, rng):
+    recorder = Recorder(client)
+    headers = [await login(client, n % args.users) for n in range(args.concurrency)]
+
+    async def virtual_client(n):
+        for i in range(args.requests):
+            await recorder.request(
+                "create", "POST", "/posts/create",
+                json={"title": f"w{n}-{i}", "content": "본문 " * 20}, headers=headers[n],
+            )
+
+    started = time.perf_counter()
+    await asyncio.gather(*(virtual_client(n) for n in range(args.concurrency)))
+    return recorder.summary(time.perf_counter() - started)
+
+
+SCENARIOS = {
+    "read_heavy": read_heavy,
+    "login_storm": login_storm,
+    "write_burst": write_burst,
+}
+
+
+async def run(args):
+    import httpx
+
+    from main import app, lifespan
+
+    await seed(args)
+    results = {}
+
+    async with lifespan(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for name in args.scenarios:
+                # 시나리오마다 같은 시드에서 시작해서 다른 시나리오를 빼거나 더해도 요청 순서가 같게 합니다.
+                rng = random.Random(f"{args.seed}-{name}")
+                results[name] = await SCENARIOS[name](args, client, rng)
+
+    _common.emit("asgi_load", results, args.output)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fake", action="store_true", help="Redis 대신 fakeredis 사용")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--concurrency", type=int, default=50, help="동시에 요청하는 가상 클라이언트 수")
+    parser.add_argument("--requests", type=int, default=40, help="read_heavy/write_burst에서 가상 클라이언트 하나가 보내는 요청 수")
+    parser.add_argument("--logins", type=int, default=2, help="login_storm에서 가상 클라이언트 하나가 로그인하는 횟수")
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--posts", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="결과 JSON을 저장할 파일 경로")
+    args = parser.parse_args()
+
+    if args.fake:
+        _common.use_fake_redis()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        # app.database가 import되기 전에 DB 경로를 정해야 합니다.
+        os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(work_dir, 'bench_load.db')}"
+        asyncio.run(run(args))
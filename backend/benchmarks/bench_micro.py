@@ -0,0 +1,185 @@
+"""
+인증/조회 핫패스 마이크로 벤치마크
+
+요청 하나를 처리할 때 반복해서 실행되는 함수들을 하나씩 떼어서 호출마다 걸린 시간(p50/p95/p99)을 잽니다.
+- jwt_encode: access 토큰 발급 (create_access_token)
+- jwt_decode: 캐시 없이 서명 검증 + 디코딩 (jose.jwt.decode) / 캐시를 거친 검증 (verify_token)
+- password_verify: bcrypt 검증. 현재 프로세스에서 직접 실행 / 프로세스 풀(password_hasher)로 동시에 실행
+- get_current_user: 사용자 캐시에 있을 때 / 없을 때 (DB 조회)
+- get_posts: 첫 페이지 / 깊은 커서 위치의 페이지 (PostService.get_posts)
+- serialize: ORM 객체 하나를 응답 JSON으로 (PostResponse 검증 경로 vs orjson)
+
+임시 폴더에 SQLite DB를 새로 만들고 --users명, --posts개를 넣은 뒤 실행합니다. (--seed가 같으면 같은 데이터)
+Redis는 --fake로 fakeredis를 쓸 수 있습니다.
+
+    python benchmarks/bench_micro.py --fake
+    python benchmarks/bench_micro.py --fake --output micro.json
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+
+import _common
+
+PASSWORD = "password1"
+
+
+async def seed(args):
+    from sqlalchemy import insert
+
+    from app.database import engine
+    from app.models.post import Post
+    from app.models.user import User
+    from app.utils.security import get_password_hash
+    from migrate import init_db
+
+    await init_db()
+    rng = random.Random(args.seed)
+    # bcrypt 해싱은 느리므로 한 번만 만들어서 모든 사용자가 같이 씁니다.
+    hashed = get_password_hash(PASSWORD)
+
+    async with engine.begin() as conn:
+        await conn.execute(
+            insert(User),
+            [
+                {"email": f"user{i}@bench.com", "username": f"user{i}", "password": hashed}
+                for i in range(args.users)
+            ],
+        )
+        for start in range(0, args.posts, 5000):
+            await conn.execute(
+                insert(Post),
+                [
+                    {
+                        "title": f"게시글 {i}",
+                        "content": "본문 " * rng.randint(10, 60),
+                        "author_id": rng.randint(1, args.users),
+                    }
+                    for i in range(start, min(args.posts, start + 5000))
+                ],
+            )
+    return hashed
+
+
+async def run(args):
+    import orjson
+    from fastapi.security import HTTPAuthorizationCredentials
+    from jose import jwt
+    from sqlalchemy import select
+
+    from app.database import SessionLocal, engine
+    from app.dependencies.auth import get_current_user
+    from app.models.post import Post
+    from app.services.post_service import PostService
+    from app.services.user_service import user_cache
+    from app.utils.auth import ALGORITHM, SECRET_KEY, create_access_token, verify_token
+    from app.utils.security import password_hasher, verify_password
+    from schemas.post import PostResponse
+
+    hashed = await seed(args)
+    results = {}
+
+    # JWT
+    tokens = [
+        create_access_token({"username": f"user{i}", "user_id": i + 1}) for i in range(args.users)
+    ]
+    results["jwt_encode"] = _common.measure(
+        lambda i: create_access_token({"username": f"user{i % args.users}", "user_id": i}),
+        args.iterations,
+    )
+    results["jwt_decode"] = _common.measure(
+        lambda i: jwt.decode(tokens[i % len(tokens)], SECRET_KEY, algorithms=[ALGORITHM]),
+        args.iterations,
+    )
+    results["jwt_verify_cached"] = _common.measure(
+        lambda i: verify_token(tokens[i % len(tokens)]), args.iterations
+    )
+
+    # bcrypt
+    results["password_verify"] = _common.measure(
+        lambda i: verify_password(PASSWORD, hashed), args.hash_iterations
+    )
+
+    async def verify_concurrently(_):
+        await asyncio.gather(
+            *(password_hasher.verify(PASSWORD, hashed) for _ in range(args.hash_concurrency))
+        )
+
+    # 프로세스 풀을 먼저 띄워둬서 첫 측정에 프로세스 시작 시간이 섞이지 않게 합니다.
+    await password_hasher.verify(PASSWORD, hashed)
+    pooled = await _common.measure_async(verify_concurrently, args.hash_iterations)
+    pooled["verifies_per_sec"] = pooled["ops_per_sec"] * args.hash_concurrency
+    results["password_verify_pool"] = pooled
+    password_hasher.shutdown()
+
+    async with SessionLocal() as db:
+        # get_current_user
+        async def current_user(i):
+            credentials = HTTPAuthorizationCredentials(
+                scheme="Bearer", credentials=tokens[i % len(tokens)]
+            )
+            await get_current_user(credentials, db)
+
+        results["get_current_user_cached"] = await _common.measure_async(current_user, args.iterations)
+
+        async def current_user_uncached(i):
+            user_cache.clear()
+            await current_user(i)
+
+        results["get_current_user_uncached"] = await _common.measure_async(
+            current_user_uncached, args.iterations
+        )
+
+        # get_posts
+        service = PostService(db)
+        posts, _ = await service.get_posts(limit=20)
+
+        # 목록 중간쯤의 커서를 만들어서 깊은 페이지 조회도 잽니다.
+        middle = (await db.execute(
+            select(Post.created_at, Post.id).order_by(Post.id).offset(args.posts // 2).limit(1)
+        )).one()
+
+        async def first_page(_):
+            await service.get_posts(limit=20)
+
+        async def deep_page(_):
+            await service.get_posts(cursor=(middle.created_at, middle.id), limit=20)
+
+        results["get_posts_first_page"] = await _common.measure_async(first_page, args.iterations)
+        results["get_posts_deep_page"] = await _common.measure_async(deep_page, args.iterations)
+
+        # 게시글 하나 직렬화
+        post = (await db.execute(select(Post).limit(1))).scalar_one()
+        row = posts[0]
+        results["serialize_pydantic"] = _common.measure(
+            lambda i: PostResponse.model_validate(post).model_dump_json(), args.iterations
+        )
+        results["serialize_orjson"] = _common.measure(
+            lambda i: orjson.dumps(row._asdict()), args.iterations
+        )
+
+    await engine.dispose()
+    _common.emit("micro", results, args.output)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fake", action="store_true", help="Redis 대신 fakeredis 사용")
+    parser.add_argument("--iterations", type=int, default=2000, help="가벼운 함수의 반복 횟수")
+    parser.add_argument("--hash-iterations", type=int, default=10, help="bcrypt 검증 반복 횟수")
+    parser.add_argument("--hash-concurrency", type=int, default=8, help="프로세스 풀로 동시에 보낼 bcrypt 검증 수")
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--posts", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="결과 JSON을 저장할 파일 경로")
+    args = parser.parse_args()
+
+    if args.fake:
+        _common.use_fake_redis()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        # app.database가 import되기 전에 DB 경로를 정해야 합니다.
+        os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(work_dir, 'bench_micro.db')}"
+        asyncio.run(run(args))
@@ -0,0 +1,94 @@
+"""
+게시글 검색 벤치마크 (FTS5 역색인 vs LIKE '%검색어%' 전체 조회)
+
+게시글 수(--sizes)를 늘려가면서 같은 검색어로 두 방식의 지연시간(p50/p95/p99)을 비교합니다.
+LIKE는 글이 늘어나는 만큼 느려지고, FTS5는 검색어가 들어있는 글 수에만 영향을 받는지 확인합니다.
+- hit: 일부 글(--match-rate)에만 들어있는 검색어
+- miss: 어떤 글에도 없는 검색어 (LIKE는 모든 글을 끝까지 훑어야 하는 최악의 경우)
+
+임시 폴더에 SQLite DB를 새로 만들어서 실행하므로 기존 sql_app.db는 건드리지 않습니다.
+
+    python benchmarks/bench_search.py
+    python benchmarks/bench_search.py --sizes 1000 10000 100000 --output search.json
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+
+import _common
+
+# 검색어 후보. 본문은 흔한 단어(COMMON_WORDS)로 채우고, 드문 단어(RARE_WORDS)는 일부 글에만 넣습니다.
+COMMON_WORDS = ["게시판", "안녕하세요", "오늘", "서버", "요청", "응답", "데이터", "사용자", "fastapi", "python"]
+RARE_WORDS = ["벤치마크", "색인", "redis", "sqlite"]
+MISSING_WORDS = ["없는단어", "nowhere"]
+
+
+def make_post(rng, author_id, match_rate):
+    words = rng.choices(COMMON_WORDS, k=30)
+    if rng.random() < match_rate:
+        words.insert(rng.randrange(len(words)), rng.choice(RARE_WORDS))
+    return {
+        "title": " ".join(rng.choices(COMMON_WORDS, k=4)),
+        "content": " ".join(words),
+        "author_id": author_id,
+    }
+
+
+async def run(args):
+    from sqlalchemy import insert
+
+    from app.database import SessionLocal, engine
+    from app.models.post import Post
+    from app.services.post_service import PostService
+    from migrate import init_db
+
+    await init_db()
+    rng = random.Random(args.seed)
+    results = {}
+    inserted = 0
+
+    for size in sorted(args.sizes):
+        # 이전 크기에서 모자란 만큼만 더 넣습니다.
+        async with engine.begin() as conn:
+            while inserted < size:
+                count = min(5000, size - inserted)
+                await conn.execute(insert(Post), [make_post(rng, 1, args.match_rate) for _ in range(count)])
+                inserted += count
+
+        async with SessionLocal() as db:
+            service = PostService(db)
+            results[str(size)] = {}
+
+            for case, words in (("hit", RARE_WORDS), ("miss", MISSING_WORDS)):
+                queries = [rng.choice(words) for _ in range(args.iterations)]
+
+                async def fts(i):
+                    await service.search_posts(queries[i], limit=20)
+
+                async def like(i):
+                    await service._search_posts_like(queries[i], limit=20, offset=0)
+
+                results[str(size)][case] = {
+                    "fts5": await _common.measure_async(fts, args.iterations),
+                    "like": await _common.measure_async(like, args.iterations),
+                }
+
+    await engine.dispose()
+    _common.emit("post_search", results, args.output)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000], help="측정할 게시글 수 목록")
+    parser.add_argument("--iterations", type=int, default=200, help="크기마다 검색을 반복할 횟수")
+    parser.add_argument("--match-rate", type=float, default=0.001, help="hit 검색어가 들어가는 글의 비율")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="결과 JSON을 저장할 파일 경로")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        # app.database가 import되기 전에 DB 경로를 정해야 합니다.
+        os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(work_dir, 'bench_search.db')}"
+        asyncio.run(run(args))
@@ -0,0 +1,90 @@
+"""
+목록 응답 직렬화 벤치마크 (response_model 검증 경로 vs Row + orjson 빠른 경로)
+
+게시글 --sizes개를 DB에서 읽어서 JSON 응답 본문(bytes)을 만들 때까지 걸리는 시간을 비교하고 초당 처리 행 수(rows/sec)를 계산합니다.
+
+- pydantic: 예전 방식. ORM 객체(select(Post))를 읽고, FastAPI의 response_model 처리처럼
+            PostPage로 검증(from_attributes) -> JSON 호환 값으로 변환 -> JSONResponse 본문 생성
+- orjson:   빠른 경로. 필요한 컬럼만 Row로 읽고(select(*POST_COLUMNS)) dict로 바꿔서 ORJSONResponse 본문 생성
+
+임시 폴더에 SQLite DB를 새로 만들어서 실행하므로 기존 sql_app.db는 건드리지 않습니다.
+
+    python benchmarks/bench_serialization.py
+    python benchmarks/bench_serialization.py --sizes 100 1000 10000 --output serialization.json
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+
+import _common
+
+
+async def run(args):
+    from fastapi.responses import JSONResponse, ORJSONResponse
+    from pydantic import TypeAdapter
+    from sqlalchemy import insert, select
+
+    from app.database import SessionLocal, engine
+    from app.models.post import Post
+    from app.services.post_service import POST_COLUMNS
+    from migrate import init_db
+    from schemas.post import PostPage
+
+    await init_db()
+    async with engine.begin() as conn:
+        rows = [
+            {"title": f"게시글 {i}", "content": "본문 " * 40, "author_id": 1}
+            for i in range(max(args.sizes))
+        ]
+        await conn.execute(insert(Post), rows)
+
+    page_adapter = TypeAdapter(PostPage)
+    results = {}
+
+    async with SessionLocal() as db:
+        for size in args.sizes:
+
+            async def pydantic_path(_):
+                result = await db.execute(select(Post).order_by(Post.id).limit(size))
+                posts = result.scalars().all()
+                page = page_adapter.validate_python(
+                    {"items": posts, "next_cursor": None}, from_attributes=True
+                )
+                JSONResponse(page_adapter.dump_python(page, mode="json")).body
+                # 다음 반복에서도 ORM 객체를 새로 만들도록 identity map을 비웁니다. (요청마다 새 세션인 실제 상황과 같게)
+                db.expunge_all()
+
+            async def orjson_path(_):
+                result = await db.execute(select(*POST_COLUMNS).order_by(Post.id).limit(size))
+                items = [row._asdict() for row in result.all()]
+                ORJSONResponse({"items": items, "next_cursor": None}).body
+
+            results[str(size)] = {}
+            for name, func in (("pydantic", pydantic_path), ("orjson", orjson_path)):
+                # 반복 횟수는 크기와 상관없이 비슷한 총 행 수를 처리하도록 맞춥니다.
+                iterations = max(5, args.rows // size)
+                summary = await _common.measure_async(func, iterations)
+                summary["rows_per_sec"] = summary["ops_per_sec"] * size
+                results[str(size)][name] = summary
+
+            results[str(size)]["speedup"] = (
+                results[str(size)]["orjson"]["rows_per_sec"]
+                / results[str(size)]["pydantic"]["rows_per_sec"]
+            )
+
+    await engine.dispose()
+    _common.emit("list_serialization", results, args.output)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000], help="한 응답에 담을 게시글 수 목록")
+    parser.add_argument("--rows", type=int, default=100000, help="크기마다 처리할 대략적인 총 행 수")
+    parser.add_argument("--output", help="결과 JSON을 저장할 파일 경로")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        # app.database가 import되기 전에 DB 경로를 정해야 합니다.
+        os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(work_dir, 'bench_serialization.db')}"
+        asyncio.run(run(args))
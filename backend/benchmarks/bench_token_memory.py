@@ -0,0 +1,100 @@
+"""
+세션 하나당 Redis 메모리 사용량 벤치마크 (토큰 전체를 키로 쓰던 방식 vs jti 방식)
+
+로그인 한 번(refresh 토큰 저장)과 로그아웃 한 번(access 토큰 블랙리스트 등록)을 한 세션으로 보고,
+--sessions개의 세션을 두 방식으로 각각 저장한 뒤 세션당 사용량을 비교합니다.
+
+- redis_memory_bytes: Redis의 MEMORY USAGE로 잰 실제 사용량 (실제 Redis에서만 측정, fakeredis는 null)
+- payload_bytes: 키와 값의 바이트 길이 합 (어디서나 측정 가능)
+
+    python benchmarks/bench_token_memory.py
+    python benchmarks/bench_token_memory.py --fake
+"""
+import argparse
+
+import _common
+
+
+def measure_scheme(client, keys_and_members):
+    payload = 0
+    memory = 0
+    memory_supported = True
+    for key, member in keys_and_members:
+        payload += len(key.encode()) + len(member.encode())
+
+    for key in {key for key, _ in keys_and_members}:
+        if not memory_supported:
+            break
+        try:
+            memory += client.memory_usage(key) or 0
+        except Exception:
+            memory_supported = False
+
+    return payload, (memory if memory_supported else None)
+
+
+def run(args):
+    from app.core.redis_config import redis_client
+    from app.services.token_service import (
+        LEGACY_TOKEN_BLACKLIST_PREFIX,
+        REFRESH_TOKEN_PREFIX,
+        TOKEN_BLACKLIST_PREFIX,
+        TokenService,
+    )
+    from app.utils.auth import create_access_token, create_refresh_token
+
+    data = {"username": "bench-user", "email": "bench@example.com", "user_id": 0}
+    sessions = []
+    for i in range(args.sessions):
+        data["user_id"] = 10_000_000 + i
+        sessions.append((data["user_id"], create_access_token(data), create_refresh_token(data)))
+
+    results = {}
+    for scheme in ("legacy_full_token", "jti"):
+        entries = []
+        with redis_client.pipeline() as pipe:
+            for user_id, access_token, refresh_token in sessions:
+                # 실제 사용자 키와 겹치지 않도록 :bench 를 붙이고, 측정이 끝나면 지웁니다.
+                refresh_key = f"{REFRESH_TOKEN_PREFIX}{user_id}:bench"
+                if scheme == "jti":
+                    blacklist_key = f"{TOKEN_BLACKLIST_PREFIX}{TokenService.get_token_id(access_token)}"
+                    member = TokenService.get_token_id(refresh_token)
+                else:
+                    blacklist_key = f"{LEGACY_TOKEN_BLACKLIST_PREFIX}{access_token}"
+                    member = refresh_token
+                pipe.set(blacklist_key, "1", ex=600)
+                pipe.sadd(refresh_key, member)
+                pipe.expire(refresh_key, 600)
+                entries.append((blacklist_key, "1"))
+                entries.append((refresh_key, member))
+            pipe.execute()
+
+        payload, memory = measure_scheme(redis_client, entries)
+        results[scheme] = {
+            "sessions": len(sessions),
+            "payload_bytes_per_session": payload / len(sessions),
+            "redis_memory_bytes_per_session": memory / len(sessions) if memory is not None else None,
+        }
+
+        with redis_client.pipeline() as pipe:
+            for key, _ in entries:
+                pipe.delete(key)
+            pipe.execute()
+
+    legacy = results["legacy_full_token"]["payload_bytes_per_session"]
+    results["payload_reduction_ratio"] = 1 - results["jti"]["payload_bytes_per_session"] / legacy
+
+    _common.emit("token_memory", results, args.output)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fake", action="store_true", help="Redis 대신 fakeredis 사용")
+    parser.add_argument("--sessions", type=int, default=1000)
+    parser.add_argument("--output", help="결과 JSON을 저장할 파일 경로")
+    args = parser.parse_args()
+
+    if args.fake:
+        _common.use_fake_redis()
+
+    run(args)
@@ -0,0 +1,75 @@
+"""
+벤치마크 결과 비교
+
+두 실행의 결과 JSON(--output으로 저장한 파일)을 읽어서 같은 항목끼리 p50/p95/p99와 처리량을 비교합니다.
+지연시간이 --threshold(%)보다 늘었거나 처리량이 그만큼 줄어든 항목은 REGRESSION으로 표시하고,
+하나라도 있으면 종료 코드 1로 끝나므로 CI에서 회귀 검사로 쓸 수 있습니다.
+
+    python benchmarks/compare.py base.json new.json
+    python benchmarks/compare.py base.json new.json --threshold 20
+"""
+import argparse
+import json
+import sys
+
+LATENCY_KEYS = ("p50_us", "p95_us", "p99_us")
+THROUGHPUT_KEYS = ("ops_per_sec",)
+
+
+# {"a": {"b": {"p50_us": ...}}} -> {"a.b": {"p50_us": ...}} (지연시간 요약이 들어있는 항목만)
+def flatten(results, prefix=""):
+    items = {}
+    for key, value in results.items():
+        if not isinstance(value, dict):
+            continue
+        path = f"{prefix}{key}"
+        if any(name in value for name in LATENCY_KEYS):
+            items[path] = value
+        else:
+            items.update(flatten(value, path + "."))
+    return items
+
+
+def compare(base, new, threshold):
+    base_items = flatten(base["results"])
+    new_items = flatten(new["results"])
+    rows = []
+    regressions = 0
+
+    for path in sorted(base_items.keys() & new_items.keys()):
+        for key in LATENCY_KEYS + THROUGHPUT_KEYS:
+            before = base_items[path].get(key)
+            after = new_items[path].get(key)
+            if not before or after is None:
+                continue
+
+            change = (after - before) / before * 100
+            # 지연시간은 늘어나면, 처리량은 줄어들면 나빠진 것입니다.
+            worse = change if key in LATENCY_KEYS else -change
+            flag = "REGRESSION" if worse > threshold else ""
+            regressions += bool(flag)
+            rows.append((path, key, before, after, change, flag))
+
+    return rows, regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("base", help="기준 결과 JSON")
+    parser.add_argument("new", help="비교할 결과 JSON")
+    parser.add_argument("--threshold", type=float, default=10.0, help="회귀로 볼 변화율(%%)")
+    args = parser.parse_args()
+
+    with open(args.base, encoding="utf-8") as f:
+        base = json.load(f)
+    with open(args.new, encoding="utf-8") as f:
+        new = json.load(f)
+
+    if base.get("benchmark") != new.get("benchmark"):
+        sys.exit(f"서로 다른 벤치마크입니다: {base.get('benchmark')} / {new.get('benchmark')}")
+
+    rows, regressions = compare(base, new, args.threshold)
+    for path, key, before, after, change, flag in rows:
+        print(f"{path:<40} {key:<12} {before:>14.1f} {after:>14.1f} {change:>+8.1f}% {flag}")
+
+    sys.exit(1 if regressions else 0)
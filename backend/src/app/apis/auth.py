@@ -2,6 +2,8 @@
 from fastapi import APIRouter, Depends, HTTPException,Request
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 
+from app.core.templates import get_templates
+from app.dependencies.rate_limit import LOGIN_RATE_LIMIT, RATE_LIMIT_RESPONSE, rate_limit
 from app.services.auth_service import AuthService, get_auth_service
 
 from app.services.token_service import TokenService
@@ -11,9 +13,6 @@ from schemas.auth import LoginRequest, RefreshRequest, TokenResponse
 
 
 from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
-
-import os
 
 
 router = APIRouter()
@@ -34,9 +33,6 @@ bearer_scheme = HTTPBearer()
 
 
 
-# 현재 파일(auth.py)의 위치를 기준으로 프로젝트 루트(src) 경로를 계산합니다.
-BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-templates = Jinja2Templates(directory=os.path.join(BASE_DIR, "templates"))
 
 #response_class=HTMLResponse->서버가 브라우저에게 보내는 결과물의 형식을 HTML로 지정
 #request: Request->클라이언트(브라우저)가 서버에 보낸 모든 정보가 담긴 가방이라고 생각하시면 됩니다. 기능: 접속한 사람의 IP 주소, 쿠키, 헤더 정보, 브라우저 종류 등의 데이터를 담고 있습니다.
@@ -44,7 +40,7 @@ templates = Jinja2Templates(directory=os.path.join(BASE_DIR, "templates"))
 @router.get("/login", response_class=HTMLResponse)
 async def get_login_page(request: Request):
     # templates 디렉토리 안의 login.html을 읽어서 반환합니다.
-    return templates.TemplateResponse("login.html", {"request": request})
+    return get_templates().TemplateResponse("login.html", {"request": request})
 
 
 
@@ -54,7 +50,9 @@ async def get_login_page(request: Request):
     response_model=TokenResponse,
     summary="로그인",
     description="사용자 로그인 후 JWT토큰을 발급합니다.",
+    dependencies=[Depends(rate_limit(LOGIN_RATE_LIMIT))],
     responses={
+        **RATE_LIMIT_RESPONSE,
         401: {
             "description": "인증실패",
             "content": {
@@ -64,10 +62,20 @@ async def get_login_page(request: Request):
                     }
                 }
             },
-        }
+        },
+        503: {
+            "description": "비밀번호 해싱 대기열이 가득 참",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "detail": "요청이 많아 잠시 후 다시 시도해주세요.",
+                    }
+                }
+            },
+        },
     },
 )
-def login(
+async def login(
     login_data: LoginRequest, auth_service: AuthService = Depends(get_auth_service)
 ):
     
@@ -75,14 +83,14 @@ def login(
     print(f"로그인 시도 이메일: {login_data.email}")
     print(f"로그인 시도 비밀번호: {login_data.password}")
     
-    user = auth_service.authenticate_user(login_data)
+    user = await auth_service.authenticate_user(login_data)
 
     if not user:
         raise HTTPException(
             status_code=401, detail="인증실패", headers={"WWW-Authenticate": "Bearer"}
         )
 
-    token_data = auth_service.create_user_token(user)
+    token_data = await auth_service.create_user_token(user)
     print(token_data)
     return token_data
 
@@ -103,7 +111,7 @@ def login(
             }
         }
 )
-def logout(
+async def logout(
     credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
     ):
     # 헤더에서 토큰 추출
@@ -113,7 +121,7 @@ def logout(
     token_expiry = get_token_expiry(token)
     
     # 토큰을 블랙리스트에 추가
-    TokenService.blacklist_token(token, token_expiry)
+    await TokenService.blacklist_token_async(token, token_expiry)
     
     return {"message": "로그아웃되었습니다."}
 
@@ -123,11 +131,11 @@ def logout(
         response_model=TokenResponse,
         
 )
-def refresh_token(
+async def refresh_token(
     refresh_data: RefreshRequest, auth_service: AuthService=Depends(get_auth_service),
     ):
 
-    token = auth_service.refresh_access_token(refresh_data.refresh_token)
+    token = await auth_service.refresh_access_token(refresh_data.refresh_token)
     
     if not token:
         raise HTTPException(
@@ -141,14 +149,14 @@ def refresh_token(
 @router.post(
         "/logout-all",
 )
-def logout_all_sessions(
+async def logout_all_sessions(
     credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
     ):
     token = credentials.credentials
     token_expiry=get_token_expiry(token)
-    TokenService.blacklist_token(token,token_expiry)
+    await TokenService.blacklist_token_async(token, token_expiry)
     
     user_id= verify_token(token).get("user_id")
-    TokenService.revoke_refresh_token(user_id)
+    await TokenService.revoke_refresh_token_async(user_id)
     
     return{"message": "모든 기기로부터 로그아웃"}
\ No newline at end of file
@@ -1,31 +1,65 @@
-from typing import List
-from fastapi import Depends, APIRouter, HTTPException, Request
-from fastapi.responses import HTMLResponse
+from datetime import datetime, timezone
+from typing import List, Literal, Optional, Union
+import orjson
+from fastapi import Depends, APIRouter, Header, HTTPException, Query, Request
+from fastapi.responses import HTMLResponse, Response, StreamingResponse
 
+from app.core.templates import get_templates
 from app.dependencies.auth import get_current_user
+from app.dependencies.rate_limit import (
+    POST_BULK_RATE_LIMIT,
+    POST_WRITE_RATE_LIMIT,
+    RATE_LIMIT_RESPONSE,
+    rate_limit,
+)
 from app.models.user import User
-from app.services.post_service import PostService, get_post_service
-from schemas.post import PostCreate, PostResponse, PostUpdate
-
-
-
-from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
+from app.services.post_events import parse_event_id, post_events
+from app.services.post_service import (
+    POST_BULK_MAX_SIZE,
+    PostService,
+    export_posts,
+    get_post_service,
+)
+from app.utils.etag import (
+    etag_headers,
+    etag_matches,
+    make_etag,
+    not_modified,
+    parse_if_match_versions,
+    post_etag,
+)
+from app.utils.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    build_page,
+    decode_change_cursor,
+    decode_cursor,
+    encode_change_cursor,
+    encode_cursor,
+    list_response,
+    page_response,
+)
+from schemas.post import (
+    PostBulkResponse,
+    PostChangesPage,
+    PostCreate,
+    PostPage,
+    PostResponse,
+    PostSearchPage,
+    PostUpdate,
+)
 
-import os
 
 
 router = APIRouter()
 
 
-BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-templates = Jinja2Templates(directory=os.path.join(BASE_DIR, "templates"))
 
 
 @router.get("/create", response_class=HTMLResponse)
 async def get_posts_view_page(request: Request):
     # templates 디렉토리 안의 login.html을 읽어서 반환합니다.
-    return templates.TemplateResponse("posts_create.html", {"request": request})
+    return get_templates().TemplateResponse("posts_create.html", {"request": request})
 
 
 
@@ -37,33 +71,83 @@ async def get_posts_view_page(request: Request):
     response_model=PostResponse,
     summary="새 게시글",
     description="새로운 게시글을 생성합니다.",
+    dependencies=[Depends(rate_limit(POST_WRITE_RATE_LIMIT))],
+    responses=RATE_LIMIT_RESPONSE,
 )
-def create_post(
+async def create_post(
     post: PostCreate,
     post_service: PostService = Depends(get_post_service),
     current_user: User = Depends(get_current_user),
 ):
-    created_post = post_service.create_post(post, current_user)
+    created_post = await post_service.create_post(post, current_user)
 
     return created_post
 
 
+# 게시글 일괄 등록
+# 게시글 목록을 한 번에 받아서 하나의 트랜잭션으로 저장합니다. (대량 이관/가져오기 용도)
+# 각 게시글은 PostCreate 형식으로 검증되며, 하나라도 형식이 틀리면 아무것도 저장되지 않습니다.
+@router.post(
+    "/bulk",
+    response_model=PostBulkResponse,
+    summary="게시글 일괄 등록",
+    description=f"여러 게시글을 한 번에 등록합니다. 한 번에 최대 {POST_BULK_MAX_SIZE}개까지 등록할 수 있습니다.",
+    dependencies=[Depends(rate_limit(POST_BULK_RATE_LIMIT))],
+    responses={
+        **RATE_LIMIT_RESPONSE,
+        413: {
+            "description": "한 번에 등록할 수 있는 게시글 수 초과",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "detail": f"한 번에 최대 {POST_BULK_MAX_SIZE}개까지 등록할 수 있습니다.",
+                    }
+                }
+            },
+        },
+    },
+)
+async def create_posts_bulk(
+    posts: List[PostCreate],
+    post_service: PostService = Depends(get_post_service),
+    current_user: User = Depends(get_current_user),
+):
+    if not posts:
+        raise HTTPException(status_code=400, detail="전송 데이터가 잘못됐습니다.")
+
+    if len(posts) > POST_BULK_MAX_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"한 번에 최대 {POST_BULK_MAX_SIZE}개까지 등록할 수 있습니다.",
+        )
+
+    post_ids = await post_service.create_posts(posts, current_user)
+
+    return {"count": len(post_ids), "ids": post_ids}
+
+
 #전체 게시글 목록 화면에 출력.
 # 1. HTML 화면을 보여주는 경로 (브라우저 접속용: http://localhost:8000/posts_view)
 #동작원리 함수동작시 posts_view.html실행-> html파일 내에서 get으로 posts 불러옴.
 @router.get("/posts/view", response_class=HTMLResponse)
 async def get_PostsView_page(request: Request):
     # templates 디렉토리 안의 login.html을 읽어서 반환합니다.
-    return templates.TemplateResponse("posts_view.html", {"request": request})
+    return get_templates().TemplateResponse("posts_view.html", {"request": request})
 
 
 
 # 전체 게시글 목록 조회
+# cursor나 limit을 보내면 한 번에 전체를 내려주지 않고 limit개씩 잘라서 페이지({items, next_cursor})로 내려줍니다.
+# 응답의 next_cursor를 다음 요청의 cursor로 넘기면 이어서 조회할 수 있습니다.
+# 둘 다 없으면 예전 클라이언트를 위해 예전처럼 전체 게시글 목록(배열)을 그대로 내려줍니다.
 @router.get(
     "/posts/",
-    response_model=List[PostResponse],
+    response_model=Union[PostPage, List[PostResponse]],
     summary="게시글 목록 조회",
-    description="전체 게시글 목록을 조회합니다.",
+    description=(
+        "게시글 목록을 최신순으로 조회합니다. cursor 또는 limit을 보내면 커서 기반 페이지 단위로, "
+        "둘 다 없으면 전체 목록(배열)으로 응답합니다."
+    ),
     responses={
         404: {
             "description": "게시글 조회 실패",
@@ -83,13 +167,187 @@ async def get_PostsView_page(request: Request):
         },
     },
 )
-def get_posts(post_service: PostService = Depends(get_post_service)):
-    posts = post_service.get_posts()
+async def get_posts(
+    response: Response,
+    cursor: Optional[str] = Query(None, description="이전 응답의 next_cursor 값"),
+    limit: Optional[int] = Query(
+        None, ge=1, le=MAX_PAGE_SIZE, description=f"한 페이지의 게시글 수 (cursor만 보내면 {DEFAULT_PAGE_SIZE})"
+    ),
+    if_none_match: Optional[str] = Header(None),
+    post_service: PostService = Depends(get_post_service),
+):
+    paginated = cursor is not None or limit is not None
+    if paginated and limit is None:
+        limit = DEFAULT_PAGE_SIZE
+    decoded_cursor = None
+
+    if cursor is not None:
+        decoded_cursor = decode_cursor(cursor)
+
+        if decoded_cursor is None:
+            raise HTTPException(status_code=400, detail="전송 데이터가 잘못됐습니다.")
+
+    # 목록 버전(Redis)과 요청한 페이지로 ETag를 만듭니다.
+    # 클라이언트가 같은 ETag를 보내면 DB를 조회하지 않고 바로 304를 돌려줍니다.
+    # 버전은 DB 조회 전에 읽어야 합니다. 조회 도중 글이 바뀌면 ETag가 예전 버전이 되어 다음 요청에서 새로 읽게 됩니다.
+    headers = None
+    list_version = await post_service.get_list_version()
+    if list_version is not None:
+        etag = make_etag("posts", list_version, cursor, limit)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+        headers = etag_headers(etag)
+        response.headers.update(headers)
+
+    posts, has_next = await post_service.get_posts(decoded_cursor, limit)
 
     if posts is None:
         raise HTTPException(status_code=404, detail="게시글을 찾을 수 없습니다.")
 
-    return posts
+    if not paginated:
+        return list_response(posts, headers)
+
+    return page_response(build_page(posts, has_next), headers)
+
+
+# 변경분 조회 (증분 동기화)
+# 게시판 전체를 다시 받지 않고, 마지막 동기화 이후에 생성/수정된 게시글만 변경(commit)된 순서로 받습니다.
+# 처음에는 since(시각)로 시작하고, 그 다음부터는 응답의 next_cursor를 cursor로 넘깁니다.
+# (삭제된 게시글은 목록에 나타나지 않습니다.)
+@router.get(
+    "/changes",
+    response_model=PostChangesPage,
+    summary="게시글 변경분 조회",
+    description="since 시각 또는 cursor 이후에 생성/수정된 게시글을 변경된 순서로 조회합니다.",
+    responses={
+        400: {
+            "description": "변경분 조회 실패",
+            "content": {
+                "application/json": {
+                    "example": {"detail": "전송 데이터가 잘못됐습니다."}
+                }
+            },
+        },
+    },
+)
+async def get_post_changes(
+    since: Optional[datetime] = Query(None, description="이 시각(UTC) 이후에 바뀐 게시글만 조회"),
+    cursor: Optional[str] = Query(None, description="이전 응답의 next_cursor 값"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    post_service: PostService = Depends(get_post_service),
+):
+    decoded_cursor = None
+
+    if cursor is not None:
+        decoded_cursor = decode_change_cursor(cursor)
+
+        if decoded_cursor is None:
+            raise HTTPException(status_code=400, detail="전송 데이터가 잘못됐습니다.")
+
+    # 시간대가 붙은 시각은 UTC로 바꾼 뒤 DB와 같은 형식(시간대 정보 없음)으로 맞춥니다.
+    if since is not None and since.tzinfo is not None:
+        since = since.astimezone(timezone.utc).replace(tzinfo=None)
+
+    posts, has_more, last_position = await post_service.get_changes(since, decoded_cursor, limit)
+
+    # 받은 게 없으면 요청한 cursor를 그대로 돌려줘서 다음 동기화 때 같은 지점부터 다시 확인하게 합니다.
+    next_cursor = cursor
+    if last_position is not None:
+        next_cursor = encode_change_cursor(*last_position)
+
+    return page_response({"items": posts, "next_cursor": next_cursor, "has_more": has_more})
+
+
+# 게시글 전체 내보내기
+# 모든 게시글을 id 오름차순으로 스트리밍합니다. (백업/데이터 이관 용도)
+# 다운로드가 중간에 끊기면 마지막으로 받은 게시글의 id를 after_id로 넘겨서 그 다음부터 이어받을 수 있습니다.
+@router.get(
+    "/export",
+    summary="게시글 내보내기",
+    description="모든 게시글을 NDJSON(한 줄에 게시글 하나) 또는 JSON 배열로 스트리밍합니다.",
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            "description": "게시글 목록 (format=ndjson이면 application/x-ndjson, json이면 application/json)",
+            "content": {"application/x-ndjson": {}, "application/json": {}},
+        }
+    },
+)
+async def export_all_posts(
+    format: Literal["ndjson", "json"] = Query("ndjson", description="응답 형식"),
+    after_id: Optional[int] = Query(
+        None, ge=0, description="이어받기: 이미 받은 마지막 게시글 id"
+    ),
+):
+    media_type = "application/x-ndjson" if format == "ndjson" else "application/json"
+
+    return StreamingResponse(export_posts(after_id, format), media_type=media_type)
+
+
+# 게시글 변경 알림 (Server-Sent Events)
+# 목록을 주기적으로 다시 조회(polling)하지 않아도, 연결을 열어두면 게시글이 생성/수정/삭제될 때마다 알림을 받습니다.
+# 알림 종류: created, updated (게시글 내용), deleted ({"id"}), bulk_created ({"ids"}),
+#           reset (놓친 알림을 이어줄 수 없음 -> 목록을 처음부터 다시 조회)
+# 연결이 끊기면 EventSource가 마지막으로 받은 알림 id를 Last-Event-ID 헤더로 보내며 다시 연결하고, 그 뒤의 알림부터 이어서 받습니다.
+@router.get(
+    "/stream",
+    summary="게시글 변경 알림",
+    description="게시글 생성/수정/삭제 알림을 Server-Sent Events(text/event-stream)로 보냅니다.",
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            "description": "알림 스트림",
+            "content": {"text/event-stream": {}},
+        },
+        400: {
+            "description": "Last-Event-ID 형식이 잘못됨",
+            "content": {
+                "application/json": {
+                    "example": {"detail": "전송 데이터가 잘못됐습니다."}
+                }
+            },
+        },
+    },
+)
+async def stream_post_events(
+    last_event_id: Optional[str] = Header(None, description="마지막으로 받은 알림 id"),
+):
+    decoded_event_id = None
+
+    if last_event_id:
+        decoded_event_id = parse_event_id(last_event_id)
+
+        if decoded_event_id is None:
+            raise HTTPException(status_code=400, detail="전송 데이터가 잘못됐습니다.")
+
+    # X-Accel-Buffering: nginx 같은 프록시가 알림을 모아두지 않고 바로 전달하게 합니다.
+    return StreamingResponse(
+        post_events.subscribe(decoded_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# 게시글 검색
+# 제목/본문에 검색어가 들어있는 게시글을 관련도(BM25) 순으로 limit개씩 내려줍니다.
+# 응답의 next_offset을 다음 요청의 offset으로 넘기면 이어서 조회할 수 있습니다.
+@router.get(
+    "/search",
+    response_model=PostSearchPage,
+    summary="게시글 검색",
+    description="제목과 본문에서 검색어를 찾아 관련도 순으로 조회합니다. 여러 단어를 넣으면 모든 단어가 들어있는 글만 찾습니다.",
+)
+async def search_posts(
+    q: str = Query(..., min_length=1, max_length=200, description="검색어"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0, description="이전 응답의 next_offset 값"),
+    post_service: PostService = Depends(get_post_service),
+):
+    posts, has_next = await post_service.search_posts(q, limit, offset)
+
+    next_offset = offset + len(posts) if has_next else None
+
+    return page_response({"items": posts, "next_offset": next_offset})
 
 
 # 특정 게시글 조회
@@ -112,13 +370,24 @@ def get_posts(post_service: PostService = Depends(get_post_service)):
         }
     },
 )
-def get_post(post_id: int, post_service: PostService = Depends(get_post_service)):
-    post = post_service.get_post(post_id)
+async def get_post(
+    post_id: int,
+    if_none_match: Optional[str] = Header(None),
+    post_service: PostService = Depends(get_post_service),
+):
+    # 캐시에 저장된 JSON 문자열을 그대로 내려주므로 매번 직렬화하지 않습니다.
+    post_json = await post_service.get_post_json(post_id)
 
-    if post is None:
+    if post_json is None:
         raise HTTPException(status_code=404, detail="게시글을 찾을 수 없습니다.")
 
-    return post
+    # ETag는 게시글 id와 version입니다. 수정할 때 이 값을 If-Match로 보내면 됩니다.
+    # (캐시된 JSON 문자열을 다시 파싱하는 비용은 해시를 계산하는 정도로 작습니다)
+    etag = post_etag(post_id, orjson.loads(post_json)["version"])
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    return Response(content=post_json, media_type="application/json", headers=etag_headers(etag))
 
 
 # 게시글 수정
@@ -127,7 +396,9 @@ def get_post(post_id: int, post_service: PostService = Depends(get_post_service)
     response_model=PostResponse,
     summary="게시글 수정",
     description="게시글을 수정합니다.",
+    dependencies=[Depends(rate_limit(POST_WRITE_RATE_LIMIT))],
     responses={
+        **RATE_LIMIT_RESPONSE,
         404: {
             "description": "게시글 수정 실패",
             "content": {
@@ -137,20 +408,40 @@ def get_post(post_id: int, post_service: PostService = Depends(get_post_service)
                     }
                 }
             },
-        }
+        },
+        412: {
+            "description": "If-Match의 ETag가 현재 게시글의 ETag와 다름 (다른 요청이 먼저 수정함)",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "detail": "다른 요청이 먼저 게시글을 수정했습니다. 최신 내용을 다시 읽어주세요.",
+                    }
+                }
+            },
+        },
     },
 )
-def update_post(
+async def update_post(
     post_id: int,
     post_update: PostUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(
+        None, description="조회했던 게시글의 ETag. 그 사이 다른 수정이 있었다면 412로 거절됩니다."
+    ),
     post_service: PostService = Depends(get_post_service),
     current_user: User = Depends(get_current_user),
 ):
-    post = post_service.update_post(post_id, post_update, current_user)
+    expected_versions = parse_if_match_versions(if_match, post_id)
+
+    post = await post_service.update_post(
+        post_id, post_update, current_user, expected_versions
+    )
 
     if post is None:
         raise HTTPException(status_code=404, detail="게시글을 찾을 수 없습니다.")
 
+    # 수정된 게시글의 새 ETag. 이어서 다시 수정할 때 조회하지 않고 바로 If-Match로 쓸 수 있습니다.
+    response.headers["ETag"] = post_etag(post.id, post.version)
     return post
 
 
@@ -160,7 +451,9 @@ def update_post(
     response_model=dict,
     summary="게시글 삭제",
     description="게시글을 삭제합니다.",
+    dependencies=[Depends(rate_limit(POST_WRITE_RATE_LIMIT))],
     responses={
+        **RATE_LIMIT_RESPONSE,
         200: {
             "description": "게시글 삭제 성공",
             "content": {
@@ -183,12 +476,12 @@ def update_post(
         },
     },
 )
-def delete_post(
+async def delete_post(
     post_id: int,
     post_service: PostService = Depends(get_post_service),
     current_user: User = Depends(get_current_user),
 ):
-    post = post_service.delete_post(post_id, current_user)
+    post = await post_service.delete_post(post_id, current_user)
 
     if post is False:
         raise HTTPException(status_code=404, detail="게시글을 찾을 수 없습니다.")
@@ -1,6 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
 
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+
+from app.dependencies.rate_limit import REGISTER_RATE_LIMIT, RATE_LIMIT_RESPONSE, rate_limit
+from app.services.post_service import PostService, get_post_service
 from app.services.user_service import UserService, get_user_service
+from app.utils.etag import etag_headers, etag_matches, make_etag, not_modified
+from app.utils.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    build_page,
+    decode_cursor,
+    page_response,
+)
+from schemas.post import PostPage
 from schemas.user import UserCreate, UserResponse
 
 router = APIRouter()
@@ -20,7 +33,9 @@ router = APIRouter()
     response_model=UserResponse,
     summary="회원가입",
     description="새로운 사용자를 등록합니다.",
+    dependencies=[Depends(rate_limit(REGISTER_RATE_LIMIT))],
     responses={
+        **RATE_LIMIT_RESPONSE,
         409: {
             "description": "중복된 이메일로 회원가입 시도",
             "content": {
@@ -30,24 +45,96 @@ router = APIRouter()
                     }
                 }
             },
-        }
+        },
+        503: {
+            "description": "비밀번호 해싱 대기열이 가득 참",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "detail": "요청이 많아 잠시 후 다시 시도해주세요.",
+                    }
+                }
+            },
+        },
     },
 )
-def register_user(
+async def register_user(
     user: UserCreate, user_service: UserService = Depends(get_user_service)
 ):
     # 이메일 , 사용자 이미 존재하면 회원가입 실패
     # 없을 경우 정상적으로 회원가입 실행
-    existed_user_email = user_service.get_user_by_email(user.email)
+    existed_user_email = await user_service.get_user_by_email(user.email)
 
     if existed_user_email:
         raise HTTPException(status_code=409, detail="이미 존재하는 이메일입니다.")
 
-    existed_user_name = user_service.get_user_by_username(user.username)
+    existed_user_name = await user_service.get_user_by_username(user.username)
 
     if existed_user_name:
         raise HTTPException(status_code=409, detail="이미 존재하는 사용자 이름입니다.")
 
-    created_user = user_service.create_user(user)
+    created_user = await user_service.create_user(user)
 
     return created_user
+
+
+# 특정 사용자가 쓴 게시글 목록 조회
+# 전체 목록(GET /posts/posts/)과 같은 커서 기반 페이지네이션입니다. 응답의 next_cursor를 다음 요청의 cursor로 넘깁니다.
+@router.get(
+    "/users/{user_id}/posts",
+    response_model=PostPage,
+    summary="사용자별 게시글 목록 조회",
+    description="특정 사용자가 작성한 게시글을 최신순으로 커서 기반 페이지 단위로 조회합니다.",
+    responses={
+        404: {
+            "description": "사용자 조회 실패",
+            "content": {
+                "application/json": {
+                    "example": {"detail": "사용자를 찾을 수 없습니다."}
+                }
+            },
+        },
+        400: {
+            "description": "게시글 조회 실패",
+            "content": {
+                "application/json": {
+                    "example": {"detail": "전송 데이터가 잘못됐습니다."}
+                }
+            },
+        },
+    },
+)
+async def get_user_posts(
+    user_id: int,
+    response: Response,
+    cursor: Optional[str] = Query(None, description="이전 응답의 next_cursor 값"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    if_none_match: Optional[str] = Header(None),
+    post_service: PostService = Depends(get_post_service),
+    user_service: UserService = Depends(get_user_service),
+):
+    decoded_cursor = None
+
+    if cursor is not None:
+        decoded_cursor = decode_cursor(cursor)
+
+        if decoded_cursor is None:
+            raise HTTPException(status_code=400, detail="전송 데이터가 잘못됐습니다.")
+
+    # 전체 목록(GET /posts/posts/)과 같은 목록 버전으로 ETag를 만듭니다.
+    headers = None
+    list_version = await post_service.get_list_version()
+    if list_version is not None:
+        etag = make_etag("user_posts", list_version, user_id, cursor, limit)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+        headers = etag_headers(etag)
+        response.headers.update(headers)
+
+    posts, has_next = await post_service.get_posts(decoded_cursor, limit, author_id=user_id)
+
+    # 게시글이 없을 때만 "글을 안 쓴 사용자"인지 "없는 사용자"인지 확인합니다.
+    if not posts and await user_service.get_user_by_id(user_id) is None:
+        raise HTTPException(status_code=404, detail="사용자를 찾을 수 없습니다.")
+
+    return page_response(build_page(posts, has_next), headers)
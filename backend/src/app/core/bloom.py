@@ -0,0 +1,39 @@
+import hashlib
+import math
+
+
+# 블룸 필터(Bloom filter)
+# "이 값이 들어있는가?"를 아주 적은 메모리로 빠르게 답하는 확률적 자료구조입니다.
+# - "없다"는 답은 항상 정확합니다. (False negative 없음)
+# - "있다"는 답은 fp_rate 확률로 틀릴 수 있습니다. (False positive) 그래서 "있다"일 때만 Redis로 한 번 더 확인합니다.
+# - 값을 지울 수는 없으므로, 만료된 항목을 정리하려면 새로 만들어서(rebuild) 교체합니다.
+class BloomFilter:
+    def __init__(self, capacity: int, fp_rate: float = 0.001):
+        self.capacity = max(capacity, 1)
+        self.fp_rate = fp_rate
+        # capacity개를 넣었을 때 오탐률이 fp_rate가 되도록 비트 수(m)와 해시 함수 개수(k)를 계산합니다.
+        self.num_bits = max(
+            8, int(math.ceil(-self.capacity * math.log(fp_rate) / (math.log(2) ** 2)))
+        )
+        self.num_hashes = max(1, int(round(self.num_bits / self.capacity * math.log(2))))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    # 해시를 k번 따로 계산하지 않고, 128비트 해시 하나를 둘로 나눠 h1 + i * h2 로 k개의 위치를 만듭니다. (double hashing)
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        for position in self._positions(item):
+            if not self._bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
@@ -0,0 +1,67 @@
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+# 프로세스 메모리 안에서 동작하는 TTL + LRU 캐시
+# maxsize: 저장할 수 있는 최대 항목 수. 가득 차면 가장 오래 사용하지 않은(LRU) 항목부터 버립니다.
+# ttl: 항목이 저장된 뒤 유효한 시간(초). 지나면 없는 것으로 취급합니다.
+# 워커 프로세스마다 따로 가지는 캐시라서 네트워크 왕복이 전혀 없고, 대신 값이 바뀌면 invalidate로 직접 지워줘야 합니다.
+class TTLCache:
+    def __init__(self, maxsize: int = 1024, ttl: float = 30.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        # key -> (만료 시각, 값). OrderedDict의 순서를 최근 사용 순서로 사용합니다.
+        self._data: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        item = self._data.get(key)
+
+        if item is None:
+            self.misses += 1
+            return default
+
+        expires_at, value = item
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return default
+
+        # 최근에 사용한 항목은 맨 뒤로 옮겨서 LRU로 밀려나지 않게 합니다.
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    # ttl을 따로 주면 해당 항목만 다른 유효시간을 가집니다. (예: 토큰의 남은 만료 시간)
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0:
+            return
+
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    # 캐시 적중/실패 횟수
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
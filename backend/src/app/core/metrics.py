@@ -0,0 +1,257 @@
+import bisect
+import os
+import threading
+import time
+from contextvars import ContextVar
+from typing import Callable, Optional
+
+import anyio.to_thread
+
+# 메트릭 설정
+# METRICS_ENABLED: false로 두면 측정하지 않고 /metrics도 빈 응답을 돌려줍니다.
+# SERVER_TIMING_ENABLED: 응답마다 Server-Timing 헤더(요청 하나의 DB/Redis/해싱 시간)를 붙일지 여부
+#                        브라우저 개발자 도구의 Timing 탭에서 바로 볼 수 있습니다.
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+SERVER_TIMING_ENABLED = os.getenv("SERVER_TIMING_ENABLED", "true").lower() == "true"
+
+# Prometheus 텍스트 형식의 Content-Type
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# 지연시간 히스토그램 구간(초)
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# 요청 하나에서 실행한 SQL/Redis 명령 수 구간. 한 요청에서 수십 번씩 실행된다면 N+1 조회를 의심해볼 수 있습니다.
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: tuple, values: tuple) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+# 라벨마다 구간별 개수, 합계, 전체 개수를 누적하는 히스토그램
+# 평균만으로는 가끔 느린 요청이 묻히므로, Prometheus에서 histogram_quantile()로 p95/p99를 계산할 수 있게 합니다.
+class Histogram:
+    def __init__(self, name: str, help: str, label_names: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.label_names = label_names
+        self.buckets = tuple(buckets)
+        # labels -> [구간별 개수..., 합계, 전체 개수]
+        self._values: dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, labels: tuple = ()) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            item = self._values.get(labels)
+            if item is None:
+                item = self._values[labels] = [0] * (len(self.buckets) + 2)
+            if index < len(self.buckets):
+                item[index] += 1
+            item[-2] += value
+            item[-1] += 1
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        names = self.label_names + ("le",)
+        # observe()가 다른 쓰레드(쓰레드풀)에서 동시에 값을 바꾸므로 잠금 안에서 복사한 뒤에 정렬/출력합니다.
+        # (dict를 순회하는 도중 새 라벨이 추가되면 RuntimeError, 구간별 개수와 합계가 서로 어긋날 수도 있음)
+        with self._lock:
+            values = [(labels, list(item)) for labels, item in self._values.items()]
+        for labels, item in sorted(values):
+            cumulative = 0
+            for bound, count in zip(self.buckets, item):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_format_labels(names, labels + (bound,))} {cumulative}")
+            lines.append(f"{self.name}_bucket{_format_labels(names, labels + ('+Inf',))} {item[-1]}")
+            lines.append(f"{self.name}_sum{_format_labels(self.label_names, labels)} {item[-2]}")
+            lines.append(f"{self.name}_count{_format_labels(self.label_names, labels)} {item[-1]}")
+        return lines
+
+
+# /metrics를 요청할 때마다 함수를 호출해서 현재 값을 읽는 게이지 (연결 풀 사용량, 대기열 길이 등)
+class Gauge:
+    def __init__(self, name: str, help: str, func: Callable[[], float]):
+        self.name = name
+        self.help = help
+        self.func = func
+
+    def render(self) -> list:
+        try:
+            value = self.func()
+        except Exception:
+            return []
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge", f"{self.name} {value}"]
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: dict[str, object] = {}
+
+    def _register(self, metric):
+        # 같은 이름으로 다시 등록하면 (모듈을 다시 import하는 경우 등) 먼저 등록된 것을 그대로 씁니다.
+        return self._metrics.setdefault(metric.name, metric)
+
+    def histogram(self, name: str, help: str, label_names: tuple = (), buckets: tuple = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help, label_names, buckets))
+
+    def gauge(self, name: str, help: str, func: Callable[[], float]) -> Gauge:
+        return self._register(Gauge(name, help, func))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+HTTP_REQUEST_DURATION = metrics.histogram(
+    "http_request_duration_seconds", "HTTP 요청 처리 시간", ("method", "route", "status")
+)
+HTTP_REQUEST_DB_STATEMENTS = metrics.histogram(
+    "http_request_db_statements", "HTTP 요청 하나에서 실행한 SQL 문 수", ("route",), COUNT_BUCKETS
+)
+HTTP_REQUEST_REDIS_COMMANDS = metrics.histogram(
+    "http_request_redis_commands", "HTTP 요청 하나에서 실행한 Redis 명령 수", ("route",), COUNT_BUCKETS
+)
+DB_STATEMENT_DURATION = metrics.histogram(
+    "db_statement_duration_seconds", "SQL 문 실행 시간", ("operation",)
+)
+REDIS_COMMAND_DURATION = metrics.histogram(
+    "redis_command_duration_seconds", "Redis 명령 실행 시간 (파이프라인은 PIPELINE 하나로 기록)", ("command",)
+)
+PASSWORD_HASH_DURATION = metrics.histogram(
+    "password_hash_duration_seconds", "bcrypt 해싱/검증 시간 (대기열에서 기다린 시간 포함)", ("operation",)
+)
+
+
+# FastAPI의 동기 함수(def 엔드포인트/의존성)와 run_in_threadpool이 함께 쓰는 쓰레드풀의 사용량
+# waiting이 계속 0보다 크면 쓰레드풀이 부족해서 요청이 줄을 서고 있다는 뜻입니다.
+def _threadpool_statistics():
+    return anyio.to_thread.current_default_thread_limiter().statistics()
+
+
+metrics.gauge(
+    "threadpool_threads_in_use", "사용 중인 쓰레드풀 쓰레드 수",
+    lambda: _threadpool_statistics().borrowed_tokens,
+)
+metrics.gauge(
+    "threadpool_tasks_waiting", "쓰레드풀 쓰레드를 기다리는 작업 수",
+    lambda: _threadpool_statistics().tasks_waiting,
+)
+
+
+# 요청 하나 동안의 DB/Redis/해싱 횟수와 시간 (Server-Timing 헤더와 요청별 히스토그램에 사용)
+class RequestStats:
+    __slots__ = ("db_count", "db_seconds", "redis_count", "redis_seconds", "hash_count", "hash_seconds")
+
+    def __init__(self):
+        self.db_count = 0
+        self.db_seconds = 0.0
+        self.redis_count = 0
+        self.redis_seconds = 0.0
+        self.hash_count = 0
+        self.hash_seconds = 0.0
+
+
+# 지금 처리 중인 요청의 RequestStats. 요청 밖(서버 시작, 쓰기 큐 작업, 백그라운드 작업)에서는 None
+# contextvars라서 동시에 처리 중인 다른 요청과 섞이지 않고, run_in_threadpool로 넘긴 함수에도 그대로 전달됩니다.
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+_SQL_OPERATIONS = {"SELECT", "INSERT", "UPDATE", "DELETE", "PRAGMA", "BEGIN", "COMMIT", "ROLLBACK", "CREATE", "ALTER", "WITH"}
+
+
+def record_db(statement: str, seconds: float) -> None:
+    if not METRICS_ENABLED:
+        return
+
+    operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ""
+    DB_STATEMENT_DURATION.observe(seconds, (operation if operation in _SQL_OPERATIONS else "OTHER",))
+
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.db_count += 1
+        stats.db_seconds += seconds
+
+
+def record_redis(command, seconds: float) -> None:
+    if not METRICS_ENABLED:
+        return
+
+    REDIS_COMMAND_DURATION.observe(seconds, (str(command).upper(),))
+
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.redis_count += 1
+        stats.redis_seconds += seconds
+
+
+def record_hash(operation: str, seconds: float) -> None:
+    if not METRICS_ENABLED:
+        return
+
+    PASSWORD_HASH_DURATION.observe(seconds, (operation,))
+
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.hash_count += 1
+        stats.hash_seconds += seconds
+
+
+def server_timing(stats: RequestStats, total_seconds: float) -> str:
+    parts = [
+        f'db;dur={stats.db_seconds * 1000:.2f};desc="{stats.db_count} queries"',
+        f'redis;dur={stats.redis_seconds * 1000:.2f};desc="{stats.redis_count} commands"',
+    ]
+    if stats.hash_count:
+        parts.append(f"hash;dur={stats.hash_seconds * 1000:.2f}")
+    parts.append(f"total;dur={total_seconds * 1000:.2f}")
+    return ", ".join(parts)
+
+
+# 요청마다 처리 시간과 DB/Redis 사용량을 기록하는 ASGI 미들웨어
+# BaseHTTPMiddleware(@app.middleware("http")) 대신 ASGI로 직접 작성해서 요청마다 작업(task)을 더 만들지 않고,
+# 스트리밍 응답(export, SSE)도 그대로 흘려보냅니다.
+# route 라벨은 실제 경로(/posts/posts/12) 대신 라우트 경로(/posts/posts/{post_id})를 써서 라벨 종류가 늘어나지 않게 합니다.
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if SERVER_TIMING_ENABLED:
+                    timing = server_timing(stats, time.perf_counter() - started)
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (b"server-timing", timing.encode())
+                    ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_stats.reset(token)
+            route = getattr(scope.get("route"), "path", "unmatched")
+            HTTP_REQUEST_DURATION.observe(
+                time.perf_counter() - started, (scope["method"], route, str(status))
+            )
+            HTTP_REQUEST_DB_STATEMENTS.observe(stats.db_count, (route,))
+            HTTP_REQUEST_REDIS_COMMANDS.observe(stats.redis_count, (route,))
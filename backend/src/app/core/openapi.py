@@ -0,0 +1,66 @@
+import hashlib
+import os
+
+import orjson
+from fastapi import FastAPI
+
+# OPENAPI_CACHE_PATH: 빌드 때(build.py) 미리 만들어 둔 OpenAPI 스키마(JSON) 파일 경로. 비워두면 사용하지 않습니다.
+# FastAPI는 /docs나 /openapi.json을 처음 요청받을 때 모든 라우트와 스키마를 훑어서 OpenAPI 문서를 만드는데,
+# 워커마다 이 작업을 반복하지 않고 파일을 읽어서 씁니다.
+OPENAPI_CACHE_PATH = os.getenv("OPENAPI_CACHE_PATH", "")
+
+# 저장한 스키마가 지금의 app과 같은 라우트로 만들어졌는지 확인하는 값을 넣어둘 키
+FINGERPRINT_KEY = "x-build-fingerprint"
+
+
+# app 버전과 라우트 목록(메서드, 경로)으로 만든 지문
+# 라우트를 추가/삭제한 뒤 build.py를 다시 실행하지 않았다면 지문이 달라서 캐시를 쓰지 않고 새로 만듭니다.
+def openapi_fingerprint(app: FastAPI) -> str:
+    routes = sorted(
+        f"{','.join(sorted(getattr(route, 'methods', None) or ()))} {route.path}" for route in app.routes
+    )
+    return hashlib.sha256(orjson.dumps([app.version, routes])).hexdigest()[:16]
+
+
+# 스키마를 새로 만들어서 path에 저장합니다. (이전에 저장한 파일은 읽지 않도록 먼저 지웁니다)
+def write_openapi(app: FastAPI, path: str) -> dict:
+    if os.path.exists(path):
+        os.remove(path)
+    app.openapi_schema = None
+    schema = dict(app.openapi())
+    schema[FINGERPRINT_KEY] = openapi_fingerprint(app)
+    with open(path, "wb") as f:
+        f.write(orjson.dumps(schema))
+    return schema
+
+
+# 캐시 파일의 스키마를 app.openapi_schema에 넣습니다. 새로 만들지는 않습니다.
+# 파일이 없거나 지문이 다르면(라우트가 바뀐 뒤 다시 빌드하지 않음) False
+def load_cached_openapi(app: FastAPI, path: str = OPENAPI_CACHE_PATH) -> bool:
+    if app.openapi_schema is not None:
+        return True
+    if not path:
+        return False
+
+    try:
+        with open(path, "rb") as f:
+            schema = orjson.loads(f.read())
+    except (OSError, orjson.JSONDecodeError):
+        return False
+
+    if schema.get(FINGERPRINT_KEY) != openapi_fingerprint(app):
+        return False
+    app.openapi_schema = schema
+    return True
+
+
+# app.openapi를 바꿔서 스키마를 처음 만들 때 캐시 파일을 먼저 읽게 합니다.
+# 캐시를 쓸 수 없으면 원래대로 FastAPI가 만듭니다. (어느 쪽이든 한 번 만든 뒤에는 app.openapi_schema에 보관)
+def use_cached_openapi(app: FastAPI, path: str = OPENAPI_CACHE_PATH) -> None:
+    generate = app.openapi
+
+    def openapi() -> dict:
+        load_cached_openapi(app, path)
+        return generate()
+
+    app.openapi = openapi
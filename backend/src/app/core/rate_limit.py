@@ -0,0 +1,152 @@
+import os
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+import redis
+
+from app.core.redis_config import async_redis_client
+from app.core.cache import TTLCache
+
+# 요청 횟수 제한(rate limit) 설정
+# RATE_LIMIT_ENABLED: false로 두면 제한하지 않습니다. (부하 테스트 등)
+# RATE_LIMIT_LOCAL_MAXSIZE: 워커 프로세스 메모리에 들고 있는 토큰 버킷(클라이언트별) 최대 개수
+# RATE_LIMIT_TRUST_FORWARDED: 프록시(nginx 등) 뒤에서 실행할 때 true로 두면 X-Forwarded-For의 첫 번째 주소를 클라이언트 IP로 씁니다.
+#                             프록시 없이 true로 두면 클라이언트가 헤더를 바꿔서 제한을 피할 수 있으므로 주의
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+RATE_LIMIT_LOCAL_MAXSIZE = int(os.getenv("RATE_LIMIT_LOCAL_MAXSIZE", "10000"))
+RATE_LIMIT_TRUST_FORWARDED = os.getenv("RATE_LIMIT_TRUST_FORWARDED", "false").lower() == "true"
+
+# Redis에 저장할 요청 횟수 키 접두사 (예: ratelimit:login:ip:1.2.3.4:28333333)
+RATE_LIMIT_PREFIX = "ratelimit:"
+
+# 슬라이딩 윈도우 카운터 (Redis Lua 스크립트)
+# 고정 윈도우(1분마다 0으로 초기화)는 경계 직전/직후에 몰아서 보내면 두 배까지 통과하므로,
+# 이전 윈도우의 횟수를 지난 비율만큼 줄여서 더합니다. (used = 이전 * 남은 비율 + 현재)
+# 확인과 증가를 스크립트 하나로 실행해서 여러 워커가 동시에 요청해도 한도를 넘겨 통과시키지 않습니다.
+# KEYS[1]: 현재 윈도우 키, KEYS[2]: 이전 윈도우 키
+# ARGV: limit, window_ms, elapsed_ms(현재 윈도우가 시작된 뒤 지난 시간), cost
+# 반환: {1, 남은 횟수} 또는 {0, 다시 시도할 수 있을 때까지의 시간(ms)}
+SLIDING_WINDOW_SCRIPT = """
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local elapsed = tonumber(ARGV[3])
+local cost = tonumber(ARGV[4])
+
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+local previous = tonumber(redis.call('GET', KEYS[2]) or '0')
+local used = previous * (window - elapsed) / window + current
+
+if used + cost > limit then
+    local wait = window - elapsed
+    if current + cost <= limit and previous > 0 then
+        -- 이전 윈도우 몫이 줄어들어 cost만큼 자리가 생기는 시점
+        wait = wait - (limit - cost - current) * window / previous
+    else
+        -- 현재 윈도우만으로도 넘침: 다음 윈도우에서 지금의 횟수가 이전 몫으로 줄어들어 자리가 생기는 시점
+        local room = math.max(limit - cost, 0)
+        wait = wait + window * (1 - room / math.max(current, 1))
+    end
+    return {0, math.ceil(wait)}
+end
+
+redis.call('INCRBY', KEYS[1], cost)
+redis.call('PEXPIRE', KEYS[1], window * 2)
+return {1, math.floor(limit - used - cost)}
+"""
+
+
+# 제한 정책
+# name: Redis 키와 로컬 버킷을 나누는 이름. 여러 엔드포인트가 같은 이름을 쓰면 한도를 함께 씁니다.
+# limit: window_seconds 동안 허용하는 요청 수
+# scope: "ip"면 클라이언트 IP마다, "user"면 로그인한 사용자마다 따로 셉니다.
+@dataclass(frozen=True)
+class RateLimitPolicy:
+    name: str
+    limit: int
+    window_seconds: float
+    scope: str = "ip"
+
+
+# 로컬 토큰 버킷 + Redis 슬라이딩 윈도우로 요청 횟수를 제한하는 클래스 (워커 프로세스마다 하나)
+# - 로컬 토큰 버킷: 워커 하나에서만 봐도 한도를 넘은 클라이언트는 Redis에 묻지 않고 바로 거절합니다.
+#   Redis에서 거절된 클라이언트도 Retry-After 동안은 로컬에서 바로 거절합니다.
+# - 한도 안의 요청은 Lua 스크립트 한 번(Redis 왕복 1번)으로 모든 워커를 합친 횟수를 확인하고 증가시킵니다.
+# - Redis에 문제가 있으면 요청을 막지 않고 통과시킵니다. (로컬 버킷이 워커 단위로는 계속 제한)
+class RateLimiter:
+    def __init__(
+        self,
+        enabled: bool = RATE_LIMIT_ENABLED,
+        local_maxsize: int = RATE_LIMIT_LOCAL_MAXSIZE,
+    ):
+        self.enabled = enabled
+        # (정책 이름, 클라이언트) -> [남은 토큰, 마지막 충전 시각, 거절 해제 시각]
+        self._buckets = TTLCache(maxsize=local_maxsize, ttl=3600)
+        # EVALSHA로 실행하고, Redis에 스크립트가 없으면(재시작 등) 자동으로 다시 올립니다.
+        self._script = async_redis_client.register_script(SLIDING_WINDOW_SCRIPT)
+        self.allowed = 0
+        # 로컬 버킷에서 바로 거절한 횟수 / Redis에서 거절한 횟수
+        self.local_rejected = 0
+        self.redis_rejected = 0
+
+    # 통과하면 None, 거절하면 다시 시도할 수 있을 때까지의 시간(초)을 반환합니다.
+    async def hit(self, policy: RateLimitPolicy, identity: str, cost: int = 1) -> Optional[float]:
+        if not self.enabled:
+            return None
+
+        now = time.monotonic()
+        bucket_key = (policy.name, identity)
+        bucket = self._buckets.get(bucket_key)
+        if bucket is None:
+            bucket = [float(policy.limit), now, 0.0]
+            self._buckets.set(bucket_key, bucket, ttl=policy.window_seconds * 2)
+
+        if bucket[2] > now:
+            self.local_rejected += 1
+            return bucket[2] - now
+
+        rate = policy.limit / policy.window_seconds
+        bucket[0] = min(float(policy.limit), bucket[0] + (now - bucket[1]) * rate)
+        bucket[1] = now
+        if bucket[0] < cost:
+            self.local_rejected += 1
+            return (cost - bucket[0]) / rate
+        bucket[0] -= cost
+
+        retry_after = await self._hit_redis(policy, identity, cost)
+        if retry_after is not None:
+            bucket[2] = now + retry_after
+            self.redis_rejected += 1
+            return retry_after
+
+        self.allowed += 1
+        return None
+
+    async def _hit_redis(self, policy: RateLimitPolicy, identity: str, cost: int) -> Optional[float]:
+        window_ms = int(policy.window_seconds * 1000)
+        now_ms = int(time.time() * 1000)
+        window_index, elapsed_ms = divmod(now_ms, window_ms)
+        key = f"{RATE_LIMIT_PREFIX}{policy.name}:{identity}:"
+
+        try:
+            allowed, value = await self._script(
+                keys=[f"{key}{window_index}", f"{key}{window_index - 1}"],
+                args=[policy.limit, window_ms, elapsed_ms, cost],
+            )
+        except redis.exceptions.RedisError:
+            return None
+
+        if allowed:
+            return None
+        return max(int(value), 1) / 1000
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "allowed": self.allowed,
+            "local_rejected": self.local_rejected,
+            "redis_rejected": self.redis_rejected,
+        }
+
+
+rate_limiter = RateLimiter()
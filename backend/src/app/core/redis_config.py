@@ -1,35 +1,119 @@
+import os
+import time
+
 import redis
-from fastapi import FastAPI
+import redis.asyncio as aioredis
+
+from app.core.metrics import record_redis
 
-# Redis 연결 설정
-REDIS_HOST = "localhost"
-REDIS_PORT = 6379
-REDIS_DB = 0
-REDIS_PASSWORD = None
+# Redis 연결 설정 (환경변수로 변경 가능)
+REDIS_HOST = os.getenv("REDIS_HOST", "localhost")
+REDIS_PORT = int(os.getenv("REDIS_PORT", "6379"))
+REDIS_DB = int(os.getenv("REDIS_DB", "0"))
+REDIS_PASSWORD = os.getenv("REDIS_PASSWORD")
 
-# Redis 클라이언트
-redis_client = redis.Redis(
+# 커넥션 풀 설정
+# REDIS_MAX_CONNECTIONS: 프로세스 하나가 동시에 열 수 있는 최대 연결 수. 모두 사용 중이면 REDIS_POOL_TIMEOUT초 동안 반납을 기다립니다.
+# REDIS_SOCKET_TIMEOUT: 명령 하나의 응답을 기다리는 최대 시간(초). Redis가 멈춰도 요청이 무한정 묶이지 않게 합니다.
+# REDIS_HEALTH_CHECK_INTERVAL: 이 시간(초) 이상 쉬었던 연결은 사용 전에 PING으로 살아있는지 확인합니다.
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", "50"))
+REDIS_POOL_TIMEOUT = float(os.getenv("REDIS_POOL_TIMEOUT", "5"))
+REDIS_SOCKET_TIMEOUT = float(os.getenv("REDIS_SOCKET_TIMEOUT", "2"))
+REDIS_SOCKET_CONNECT_TIMEOUT = float(os.getenv("REDIS_SOCKET_CONNECT_TIMEOUT", "2"))
+REDIS_HEALTH_CHECK_INTERVAL = int(os.getenv("REDIS_HEALTH_CHECK_INTERVAL", "30"))
+
+_pool_options = dict(
     host=REDIS_HOST,
     port=REDIS_PORT,
     db=REDIS_DB,
     password=REDIS_PASSWORD,
-    decode_responses=True  # 문자열 응답을 자동으로 디코딩
+    max_connections=REDIS_MAX_CONNECTIONS,
+    timeout=REDIS_POOL_TIMEOUT,
+    socket_timeout=REDIS_SOCKET_TIMEOUT,
+    socket_connect_timeout=REDIS_SOCKET_CONNECT_TIMEOUT,
+    health_check_interval=REDIS_HEALTH_CHECK_INTERVAL,
+    decode_responses=True,  # 문자열 응답을 자동으로 디코딩
 )
 
-def init_redis(app: FastAPI):
+# 명령마다 실행 시간을 재서 메트릭과 현재 요청의 Server-Timing에 더하는 클라이언트
+# 파이프라인은 명령을 모아서 한 번에 보내므로 execute 한 번을 PIPELINE 명령 하나로 기록합니다.
+# (pub/sub 구독 연결은 메시지를 기다리는 시간이 대부분이라서 기록하지 않습니다.)
+class InstrumentedPipeline(redis.client.Pipeline):
+    def execute(self, raise_on_error=True):
+        started = time.perf_counter()
+        try:
+            return super().execute(raise_on_error)
+        finally:
+            record_redis("PIPELINE", time.perf_counter() - started)
+
+
+class InstrumentedRedis(redis.Redis):
+    def execute_command(self, *args, **options):
+        started = time.perf_counter()
+        try:
+            return super().execute_command(*args, **options)
+        finally:
+            record_redis(args[0], time.perf_counter() - started)
+
+    def pipeline(self, transaction=True, shard_hint=None):
+        return InstrumentedPipeline(
+            self.connection_pool, self.response_callbacks, transaction, shard_hint
+        )
+
+
+class AsyncInstrumentedPipeline(aioredis.client.Pipeline):
+    async def execute(self, raise_on_error=True):
+        started = time.perf_counter()
+        try:
+            return await super().execute(raise_on_error)
+        finally:
+            record_redis("PIPELINE", time.perf_counter() - started)
+
+
+class AsyncInstrumentedRedis(aioredis.Redis):
+    async def execute_command(self, *args, **options):
+        started = time.perf_counter()
+        try:
+            return await super().execute_command(*args, **options)
+        finally:
+            record_redis(args[0], time.perf_counter() - started)
+
+    def pipeline(self, transaction=True, shard_hint=None):
+        return AsyncInstrumentedPipeline(
+            self.connection_pool, self.response_callbacks, transaction, shard_hint
+        )
+
+
+# 동기 Redis 클라이언트 (쓰레드에서 실행되는 코드용)
+# BlockingConnectionPool: 연결이 모두 사용 중이면 에러를 내는 대신 반납될 때까지 기다립니다.
+redis_pool = redis.BlockingConnectionPool(**_pool_options)
+redis_client = InstrumentedRedis(connection_pool=redis_pool)
+
+# 비동기 Redis 클라이언트 (async def 요청 처리 코드용)
+# await로 응답을 기다리는 동안 이벤트 루프가 다른 요청을 처리할 수 있어서 쓰레드를 붙잡지 않습니다.
+async_redis_pool = aioredis.BlockingConnectionPool(**_pool_options)
+async_redis_client = AsyncInstrumentedRedis(connection_pool=async_redis_pool)
+
+
+# FastAPI lifespan에서 호출합니다.
+async def init_redis():
     """
-    FastAPI 앱에 Redis 클라이언트 연결
+    서버 시작 시 Redis 연결 확인
     """
-    @app.on_event("startup")
-    async def startup_redis_client():
-        try:
-            # Redis 연결 테스트
-            redis_client.ping()
-            print("Redis connection established")
-        except redis.exceptions.ConnectionError:
-            print("Failed to connect to Redis")
-    
-    @app.on_event("shutdown")
-    async def shutdown_redis_client():
-        redis_client.close()
-        print("Redis connection closed")
\ No newline at end of file
+    try:
+        # Redis 연결 테스트
+        await async_redis_client.ping()
+        print("Redis connection established")
+    except redis.exceptions.RedisError:
+        print("Failed to connect to Redis")
+
+
+async def close_redis():
+    """
+    서버 종료 시 Redis 연결 정리
+    """
+    await async_redis_client.aclose()
+    await async_redis_pool.disconnect()
+    redis_client.close()
+    redis_pool.disconnect()
+    print("Redis connection closed")
@@ -0,0 +1,45 @@
+import os
+
+# 템플릿 설정
+# TEMPLATE_DIR: HTML 템플릿 폴더 (기본값: src/templates)
+# TEMPLATE_CACHE_DIR: 컴파일한 템플릿(바이트코드)을 저장할 폴더. 비워두면 시스템 임시 폴더를 씁니다.
+#                     이미지 빌드 때 build.py로 미리 채워두면 워커가 새로 뜰 때 템플릿을 다시 파싱하지 않습니다.
+# TEMPLATE_AUTO_RELOAD: true면 렌더링할 때마다 파일이 바뀌었는지 확인합니다. (개발용)
+#                       운영에서는 false로 두어 요청마다 파일 상태를 확인(stat)하지 않게 합니다.
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+TEMPLATE_DIR = os.getenv("TEMPLATE_DIR", os.path.join(BASE_DIR, "templates"))
+TEMPLATE_CACHE_DIR = os.getenv("TEMPLATE_CACHE_DIR") or None
+TEMPLATE_AUTO_RELOAD = os.getenv("TEMPLATE_AUTO_RELOAD", "true").lower() == "true"
+
+_templates = None
+
+
+# 모든 라우터가 함께 쓰는 템플릿 (라우터마다 따로 만들면 같은 템플릿을 각자 컴파일해서 캐시합니다)
+# HTML 페이지는 API 요청보다 드물게 쓰이므로 jinja2는 처음 페이지를 요청받을 때 import합니다. (서버 시작 시간 단축)
+# FileSystemBytecodeCache: 컴파일 결과를 파일로 저장해서 다른 워커나 재시작한 프로세스가 그대로 읽어 씁니다.
+def get_templates():
+    global _templates
+    if _templates is None:
+        import jinja2
+        from fastapi.templating import Jinja2Templates
+
+        if TEMPLATE_CACHE_DIR:
+            os.makedirs(TEMPLATE_CACHE_DIR, exist_ok=True)
+        env = jinja2.Environment(
+            loader=jinja2.FileSystemLoader(TEMPLATE_DIR),
+            autoescape=jinja2.select_autoescape(),
+            auto_reload=TEMPLATE_AUTO_RELOAD,
+            bytecode_cache=jinja2.FileSystemBytecodeCache(TEMPLATE_CACHE_DIR),
+        )
+        _templates = Jinja2Templates(env=env)
+    return _templates
+
+
+# 모든 템플릿을 미리 컴파일해서 메모리(와 바이트코드 캐시)에 올려둡니다.
+# 빌드 때(build.py) 또는 STARTUP_WARMUP을 켰을 때 서버 시작 시 호출합니다.
+def precompile_templates() -> int:
+    env = get_templates().env
+    names = env.list_templates()
+    for name in names:
+        env.get_template(name)
+    return len(names)
@@ -0,0 +1,109 @@
+import asyncio
+from typing import Awaitable, Callable, Optional, TypeVar
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+T = TypeVar("T")
+
+# 쓰기 작업: 세션을 받아서 INSERT/UPDATE/DELETE를 실행하는 함수. commit은 큐가 대신 합니다.
+WriteJob = Callable[[AsyncSession], Awaitable[T]]
+
+
+# SQLite 전용 단일 쓰기(single-writer) 큐
+# SQLite는 파일 하나에 쓰기 잠금이 하나뿐이라서 여러 요청이 동시에 쓰면 서로 잠금을 기다리다가
+# "database is locked" 에러가 나기도 합니다.
+# 그래서 쓰기 작업은 모두 이 큐에 넣고, 백그라운드 작업 하나가 순서대로 처리합니다.
+# - 큐에 여러 작업이 쌓여 있으면 한 트랜잭션으로 묶어서 commit(fsync)을 한 번만 합니다. (group commit)
+# - 묶음 중 하나가 실패하면 묶음 전체를 되돌리고, 작업을 하나씩 따로 다시 실행해서 나머지 작업은 살립니다.
+# - 읽기(SELECT)는 큐를 거치지 않으므로 WAL 모드에서 계속 동시에 처리됩니다.
+class WriteQueue:
+    def __init__(self, session_factory: async_sessionmaker, max_batch: int = 64):
+        self.session_factory = session_factory
+        self.max_batch = max_batch
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        # 처리한 작업 수 / commit 횟수. 두 값의 비율이 한 번의 commit에 묶인 평균 작업 수입니다.
+        self.jobs = 0
+        self.commits = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    async def submit(self, job: WriteJob) -> T:
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((job, future))
+        return await future
+
+    async def _run(self):
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+
+            # 이미 쌓여 있는 작업은 기다리지 않고 최대 max_batch개까지 함께 가져옵니다.
+            while len(batch) < self.max_batch and not self._queue.empty():
+                item = self._queue.get_nowait()
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            await self._execute(batch)
+
+    async def _execute(self, batch):
+        try:
+            async with self.session_factory() as session:
+                results = []
+                for job, _ in batch:
+                    results.append(await job(session))
+                    # 묶음의 작업들은 한 세션을 함께 쓰므로, 앞 작업이 읽은 객체가 identity map에 남아 있으면
+                    # 뒤 작업의 UPDATE ... RETURNING이 DB의 새 값 대신 그 (예전 값의) 객체를 돌려받습니다.
+                    # 작업이 끝날 때마다 반영(flush)하고 세션에서 떼어내서 작업끼리 객체를 공유하지 않게 합니다.
+                    await session.flush()
+                    session.expunge_all()
+                await session.commit()
+        except Exception as exc:
+            if len(batch) == 1:
+                _, future = batch[0]
+                if not future.done():
+                    future.set_exception(exc)
+                return
+
+            # 어떤 작업이 실패했는지 모르므로 하나씩 따로 실행합니다.
+            for item in batch:
+                await self._execute([item])
+            return
+
+        self.jobs += len(batch)
+        self.commits += 1
+        for (_, future), result in zip(batch, results):
+            # 요청이 취소(클라이언트 연결 종료 등)되어 이미 끝난 future는 건너뜁니다.
+            if not future.done():
+                future.set_result(result)
+
+    # FastAPI lifespan에서 호출합니다.
+    async def start(self):
+        if self._task is None:
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._run())
+
+    # 종료 시 큐에 남은 작업까지 처리한 뒤 멈춥니다. (None은 "여기까지 처리하고 종료"하라는 표시)
+    async def stop(self):
+        if self._task is None:
+            return
+
+        # running이 바로 False가 되도록 먼저 비워서, 이후 쓰기는 큐를 거치지 않고 직접 처리되게 합니다.
+        task, self._task = self._task, None
+        await self._queue.put(None)
+        await task
+
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "jobs": self.jobs,
+            "commits": self.commits,
+        }
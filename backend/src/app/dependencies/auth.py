@@ -1,9 +1,10 @@
 from fastapi import Depends, HTTPException
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.database import get_db
 from app.models.user import User
 from app.services.token_service import TokenService
+from app.services.user_service import user_cache, user_cache_key
 from app.utils.auth import verify_token
 from sqlalchemy import select
 
@@ -15,17 +16,17 @@ bearer_scheme = HTTPBearer()
 
 # JWT(JSON Web Token) 등을 활용해 현재 로그인한 "사용자를 식별"하는 '의존성 주입(Dependency Injection)' 함수
 # 토큰 추출: credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme) 부분에서 헤더에 담긴 Bearer 토큰을 가져옵니다.
-def get_current_user(
+async def get_current_user(
     # 브라우저나 앱이 보낸 헤더에서 토큰 값만 쏙 뽑아옵니다.
     # 만약 헤더에 토큰이 없으면, 이 시점에서 이미 403 Forbidden 에러를 반환하며 함수 실행을 중단합니다.
     credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     #추출된 HTTPAuthorizationCredentials 객체에서 실제 문자열 형태의 토큰(예: eyJhbG...)만 변수에 담습니다.
     token = credentials.credentials
     
     #만약 블랙리스트에 포함된 토큰이라면  HTTPException 처리
-    if TokenService.is_token_blacklisted(token):
+    if await TokenService.is_token_blacklisted_async(token):
         raise HTTPException(
             status_code=401,
             detail="만료된 토큰입니다.",
@@ -53,10 +54,18 @@ def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    # 캐시 확인: 최근에 조회한 사용자라면 DB를 거치지 않고 바로 반환합니다.
+    # 블랙리스트 확인과 토큰 검증은 매번 하기 때문에 로그아웃한 토큰은 캐시와 상관없이 거절됩니다.
+    cache_key = user_cache_key(payload.get("user_id"), username)
+    user = user_cache.get(cache_key)
+
+    if user is not None:
+        return user
+
     # DB 실재 확인: 추출한 username으로 실제 데이터베이스에서 사용자 정보를 조회합니다.
     query = select(User).where(User.username == username)
-    # DB 실재 확인: 추출한 username으로 실제 데이터베이스에서 사용자 정보를 조회합니다.
-    user = db.execute(query).scalar_one_or_none()
+    result = await db.execute(query)
+    user = result.scalar_one_or_none()
 
     if user is None:
         raise HTTPException(
@@ -65,4 +74,8 @@ def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    # 요청이 끝나고 세션이 닫혀도 객체를 계속 쓸 수 있도록 세션에서 분리한 뒤 캐시에 저장합니다.
+    db.expunge(user)
+    user_cache.set(cache_key, user)
+
     return user
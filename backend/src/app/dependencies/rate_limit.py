@@ -0,0 +1,88 @@
+import math
+import os
+
+from fastapi import Depends, HTTPException, Request
+
+from app.core.rate_limit import RATE_LIMIT_TRUST_FORWARDED, RateLimitPolicy, rate_limiter
+from app.dependencies.auth import get_current_user
+from app.models.user import User
+
+# 엔드포인트별 제한 정책 (window_seconds 동안 limit번)
+# 로그인: 매번 bcrypt 검증을 하므로 IP마다 제한해서 비밀번호 대입 공격과 CPU 포화를 막습니다.
+# 회원가입: IP마다 제한
+# 게시글 쓰기(생성/수정/삭제): 사용자마다 제한해서 SQLite 쓰기 잠금을 한 사용자가 독차지하지 못하게 합니다.
+# 게시글 일괄 등록: 한 번에 최대 POST_BULK_MAX_SIZE개를 쓰므로 따로 더 낮게 제한합니다.
+LOGIN_RATE_LIMIT = RateLimitPolicy(
+    "login",
+    int(os.getenv("LOGIN_RATE_LIMIT", "10")),
+    float(os.getenv("LOGIN_RATE_WINDOW_SECONDS", "60")),
+    scope="ip",
+)
+REGISTER_RATE_LIMIT = RateLimitPolicy(
+    "register",
+    int(os.getenv("REGISTER_RATE_LIMIT", "5")),
+    float(os.getenv("REGISTER_RATE_WINDOW_SECONDS", "60")),
+    scope="ip",
+)
+POST_WRITE_RATE_LIMIT = RateLimitPolicy(
+    "post_write",
+    int(os.getenv("POST_WRITE_RATE_LIMIT", "60")),
+    float(os.getenv("POST_WRITE_RATE_WINDOW_SECONDS", "60")),
+    scope="user",
+)
+POST_BULK_RATE_LIMIT = RateLimitPolicy(
+    "post_bulk",
+    int(os.getenv("POST_BULK_RATE_LIMIT", "5")),
+    float(os.getenv("POST_BULK_RATE_WINDOW_SECONDS", "60")),
+    scope="user",
+)
+
+# 라우터 데코레이터의 responses에 넣는 429 응답 문서
+RATE_LIMIT_RESPONSE = {
+    429: {
+        "description": "요청 횟수 제한을 넘음 (Retry-After 헤더의 초만큼 기다린 뒤 다시 시도)",
+        "content": {
+            "application/json": {
+                "example": {"detail": "요청이 너무 많습니다. 잠시 후 다시 시도해주세요."}
+            }
+        },
+    }
+}
+
+
+def client_ip(request: Request) -> str:
+    if RATE_LIMIT_TRUST_FORWARDED:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+
+    return request.client.host if request.client else "unknown"
+
+
+async def _check(policy: RateLimitPolicy, identity: str):
+    retry_after = await rate_limiter.hit(policy, identity)
+
+    if retry_after is not None:
+        raise HTTPException(
+            status_code=429,
+            detail="요청이 너무 많습니다. 잠시 후 다시 시도해주세요.",
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
+
+
+# 정책을 받아서 FastAPI 의존성 함수를 만듭니다.
+# 사용 예: @router.post(..., dependencies=[Depends(rate_limit(LOGIN_RATE_LIMIT))])
+# 본문 처리(비밀번호 검증, DB 쓰기)보다 먼저 실행되므로 거절된 요청은 비용이 거의 들지 않습니다.
+# scope="user" 정책은 get_current_user를 함께 쓰는데, 같은 요청 안에서는 FastAPI가 결과를 재사용하므로 인증을 두 번 하지 않습니다.
+def rate_limit(policy: RateLimitPolicy):
+    if policy.scope == "user":
+
+        async def limit_by_user(current_user: User = Depends(get_current_user)):
+            await _check(policy, f"user:{current_user.id}")
+
+        return limit_by_user
+
+    async def limit_by_ip(request: Request):
+        await _check(policy, f"ip:{client_ip(request)}")
+
+    return limit_by_ip
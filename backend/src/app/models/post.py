@@ -1,12 +1,42 @@
-from sqlalchemy import Column, ForeignKey, Integer, String, DateTime, func
-from app.database import Base
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, ForeignKey, Index, Integer, String, DateTime, func
+from sqlalchemy.dialects import sqlite
+from app.database import RELATIONSHIP_LOADING, Base
 from sqlalchemy.orm import relationship
 
 
+# SQLite는 server_default=func.now()(CURRENT_TIMESTAMP)로 "YYYY-MM-DD HH:MM:SS" 형식의 문자열을 저장합니다.
+# SQLAlchemy 기본 포맷은 마이크로초까지 붙여서 비교하기 때문에 커서 비교(created_at = :값)가 어긋납니다.
+# 그래서 SQLite에서는 저장/비교 포맷을 CURRENT_TIMESTAMP와 똑같이 맞춰 둡니다.
+Timestamp = DateTime(timezone=True).with_variant(
+    sqlite.DATETIME(
+        storage_format="%(year)04d-%(month)02d-%(day)02d %(hour)02d:%(minute)02d:%(second)02d"
+    ),
+    "sqlite",
+)
+
+# 수정 시각(updated_at)용 타입
+# 변경분 동기화(GET /posts/changes)에서 정렬/커서 기준으로 쓰므로 같은 초에 여러 번 바뀌어도 순서가 구분되도록
+# SQLite에서도 마이크로초까지 저장합니다. (SQLAlchemy 기본 저장 포맷)
+PreciseTimestamp = DateTime(timezone=True)
+
+
+# updated_at 값. created_at(CURRENT_TIMESTAMP)과 같은 UTC 기준이고, 시간대 정보 없이 저장합니다.
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
 # 테이블의 구조를 정의
 class Post(Base):
     # __tablename__은 모델에 의해 관리되는 테이블의 이름
     __tablename__ = "posts"
+    # 목록 조회(ORDER BY created_at DESC, id DESC)와 커서 조건을 인덱스만으로 처리하기 위한 복합 인덱스
+    # 변경분 조회(ORDER BY change_seq, id)와 커서 조건용 복합 인덱스
+    __table_args__ = (
+        Index("ix_posts_created_at_id", "created_at", "id"),
+        Index("ix_posts_change_seq_id", "change_seq", "id"),
+    )
 
     id = Column(
         Integer, primary_key=True, index=True
@@ -14,7 +44,15 @@ class Post(Base):
 
     title = Column(String)
     content = Column(String)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(Timestamp, server_default=func.now())
+    # 마지막으로 생성/수정된 시각. INSERT/UPDATE 문을 실행할 때 SQLAlchemy가 자동으로 채웁니다.
+    updated_at = Column(PreciseTimestamp, default=utcnow, onupdate=utcnow, index=True)
+    # 낙관적 동시성 제어(optimistic concurrency)용 버전 번호. 수정할 때마다 1씩 올라갑니다.
+    # 게시글 ETag("<id>-<version>")에 들어가며, 수정 요청의 If-Match에 읽었던 ETag를 넣으면 그 사이 다른 사람이 고친 경우 412로 거절됩니다.
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    # 변경 순번. 생성/수정하는 트랜잭션 안에서 PostChangeCounter를 1 올린 값을 넣습니다.
+    # 변경분 조회(GET /posts/changes)는 updated_at 대신 이 값 순서로 읽습니다. (아래 PostChangeCounter 설명 참고)
+    change_seq = Column(Integer, nullable=False, default=0, server_default="0")
 
     # 역할: 물리적으로 두 테이블을 연결합니다.
     # 외래키가 user table의 id를 참조
@@ -26,4 +64,28 @@ class Post(Base):
     # 이 설정 덕분에 post.author_id라는 숫자 대신, **post.author**라고 치면 해당 글을 쓴 User 객체 전체에 바로 접근할 수 있습니다. (예: post.author.username)
     # back_populates="posts": 이는 '양방향' 연결을 의미합니다. User 모델 쪽에도 posts라는 이름의 관계가 설정되어 있어야 하며, 서로를 참조하게 됩니다.
     # 이 파일 내에서 알 수 있듯 테이블 네임이 posts
-    author = relationship("User", back_populates="posts")
+    author = relationship("User", back_populates="posts", lazy=RELATIONSHIP_LOADING)
+
+
+# 작성자별 게시글 목록(GET /users/{id}/posts) 조회용 복합 인덱스
+# WHERE author_id = :id 조건과 ORDER BY created_at DESC, id DESC 정렬, 커서 조건을 모두 이 인덱스 하나로 처리합니다.
+# 인덱스를 앞에서부터 순서대로 읽다가 limit개를 채우면 멈추므로 정렬 작업도, 다른 작성자의 글을 읽는 일도 없습니다.
+# (author_id가 맨 앞에 있어서 외래키 author_id 단독 조회에도 쓰입니다.)
+Index(
+    "ix_posts_author_id_created_at_id",
+    Post.author_id,
+    Post.created_at.desc(),
+    Post.id.desc(),
+)
+
+
+# 게시글 변경 순번 카운터 (행 하나)
+# updated_at은 문장을 실행한 시각이라서, 먼저 시작했지만 늦게 commit한 쓰기의 updated_at이 이미 읽어간 커서보다 앞설 수 있습니다.
+# 그러면 변경분 조회가 그 글을 건너뜁니다. (쓰기 요청이 여러 워커/트랜잭션에서 동시에 들어올 때)
+# 쓰기 트랜잭션이 이 행을 UPDATE해서 순번을 받으면 commit할 때까지 행 잠금을 쥐고 있으므로,
+# 다음 순번은 앞 트랜잭션이 끝난 뒤에야 받을 수 있습니다. 그래서 순번 순서가 곧 commit 순서입니다.
+class PostChangeCounter(Base):
+    __tablename__ = "post_change_counter"
+
+    id = Column(Integer, primary_key=True)
+    value = Column(Integer, nullable=False, default=0)
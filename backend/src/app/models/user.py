@@ -1,5 +1,5 @@
 from sqlalchemy import Column, Integer, String, DateTime, func, ForeignKey
-from app.database import Base
+from app.database import RELATIONSHIP_LOADING, Base
 from sqlalchemy.orm import relationship
 
 
@@ -15,4 +15,5 @@ class User(Base):
 
     author_id = Column(Integer, ForeignKey("users.id"))
 
-    posts = relationship("Post", back_populates="author")
+    # 불러오는 방식은 RELATIONSHIP_LOADING(app/database.py) 설정을 따릅니다.
+    posts = relationship("Post", back_populates="author", lazy=RELATIONSHIP_LOADING)
@@ -3,10 +3,10 @@ from app.database import get_db
 from app.models.user import User
 from app.services.token_service import TokenService
 from app.utils.auth import ACCESS_TOKEN_EXPIRE_MINUTES, create_access_token, create_refresh_token, verify_token
-from app.utils.security import verify_password
+from app.utils.security import password_hasher
 from schemas.auth import LoginRequest
 from sqlalchemy import select
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import Depends
 
 
@@ -16,22 +16,24 @@ from fastapi import Depends
 # 확장성: 서버가 10대로 늘어나도, 똑같은 SECRET_KEY만 가지고 있다면 어떤 서버에서도 유저를 알아볼 수 있습니다.
 # 이제 이 토큰을 받은 클라이언트(프론트엔드)는 보통 브라우저의 로컬 스토리지나 쿠키에 보관했다가, 다음 요청 때 Authorization: Bearer <토큰> 형식으로 서버에 보내게 됩니다.
 class AuthService:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
 
     # 회원인증
-    def authenticate_user(self, login_data: LoginRequest):
+    async def authenticate_user(self, login_data: LoginRequest):
         query = select(User).where(User.email == login_data.email)
 
-        user = self.db.execute(query).scalar_one_or_none()
+        result = await self.db.execute(query)
+        user = result.scalar_one_or_none()
         # DB조회 및 비밀번호 검증
-        if not user or not verify_password(login_data.password, user.password):
+        # bcrypt 검증은 CPU를 오래 쓰므로 별도의 프로세스 풀에서 실행합니다.
+        if not user or not await password_hasher.verify(login_data.password, user.password):
             return None
 
         return user
 
     # 토큰생성
-    def create_user_token(self, user: User):
+    async def create_user_token(self, user: User):
         token_data = {
             "username": user.username,
             "email": user.email,
@@ -49,11 +51,11 @@ class AuthService:
             data=token_data
                                            )
 
-        TokenService.store_refresh_token(user.id,refresh_token)
+        await TokenService.store_refresh_token_async(user.id, refresh_token)
         
         return {"access_token": access_token, "refresh_token":refresh_token, "token_type": "bearer"}
     
-    def refresh_access_token(self, refresh_token:str):
+    async def refresh_access_token(self, refresh_token:str):
         payload = verify_token(refresh_token)
         if not payload:
             return None
@@ -63,7 +65,7 @@ class AuthService:
         if not user_id:
             return None
         
-        is_valid = TokenService.validate_refresh_token(user_id, refresh_token)
+        is_valid = await TokenService.validate_refresh_token_async(user_id, refresh_token)
         if not is_valid:
             return None
         
@@ -71,7 +73,8 @@ class AuthService:
             select(User).
             where(User.id==user_id)
         )
-        user=self.db.execute(query).scalar_one_or_none()
+        result = await self.db.execute(query)
+        user = result.scalar_one_or_none()
         
         if not user:
             return None
@@ -90,5 +93,5 @@ class AuthService:
             "token_type": " bearer"
         }
 
-def get_auth_service(db: Session = Depends(get_db)):
+def get_auth_service(db: AsyncSession = Depends(get_db)):
     return AuthService(db)
@@ -0,0 +1,139 @@
+import asyncio
+import os
+import time
+from typing import Optional
+
+import redis
+
+from app.core.bloom import BloomFilter
+from app.core.redis_config import async_redis_client
+
+# 블랙리스트 블룸 필터 설정
+# BLACKLIST_FILTER_ENABLED: false로 두면 필터 없이 항상 Redis EXISTS로 확인합니다.
+# BLACKLIST_FILTER_CAPACITY: 필터를 만들 때 예상하는 블랙리스트 토큰 수. 실제 수가 더 많으면 재구성할 때 늘어납니다.
+# BLACKLIST_FILTER_FP_RATE: 허용할 오탐률. 오탐이 나면 Redis로 한 번 더 확인하므로 정확성에는 영향이 없습니다.
+# BLACKLIST_FILTER_REBUILD_SECONDS: 만료된 토큰을 털어내기 위해 필터를 새로 만드는 주기(초)
+BLACKLIST_FILTER_ENABLED = os.getenv("BLACKLIST_FILTER_ENABLED", "true").lower() == "true"
+BLACKLIST_FILTER_CAPACITY = int(os.getenv("BLACKLIST_FILTER_CAPACITY", "100000"))
+BLACKLIST_FILTER_FP_RATE = float(os.getenv("BLACKLIST_FILTER_FP_RATE", "0.001"))
+BLACKLIST_FILTER_REBUILD_SECONDS = float(os.getenv("BLACKLIST_FILTER_REBUILD_SECONDS", "600"))
+
+# 다른 워커 프로세스에게 "이 토큰이 블랙리스트에 추가됐다"고 알리는 Redis pub/sub 채널
+BLACKLIST_CHANNEL = "blacklist:events"
+
+
+# Redis의 블랙리스트 키 목록을 각 워커 프로세스 메모리에 블룸 필터로 복사해 두는 클래스
+# 인증 요청 대부분은 블랙리스트에 없는 토큰이므로, 필터가 "없다"고 답하면 Redis 왕복 없이 바로 통과시킵니다.
+# 동기화 방식
+# - 이 워커에서 블랙리스트에 추가한 토큰은 바로 필터에 넣고, pub/sub 채널로 다른 워커에도 알립니다.
+# - 서버가 재시작되면 SCAN으로 Redis의 블랙리스트 키를 모두 읽어서 필터를 다시 만듭니다.
+# - 필터가 준비되기 전이나 Redis 구독이 끊긴 동안에는 ready=False가 되어 항상 Redis로 확인합니다.
+class BlacklistFilter:
+    def __init__(
+        self,
+        key_prefix: str,
+        enabled: bool = BLACKLIST_FILTER_ENABLED,
+        capacity: int = BLACKLIST_FILTER_CAPACITY,
+        fp_rate: float = BLACKLIST_FILTER_FP_RATE,
+        rebuild_seconds: float = BLACKLIST_FILTER_REBUILD_SECONDS,
+    ):
+        self.key_prefix = key_prefix
+        self.enabled = enabled
+        self.capacity = capacity
+        self.fp_rate = fp_rate
+        self.rebuild_seconds = rebuild_seconds
+        self.filter = BloomFilter(capacity, fp_rate)
+        self.ready = False
+        # 재구성(rebuild) 도중에 추가된 토큰을 모아두었다가 새 필터에도 넣어줍니다.
+        self._pending: Optional[list] = None
+        self._task: Optional[asyncio.Task] = None
+        # Redis 조회 없이 "없음"으로 판정한 횟수 / 필터가 "있을 수도 있음"이라서 Redis로 넘긴 횟수
+        self.skipped = 0
+        self.fallthrough = 0
+
+    def add(self, token_id: str) -> None:
+        self.filter.add(token_id)
+        if self._pending is not None:
+            self._pending.append(token_id)
+
+    # False: 확실히 블랙리스트에 없음 / True: Redis로 확인이 필요함
+    def might_contain(self, token_id: str) -> bool:
+        if not (self.enabled and self.ready):
+            return True
+
+        if token_id in self.filter:
+            self.fallthrough += 1
+            return True
+
+        self.skipped += 1
+        return False
+
+    async def rebuild(self) -> None:
+        self._pending = []
+        try:
+            token_ids = [
+                key[len(self.key_prefix):]
+                async for key in async_redis_client.scan_iter(
+                    match=f"{self.key_prefix}*", count=1000
+                )
+            ]
+            token_ids.extend(self._pending)
+
+            # 예상보다 토큰이 많으면 오탐률이 유지되도록 필터 크기를 늘립니다.
+            new_filter = BloomFilter(max(self.capacity, len(token_ids) * 2), self.fp_rate)
+            for token_id in token_ids:
+                new_filter.add(token_id)
+
+            self.filter = new_filter
+            self.ready = True
+        finally:
+            self._pending = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                async with async_redis_client.pubsub() as pubsub:
+                    # 구독을 먼저 시작한 뒤에 필터를 만들어야 그 사이에 추가된 토큰을 놓치지 않습니다.
+                    await pubsub.subscribe(BLACKLIST_CHANNEL)
+                    await self.rebuild()
+                    last_rebuild = time.monotonic()
+
+                    while True:
+                        # timeout을 주면 메시지가 없을 때 None을 반환하므로 주기적으로 재구성 시점을 확인할 수 있습니다.
+                        message = await pubsub.get_message(
+                            ignore_subscribe_messages=True, timeout=1.0
+                        )
+                        if message is not None:
+                            self.add(message["data"])
+
+                        if time.monotonic() - last_rebuild >= self.rebuild_seconds:
+                            await self.rebuild()
+                            last_rebuild = time.monotonic()
+            except redis.exceptions.RedisError:
+                # 구독이 끊긴 동안 다른 워커의 추가 알림을 놓칠 수 있으므로 필터를 쓰지 않고 Redis로 확인합니다.
+                self.ready = False
+                await asyncio.sleep(1)
+
+    # FastAPI lifespan에서 호출합니다.
+    async def start(self) -> None:
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            # 구독 연결 정리가 늦어지더라도 서버 종료가 멈추지 않도록 최대 5초만 기다립니다.
+            await asyncio.wait({self._task}, timeout=5)
+            self._task = None
+        self.ready = False
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "ready": self.ready,
+            "items": self.filter.count,
+            "bits": self.filter.num_bits,
+            "hashes": self.filter.num_hashes,
+            "skipped": self.skipped,
+            "fallthrough": self.fallthrough,
+        }
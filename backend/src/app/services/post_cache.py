@@ -0,0 +1,210 @@
+import asyncio
+import os
+import time
+from typing import Awaitable, Callable, Optional
+
+import redis
+
+from app.core.cache import TTLCache
+from app.core.redis_config import async_redis_client
+from schemas.post import PostResponse
+
+# Redis에 저장할 게시글 캐시 키 접두사 (예: post:v2:12)
+# 응답 형식(PostResponse)이 바뀌면 버전을 올려서 예전 형식으로 캐시된 값을 읽지 않게 합니다.
+POST_CACHE_PREFIX = "post:v2:"
+# Redis에 보관하는 시간(초)
+POST_CACHE_TTL_SECONDS = int(os.getenv("POST_CACHE_TTL_SECONDS", "300"))
+# Redis 앞단의 프로세스 내부 캐시 설정
+# 다른 워커에서 수정/삭제된 내용은 이 시간만큼 늦게 반영될 수 있으므로 짧게 잡습니다.
+POST_LOCAL_CACHE_TTL_SECONDS = float(os.getenv("POST_LOCAL_CACHE_TTL_SECONDS", "5"))
+POST_LOCAL_CACHE_MAXSIZE = int(os.getenv("POST_LOCAL_CACHE_MAXSIZE", "1024"))
+# 수정/삭제 직후 이 시간(초) 동안은 캐시에 다시 쓰지 않습니다. (툼스톤)
+# 수정이 commit되기 전에 DB에서 읽기 시작한 로딩이 invalidate 뒤에 예전 내용을 캐시에 써넣는 것을 막습니다.
+POST_CACHE_TOMBSTONE_SECONDS = float(os.getenv("POST_CACHE_TOMBSTONE_SECONDS", "2"))
+POST_CACHE_TOMBSTONE_PREFIX = f"{POST_CACHE_PREFIX}tombstone:"
+
+# 툼스톤이 없을 때만 캐시에 저장하는 스크립트 (확인과 저장 사이에 다른 워커의 invalidate가 끼어들지 않게 한 번에 실행)
+# KEYS[1]: 캐시 키, KEYS[2]: 툼스톤 키 / ARGV: 값, TTL(초)
+# 반환: 1(저장함) 또는 0(툼스톤이 있어서 저장하지 않음)
+SET_UNLESS_TOMBSTONE_SCRIPT = """
+if redis.call('EXISTS', KEYS[2]) == 1 then
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2])
+return 1
+"""
+
+# 게시글 목록 전체의 버전 번호를 담는 Redis 키
+# 게시글이 생성/수정/삭제될 때마다 1씩 올리고, 목록 응답의 ETag를 이 값으로 만듭니다.
+# 그래서 목록이 바뀌었는지는 DB를 보지 않고 Redis GET 한 번으로 알 수 있습니다.
+POST_LIST_VERSION_KEY = "posts:list_version"
+
+
+# 단일 게시글 조회 응답(PostResponse JSON)을 캐시하는 read-through 캐시
+# 조회 순서: 프로세스 내부 캐시 -> Redis -> DB
+# - 인기 게시글은 프로세스 내부 캐시에서 바로 응답하므로 Redis 왕복도 없습니다.
+# - 캐시가 만료된 순간 같은 게시글 요청이 몰려도(stampede) DB 조회는 한 번만 하고,
+#   나머지 요청은 그 결과를 함께 기다립니다. (single-flight, 워커 프로세스 단위)
+# - 게시글이 수정/삭제되면 PostService에서 invalidate를 호출해 캐시를 지우고 잠시 툼스톤을 남깁니다.
+# - loader는 요청의 DB 세션이 아닌 자신만의 세션을 써야 합니다. 여러 요청이 같은 로딩을 기다리므로,
+#   먼저 요청한 클라이언트의 연결이 끊겨 그 요청의 세션이 닫혀도 로딩은 계속되어야 합니다.
+class PostCache:
+    def __init__(self):
+        self.local = TTLCache(
+            maxsize=POST_LOCAL_CACHE_MAXSIZE, ttl=POST_LOCAL_CACHE_TTL_SECONDS
+        )
+        # post_id -> invalidate한 시각(time.monotonic). 이 시각 전에 시작한 로딩은 캐시에 쓰지 않습니다.
+        self._tombstones = TTLCache(
+            maxsize=POST_LOCAL_CACHE_MAXSIZE, ttl=POST_CACHE_TOMBSTONE_SECONDS
+        )
+        self._set_script = async_redis_client.register_script(SET_UNLESS_TOMBSTONE_SCRIPT)
+        # post_id -> 진행 중인 로딩 작업
+        self._inflight: dict[int, asyncio.Task] = {}
+        self.redis_hits = 0
+        self.redis_misses = 0
+        # 이미 진행 중인 로딩에 합류한(DB 조회를 아낀) 요청 수
+        self.stampede_joins = 0
+        # 목록 버전을 올리지 못한 쓰기가 있었는지 (Redis 장애 등)
+        self._list_version_dirty = False
+        # 툼스톤 때문에 캐시에 쓰지 않은 로딩 수
+        self.stale_writes_skipped = 0
+
+    def _key(self, post_id: int) -> str:
+        return f"{POST_CACHE_PREFIX}{post_id}"
+
+    def _tombstone_key(self, post_id: int) -> str:
+        return f"{POST_CACHE_TOMBSTONE_PREFIX}{post_id}"
+
+    # loader: 캐시에 없을 때 DB에서 게시글을 읽어오는 함수. 게시글이 없으면 None을 반환해야 합니다.
+    async def get_or_load(
+        self, post_id: int, loader: Callable[[], Awaitable]
+    ) -> Optional[str]:
+        cached = self.local.get(post_id)
+        if cached is not None:
+            return cached
+
+        task = self._inflight.get(post_id)
+        if task is None:
+            task = asyncio.ensure_future(self._load(post_id, loader))
+            self._inflight[post_id] = task
+            task.add_done_callback(lambda done: self._forget(post_id, done))
+        else:
+            self.stampede_joins += 1
+
+        # shield: 먼저 요청한 클라이언트의 연결이 끊겨도 함께 기다리는 다른 요청들의 로딩은 취소되지 않게 합니다.
+        return await asyncio.shield(task)
+
+    # invalidate가 이미 새 로딩으로 바꿔둔 경우에는 지우지 않습니다.
+    def _forget(self, post_id: int, task: asyncio.Task):
+        if self._inflight.get(post_id) is task:
+            del self._inflight[post_id]
+
+    async def _load(self, post_id: int, loader: Callable[[], Awaitable]) -> Optional[str]:
+        key = self._key(post_id)
+        started = time.monotonic()
+
+        # Redis에 문제가 있어도 조회 자체는 DB로 계속 처리되도록 Redis 오류는 캐시 미스로 취급합니다.
+        try:
+            data = await async_redis_client.get(key)
+        except redis.exceptions.RedisError:
+            data = None
+
+        if data is not None:
+            self.redis_hits += 1
+            self.local.set(post_id, data)
+            return data
+
+        self.redis_misses += 1
+
+        post = await loader()
+        if post is None:
+            return None
+
+        data = PostResponse.model_validate(post).model_dump_json()
+
+        # 읽는 동안 이 워커에서 invalidate되었다면 읽은 내용이 이미 예전 것일 수 있으므로 응답에만 쓰고 캐시에는 넣지 않습니다.
+        invalidated_at = self._tombstones.get(post_id)
+        if invalidated_at is not None and invalidated_at >= started:
+            self.stale_writes_skipped += 1
+            return data
+
+        # 다른 워커에서 invalidate된 경우는 Redis의 툼스톤으로 확인합니다.
+        try:
+            stored = await self._set_script(
+                keys=[key, self._tombstone_key(post_id)], args=[data, POST_CACHE_TTL_SECONDS]
+            )
+        except redis.exceptions.RedisError:
+            stored = True
+
+        if not stored:
+            self.stale_writes_skipped += 1
+            return data
+
+        self.local.set(post_id, data)
+        return data
+
+    # 게시글이 바뀐 뒤(commit 이후)에 호출합니다.
+    async def invalidate(self, post_id: int):
+        self.local.delete(post_id)
+        self._tombstones.set(post_id, time.monotonic())
+        # 진행 중인 로딩은 예전 내용을 읽었을 수 있으므로, 이후 요청은 거기에 합류하지 않고 새로 읽게 합니다.
+        self._inflight.pop(post_id, None)
+
+        try:
+            async with async_redis_client.pipeline(transaction=True) as pipe:
+                pipe.delete(self._key(post_id))
+                pipe.set(
+                    self._tombstone_key(post_id), 1,
+                    px=max(1, int(POST_CACHE_TOMBSTONE_SECONDS * 1000)),
+                )
+                await pipe.execute()
+        except redis.exceptions.RedisError:
+            pass
+
+    # 목록 버전을 반환합니다. Redis를 쓸 수 없으면 None (이때는 ETag 없이 매번 DB에서 읽습니다)
+    async def list_version(self) -> Optional[str]:
+        try:
+            if self._list_version_dirty:
+                await self._reset_list_version()
+
+            version = await async_redis_client.get(POST_LIST_VERSION_KEY)
+            if version is None:
+                # 처음이거나 Redis가 비워진 경우. 예전 버전 번호와 겹치지 않도록 현재 시각(ns)에서 시작합니다.
+                await async_redis_client.set(POST_LIST_VERSION_KEY, time.time_ns(), nx=True)
+                version = await async_redis_client.get(POST_LIST_VERSION_KEY)
+            return version
+        except redis.exceptions.RedisError:
+            return None
+
+    # 게시글이 바뀐 뒤(commit 이후)에 호출합니다.
+    # commit 전에 올리면 다른 요청이 "새 버전 번호 + 바뀌기 전 목록"을 캐시해버릴 수 있습니다.
+    async def bump_list_version(self):
+        try:
+            if self._list_version_dirty:
+                await self._reset_list_version()
+                return
+
+            async with async_redis_client.pipeline(transaction=True) as pipe:
+                pipe.set(POST_LIST_VERSION_KEY, time.time_ns(), nx=True)
+                pipe.incr(POST_LIST_VERSION_KEY)
+                await pipe.execute()
+        except redis.exceptions.RedisError:
+            # 버전을 못 올리면 클라이언트가 예전 ETag로 304를 받아 바뀐 목록을 못 볼 수 있으므로,
+            # Redis가 돌아오는 대로 버전을 완전히 새 값으로 바꾸도록 표시해 둡니다.
+            self._list_version_dirty = True
+
+    async def _reset_list_version(self):
+        await async_redis_client.set(POST_LIST_VERSION_KEY, time.time_ns())
+        self._list_version_dirty = False
+
+    def stats(self) -> dict:
+        return {
+            "local": self.local.stats(),
+            "redis_hits": self.redis_hits,
+            "redis_misses": self.redis_misses,
+            "stampede_joins": self.stampede_joins,
+            "stale_writes_skipped": self.stale_writes_skipped,
+        }
+
+
+post_cache = PostCache()
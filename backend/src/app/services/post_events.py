@@ -0,0 +1,250 @@
+import asyncio
+import logging
+import os
+from typing import Optional
+
+import orjson
+import redis
+
+from app.core.redis_config import async_redis_client
+
+# 게시글 변경 알림(Server-Sent Events) 설정
+# POST_EVENTS_ENABLED: false로 두면 알림을 발행하지 않고 /posts/stream도 keepalive만 보냅니다.
+# POST_EVENTS_STREAM_MAXLEN: 재연결(Last-Event-ID)할 때 이어받을 수 있도록 Redis Stream에 남겨두는 최근 알림 수 (대략적인 값)
+# POST_EVENTS_QUEUE_SIZE: 연결 하나가 아직 보내지 못하고 쌓아둘 수 있는 알림 수. 넘치면 그 연결을 끊습니다.
+# POST_EVENTS_KEEPALIVE_SECONDS: 알림이 없을 때 프록시가 연결을 끊지 않도록 주석 줄을 보내는 주기(초)
+POST_EVENTS_ENABLED = os.getenv("POST_EVENTS_ENABLED", "true").lower() == "true"
+POST_EVENTS_STREAM_MAXLEN = int(os.getenv("POST_EVENTS_STREAM_MAXLEN", "1000"))
+POST_EVENTS_QUEUE_SIZE = int(os.getenv("POST_EVENTS_QUEUE_SIZE", "100"))
+POST_EVENTS_KEEPALIVE_SECONDS = float(os.getenv("POST_EVENTS_KEEPALIVE_SECONDS", "15"))
+
+# 모든 워커에게 새 알림을 바로 전달하는 Redis pub/sub 채널
+POST_EVENTS_CHANNEL = "posts:events"
+# 최근 알림을 순서대로 보관하는 Redis Stream. 알림 id(Last-Event-ID)는 이 Stream의 entry id입니다. (예: 1700000000000-0)
+POST_EVENTS_STREAM = "posts:events:stream"
+
+# 구독자 큐에 넣는 특별한 값
+# _OVERFLOW: 큐가 넘쳐서 알림을 놓친 연결 -> 끊고 Last-Event-ID로 다시 연결하게 합니다.
+# _CLOSED: 서버 종료
+_OVERFLOW = object()
+_CLOSED = object()
+
+# 알림을 Stream에 추가하고, Redis가 정한 알림 id를 담아 같은 내용을 채널로 발행하는 스크립트
+# PUBLISH에 XADD가 만든 id가 필요해서 파이프라인 대신 스크립트로 Redis 왕복 한 번에 실행합니다.
+# KEYS[1]: Stream, KEYS[2]: 채널 / ARGV: maxlen, event, data(JSON 문자열)
+# 반환: 알림 id
+PUBLISH_SCRIPT = """
+local event_id = redis.call('XADD', KEYS[1], 'MAXLEN', '~', ARGV[1], '*', 'event', ARGV[2], 'data', ARGV[3])
+redis.call('PUBLISH', KEYS[2], cjson.encode({id = event_id, event = ARGV[2], data = ARGV[3]}))
+return event_id
+"""
+
+logger = logging.getLogger(__name__)
+
+
+# Stream entry id("밀리초-순번")를 크기 비교가 되는 튜플로 바꿉니다. 형식이 틀리면 None
+def parse_event_id(event_id: Optional[str]):
+    if not event_id:
+        return None
+
+    ms, _, seq = event_id.strip().partition("-")
+    if not (ms.isdigit() and seq.isdigit()):
+        return None
+    return int(ms), int(seq)
+
+
+# SSE 형식의 알림 하나. event_id가 없는 알림(reset)은 브라우저가 기억하는 Last-Event-ID를 바꾸지 않습니다.
+def _format_event(event_id: Optional[str], event: str, data: str) -> str:
+    if event_id is None:
+        return f"event: {event}\ndata: {data}\n\n"
+    return f"id: {event_id}\nevent: {event}\ndata: {data}\n\n"
+
+
+_RESET = _format_event(None, "reset", "{}")
+
+
+# 게시글 생성/수정/삭제 알림을 SSE 연결들에 나눠주는 클래스 (워커 프로세스마다 하나)
+# - 발행: 알림을 Redis Stream에 추가(XADD)하고, 같은 내용을 pub/sub 채널로 모든 워커에 알립니다.
+# - 배포: 워커마다 채널 구독은 하나만 하고, 받은 알림을 SSE 문자열로 한 번만 만든 뒤 연결마다 있는 큐에 넣습니다.
+#   그래서 연결이 많아져도 Redis 연결 수와 직렬화 비용은 늘어나지 않습니다.
+# - 느린 연결: 큐가 가득 차면 기다리지 않고(다른 연결까지 느려지지 않게) 그 연결을 끊습니다.
+#   브라우저의 EventSource는 자동으로 다시 연결하면서 Last-Event-ID를 보내므로, 놓친 알림은 Stream에서 이어받습니다.
+class PostEventBroker:
+    def __init__(
+        self,
+        enabled: bool = POST_EVENTS_ENABLED,
+        stream_maxlen: int = POST_EVENTS_STREAM_MAXLEN,
+        queue_size: int = POST_EVENTS_QUEUE_SIZE,
+        keepalive_seconds: float = POST_EVENTS_KEEPALIVE_SECONDS,
+    ):
+        self.enabled = enabled
+        self.stream_maxlen = stream_maxlen
+        self.queue_size = queue_size
+        self.keepalive_seconds = keepalive_seconds
+        self._subscribers: set[asyncio.Queue] = set()
+        # 서버 종료가 시작되었는지. 이후에는 새 연결도 바로 끝냅니다.
+        self._closing = False
+        self._task: Optional[asyncio.Task] = None
+        self._publish_script = async_redis_client.register_script(PUBLISH_SCRIPT)
+        self.published = 0
+        # 큐가 넘쳐서 끊은 연결 수
+        self.dropped = 0
+
+    # 게시글이 바뀐 뒤(commit 이후)에 호출합니다.
+    # 알림은 부가 기능이므로 Redis에 문제가 있어도 게시글 쓰기 요청은 실패시키지 않습니다.
+    async def publish(self, event: str, data: dict) -> Optional[str]:
+        if not self.enabled:
+            return None
+
+        payload = orjson.dumps(data).decode()
+        try:
+            event_id = await self._publish_script(
+                keys=[POST_EVENTS_STREAM, POST_EVENTS_CHANNEL],
+                args=[self.stream_maxlen, event, payload],
+            )
+        except redis.exceptions.RedisError:
+            return None
+
+        self.published += 1
+        return event_id
+
+    # 받은 알림을 모든 연결의 큐에 넣습니다. (기다리지 않음)
+    def _fan_out(self, item) -> None:
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait(item)
+            except asyncio.QueueFull:
+                # 쌓인 알림을 비우고 끊으라는 표시만 남깁니다. 이 연결은 더 이상 알림을 받지 않습니다.
+                self._subscribers.discard(queue)
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(_OVERFLOW)
+                self.dropped += 1
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                async with async_redis_client.pubsub() as pubsub:
+                    await pubsub.subscribe(POST_EVENTS_CHANNEL)
+
+                    while True:
+                        message = await pubsub.get_message(
+                            ignore_subscribe_messages=True, timeout=1.0
+                        )
+                        if message is None:
+                            continue
+
+                        # 잘못된 알림 하나 때문에 구독이 멈추지 않도록 그 알림만 건너뜁니다.
+                        try:
+                            body = orjson.loads(message["data"])
+                            item = (
+                                parse_event_id(body["id"]),
+                                _format_event(body["id"], body["event"], body["data"]),
+                            )
+                        except Exception:
+                            logger.exception("잘못된 게시글 변경 알림을 건너뜁니다: %r", message.get("data"))
+                            continue
+                        self._fan_out(item)
+            except redis.exceptions.RedisError:
+                logger.warning("게시글 변경 알림 구독이 끊겨서 다시 연결합니다.", exc_info=True)
+                # 구독이 끊긴 동안의 알림은 연결들이 놓치게 되므로 모두 끊어서 Last-Event-ID로 다시 받게 합니다.
+                self._fan_out(_OVERFLOW)
+                await asyncio.sleep(1)
+
+    # Last-Event-ID 이후의 알림을 Stream에서 읽어서 SSE 문자열로 돌려줍니다.
+    # 보관 기간이 지나 이미 지워진 알림이 있으면 "reset" 알림을 먼저 보내서 목록을 처음부터 다시 읽게 합니다.
+    async def _replay(self, last_id: tuple):
+        try:
+            oldest = await async_redis_client.xrange(POST_EVENTS_STREAM, count=1)
+            entries = await async_redis_client.xrange(
+                POST_EVENTS_STREAM, min=f"{last_id[0]}-{last_id[1]}"
+            )
+        except redis.exceptions.RedisError:
+            return [(None, _RESET)]
+
+        replayed = []
+        if oldest and parse_event_id(oldest[0][0]) > last_id:
+            replayed.append((None, _RESET))
+
+        for event_id, fields in entries:
+            parsed = parse_event_id(event_id)
+            if parsed > last_id:
+                replayed.append((parsed, _format_event(event_id, fields["event"], fields["data"])))
+        return replayed
+
+    # SSE 응답 본문 (StreamingResponse에 넘기는 async generator)
+    # last_event_id: 클라이언트가 마지막으로 받은 알림 id. 있으면 그 뒤의 알림부터 이어서 보냅니다.
+    async def subscribe(self, last_event_id: Optional[tuple] = None):
+        if self._closing:
+            return
+
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        # 다시 보내는(replay) 동안 새로 들어온 알림을 놓치지 않도록 큐를 먼저 등록합니다.
+        self._subscribers.add(queue)
+
+        try:
+            # EventSource가 다시 연결하기 전에 기다리는 시간(ms)
+            yield "retry: 3000\n\n"
+
+            last_sent = last_event_id
+            if last_event_id is not None:
+                for event_id, message in await self._replay(last_event_id):
+                    yield message
+                    if event_id is not None:
+                        last_sent = event_id
+
+            while True:
+                try:
+                    item = await asyncio.wait_for(queue.get(), timeout=self.keepalive_seconds)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+
+                if item is _OVERFLOW or item is _CLOSED:
+                    return
+
+                event_id, message = item
+                # replay에서 이미 보낸 알림은 건너뜁니다.
+                if last_sent is not None and event_id <= last_sent:
+                    continue
+                last_sent = event_id
+                yield message
+        finally:
+            self._subscribers.discard(queue)
+
+    # FastAPI lifespan에서 호출합니다.
+    async def start(self) -> None:
+        self._closing = False
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    # 서버가 종료 신호(SIGTERM 등)를 받았을 때 호출합니다. 열려 있는 SSE 응답을 모두 끝냅니다.
+    # uvicorn은 열려 있는 연결이 모두 끝난 뒤에야 lifespan 종료(stop)를 실행하는데,
+    # SSE 응답은 keepalive를 계속 보내므로 스스로 끝나지 않습니다. 그래서 stop보다 먼저 여기서 끝내야 합니다.
+    # 클라이언트(EventSource)는 다른 워커로 다시 연결하면서 Last-Event-ID로 놓친 알림을 이어받습니다.
+    def close_subscribers(self) -> None:
+        self._closing = True
+        for queue in list(self._subscribers):
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait(_CLOSED)
+        self._subscribers.clear()
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.wait({self._task}, timeout=5)
+            self._task = None
+
+        self.close_subscribers()
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "subscribers": len(self._subscribers),
+            "published": self.published,
+            "dropped": self.dropped,
+        }
+
+
+post_events = PostEventBroker()
@@ -1,87 +1,429 @@
-from sqlalchemy import select
-from sqlalchemy.orm import Session
+import os
+from datetime import datetime
+from typing import List, Optional, Tuple
+import orjson
+from sqlalchemy import and_, delete, insert, or_, select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import Depends, HTTPException
-from app.models.post import Post
+from app.models.post import Post, PostChangeCounter
 from app.models.user import User
-from schemas.post import PostCreate, PostUpdate
-from app.database import get_db
+from app.services.post_cache import post_cache
+from app.services.post_events import post_events
+from schemas.post import PostCreate, PostResponse, PostUpdate
+from app.database import IS_SQLITE, SessionLocal, get_db, run_write
+from app.utils.pagination import FAST_JSON_ENABLED, FAST_JSON_OPTIONS
+from app.utils.search import (
+    POST_SEARCH_CONTENT_WEIGHT,
+    POST_SEARCH_TABLE,
+    POST_SEARCH_TITLE_WEIGHT,
+    SNIPPET_END,
+    SNIPPET_START,
+    build_match_query,
+    highlight,
+)
+
+# 게시글 일괄 등록(POST /posts/bulk) 한 번에 받을 수 있는 최대 게시글 수
+POST_BULK_MAX_SIZE = int(os.getenv("POST_BULK_MAX_SIZE", "1000"))
+# 목록/검색/내보내기에서 읽는 컬럼 (PostResponse의 필드와 같음)
+# ORM 객체(Post)를 만들지 않고 이 컬럼들만 튜플(Row)로 읽으면 객체 생성과 identity map 관리 비용이 없습니다.
+# Row도 row.id처럼 속성으로 접근할 수 있어서 PostResponse(from_attributes) 검증 경로와도 그대로 호환됩니다.
+POST_COLUMNS = (
+    Post.id,
+    Post.author_id,
+    Post.title,
+    Post.content,
+    Post.created_at,
+    Post.updated_at,
+    Post.version,
+)
+
+# 게시글 내보내기(GET /posts/export)에서 DB에서 한 번에 가져와 응답으로 흘려보내는 게시글 수
+POST_EXPORT_BATCH_SIZE = int(os.getenv("POST_EXPORT_BATCH_SIZE", "500"))
 
 
 class PostService:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
 
-    def create_post(self, post: PostCreate, user: User):
-        # 사용자로부터 받은 데이터(Pydantic 모델)를 데이터베이스 테이블 형태(SQLAlchemy 모델)로 변환합니다.
-        # 아직 DB는 이 객체의 존재를 모릅니다.
-        created_post = Post(**post.model_dump())
-        author_id = user.id
-        # userid를 post테이블에 넣기
-        created_post.author_id = author_id
-
-        # DB에 담기
-        # 생성한 객체를 SQLAlchemy의 작업 단위(Session)에 추가
-        self.db.add(created_post)
-        # DB에 확정(Commit) 하기
-        self.db.commit()
-        # DB에서 생성된 ID 등을 반영하기 위해 새로고침(Refresh)
-        self.db.refresh(created_post)
+    async def create_post(self, post: PostCreate, user: User):
+        # 사용자로부터 받은 데이터(Pydantic 모델)에 작성자 id를 붙여서 INSERT할 값을 만듭니다.
+        values = {**post.model_dump(), "author_id": user.id}
+
+        # add -> commit -> refresh(SELECT) 대신 INSERT ... RETURNING 한 문장으로 생성된 id, created_at까지 돌려받습니다.
+        # 쓰기는 run_write를 거쳐서 실행합니다. (SQLite에서는 단일 쓰기 큐에서 다른 쓰기와 묶어서 commit)
+        async def job(db: AsyncSession):
+            change_seq = await _next_change_seq(db)
+            result = await db.execute(
+                insert(Post).values(**values, change_seq=change_seq).returning(Post)
+            )
+            return result.scalar_one()
+
+        created_post = await run_write(self.db, job)
+        await post_cache.bump_list_version()
+        await post_events.publish("created", _event_data(created_post))
 
         return created_post
 
-    def get_posts(self):
+    # 게시글 여러 개를 한 번의 트랜잭션으로 등록
+    # create_post를 글마다 반복하지 않고,
+    # INSERT ... RETURNING id 하나를 executemany로 실행해서 생성된 id만 돌려받습니다.
+    async def create_posts(self, posts: List[PostCreate], user: User):
+        rows = [{**post.model_dump(), "author_id": user.id} for post in posts]
+
+        # sort_by_parameter_order=True: 돌려받는 id 순서를 요청한 게시글 순서와 같게 맞춥니다.
+        query = insert(Post).returning(Post.id, sort_by_parameter_order=True)
+
+        # 한 트랜잭션에서 만든 글들은 같은 변경 순번을 씁니다. (변경분 조회는 순번이 같으면 id 순)
+        async def job(db: AsyncSession):
+            change_seq = await _next_change_seq(db)
+            result = await db.execute(query, [{**row, "change_seq": change_seq} for row in rows])
+            return result.scalars().all()
+
+        post_ids = await run_write(self.db, job)
+        await post_cache.bump_list_version()
+        # 글마다 알림을 보내지 않고 생성된 id 목록만 한 번에 알립니다.
+        await post_events.publish("bulk_created", {"ids": post_ids})
+
+        return post_ids
+
+    # 커서 기반 페이지네이션
+    # cursor: 이전 페이지 마지막 게시글의 (created_at, id). None이면 가장 최신 글부터 조회
+    # limit + 1개를 읽어서 한 개가 더 있으면 "다음 페이지가 있다"고 판단하고, 남는 한 개는 버립니다.
+    # author_id: 주어지면 해당 사용자가 쓴 글만 조회합니다. (ix_posts_author_id_created_at_id 인덱스 사용)
+    async def get_posts(
+        self,
+        cursor: Optional[Tuple[datetime, int]] = None,
+        limit: Optional[int] = 20,
+        author_id: Optional[int] = None,
+    ):
         # SQL의 SELECT * FROM post와 같은 의미입니다. Post라는 DB 모델(테이블)에서 데이터를 가져오겠다는 선언
-        query = select(Post).order_by(Post.created_at.desc())
+        # created_at이 같은 글이 여러 개일 수 있으므로 id를 두 번째 정렬 기준으로 써서 순서를 고정합니다.
+        query = select(*POST_COLUMNS).order_by(Post.created_at.desc(), Post.id.desc())
+
+        if author_id is not None:
+            query = query.where(Post.author_id == author_id)
+
+        if cursor is not None:
+            created_at, post_id = cursor
+            # (created_at, id) < (커서의 created_at, 커서의 id) 조건. ix_posts_created_at_id 인덱스를 그대로 탑니다.
+            query = query.where(
+                or_(
+                    Post.created_at < created_at,
+                    and_(Post.created_at == created_at, Post.id < post_id),
+                )
+            )
+
+        # limit이 None이면 페이지로 나누지 않고 전체를 읽습니다. (GET /posts/posts/의 예전 응답 형식)
+        if limit is None:
+            result = await self.db.execute(query)
+            return result.all(), False
+
         # 작성한 쿼리문을 DB에 실행
-        posts = self.db.execute(query).scalars().all()
+        result = await self.db.execute(query.limit(limit + 1))
+        posts = result.all()
+
+        has_next = len(posts) > limit
+
+        return posts[:limit], has_next
+
+    # 변경분 조회 (증분 동기화)
+    # 생성/수정된 게시글을 변경 순번(change_seq, id) 오름차순으로 limit개씩 읽습니다.
+    # 순번은 commit 순서대로 매겨지므로(PostChangeCounter), 커서 뒤에 늦게 commit된 변경이 끼어들어 빠지는 일이 없습니다.
+    # cursor: 이전 응답에서 마지막으로 받은 게시글의 (change_seq, id). 있으면 since 대신 사용합니다.
+    # since: 처음 동기화할 때의 시작 시각. 이 시각 이후에 수정된(updated_at) 글부터 읽습니다.
+    # ix_posts_change_seq_id 인덱스를 타므로 바뀐 글만 읽고, 게시판 전체를 다시 읽지 않습니다.
+    # 반환: (게시글 목록, 더 있는지, 마지막 게시글의 (change_seq, id) 또는 None)
+    async def get_changes(
+        self,
+        since: Optional[datetime] = None,
+        cursor: Optional[Tuple[int, int]] = None,
+        limit: int = 20,
+    ):
+        query = select(*POST_COLUMNS, Post.change_seq).order_by(Post.change_seq, Post.id)
 
-        return posts
+        if cursor is not None:
+            change_seq, post_id = cursor
+            query = query.where(
+                or_(
+                    Post.change_seq > change_seq,
+                    and_(Post.change_seq == change_seq, Post.id > post_id),
+                )
+            )
+        elif since is not None:
+            query = query.where(Post.updated_at > since)
 
-    def get_post(self, post_id: int):
+        result = await self.db.execute(query.limit(limit + 1))
+        rows = result.all()
+        page = rows[:limit]
+
+        last_position = (page[-1].change_seq, page[-1].id) if page else None
+        # 응답에는 순번을 내보내지 않습니다. (커서로만 전달)
+        posts = [{column.key: getattr(row, column.key) for column in POST_COLUMNS} for row in page]
+
+        return posts, len(rows) > limit, last_position
+
+    # 게시글 검색
+    # SQLite: FTS5 역색인(posts_fts)에서 검색어가 들어있는 글만 바로 찾고, BM25 관련도 순으로 정렬합니다.
+    #         LIKE '%검색어%'처럼 모든 글을 처음부터 끝까지 훑지 않으므로 글이 많아져도 빠릅니다.
+    # 그 외 DB: FTS5가 없으므로 제목/본문 LIKE 조회(최신순)로 대신합니다. 이 경우 snippet과 score는 None
+    # 관련도 순서에는 커서로 쓸 만한 고정 값이 없어서 offset 방식으로 페이지를 나눕니다.
+    async def search_posts(self, q: str, limit: int = 20, offset: int = 0):
+        match = build_match_query(q)
+        if match is None:
+            return [], False
+
+        if not IS_SQLITE:
+            return await self._search_posts_like(q, limit, offset)
+
+        # snippet(테이블, 컬럼 번호, 시작 표시, 끝 표시, 생략 표시, 최대 단어 수)
+        query = text(
+            f"""
+            SELECT posts.id, posts.author_id, posts.title, posts.content, posts.created_at,
+                   posts.updated_at, posts.version,
+                   snippet({POST_SEARCH_TABLE}, 0, :mark_start, :mark_end, '…', 8) AS title_snippet,
+                   snippet({POST_SEARCH_TABLE}, 1, :mark_start, :mark_end, '…', 16) AS content_snippet,
+                   bm25({POST_SEARCH_TABLE}, :title_weight, :content_weight) AS score
+            FROM {POST_SEARCH_TABLE}
+            JOIN posts ON posts.id = {POST_SEARCH_TABLE}.rowid
+            WHERE {POST_SEARCH_TABLE} MATCH :match
+            ORDER BY score, posts.id DESC
+            LIMIT :limit OFFSET :offset
+            """
+        ).columns(created_at=Post.created_at.type, updated_at=Post.updated_at.type)
+
+        result = await self.db.execute(
+            query,
+            {
+                "match": match,
+                "mark_start": SNIPPET_START,
+                "mark_end": SNIPPET_END,
+                "title_weight": POST_SEARCH_TITLE_WEIGHT,
+                "content_weight": POST_SEARCH_CONTENT_WEIGHT,
+                "limit": limit + 1,
+                "offset": offset,
+            },
+        )
+        rows = result.mappings().all()
+
+        items = [
+            {
+                **row,
+                "title_snippet": highlight(row["title_snippet"]),
+                "content_snippet": highlight(row["content_snippet"]),
+            }
+            for row in rows[:limit]
+        ]
+
+        return items, len(rows) > limit
+
+    async def _search_posts_like(self, q: str, limit: int, offset: int):
+        conditions = [
+            or_(
+                Post.title.contains(term, autoescape=True),
+                Post.content.contains(term, autoescape=True),
+            )
+            for term in q.split()
+        ]
+        query = (
+            select(*POST_COLUMNS)
+            .where(and_(*conditions))
+            .order_by(Post.created_at.desc(), Post.id.desc())
+            .limit(limit + 1)
+            .offset(offset)
+        )
+        result = await self.db.execute(query)
+        posts = result.all()
+
+        return posts[:limit], len(posts) > limit
+
+    async def get_post(self, post_id: int):
         query = select(Post).where(Post.id == post_id)
-        post = self.db.execute(query).scalar_one_or_none()
+        result = await self.db.execute(query)
+        post = result.scalar_one_or_none()
 
         return post
 
-    def update_post(self, post_id: int, post_update: PostUpdate, user: User):
-        query = select(Post).where(Post.id == post_id)
-        post = self.db.execute(query).scalar_one_or_none()
+    # 캐시를 거쳐서 게시글을 PostResponse JSON 문자열로 반환합니다. 게시글이 없으면 None
+    # 캐시 로딩은 여러 요청이 함께 기다리므로 이 요청의 세션(self.db)이 아닌 별도 세션에서 읽습니다.
+    async def get_post_json(self, post_id: int):
+        return await post_cache.get_or_load(post_id, lambda: _load_post(post_id))
 
-        if post is None:
-            return None
+    # 목록 ETag에 쓰는 게시글 목록 버전. Redis를 쓸 수 없으면 None
+    async def get_list_version(self):
+        return await post_cache.list_version()
+
+    # 수정/삭제할 글을 찾지 못했을 때, "글이 없는 것(404)"인지 "남의 글이라서 조건에 안 맞은 것(403)"인지,
+    # "그 사이 다른 요청이 먼저 수정해서 버전이 달라진 것(412)"인지 구분합니다.
+    # 기본키로 한 행만 읽는 가벼운 조회라서 실패한 경우에만 한 번 더 실행됩니다.
+    async def _raise_if_forbidden(self, post_id: int, user: User):
+        result = await self.db.execute(
+            select(Post.author_id, Post.version).where(Post.id == post_id)
+        )
+        row = result.one_or_none()
 
-        if post.author_id != user.id:
+        if row is None:
+            return
+
+        if row.author_id != user.id:
             raise HTTPException(status_code=403, detail="접근 권한 없습니다.")
 
+        raise HTTPException(
+            status_code=412,
+            detail="다른 요청이 먼저 게시글을 수정했습니다. 최신 내용을 다시 읽어주세요.",
+        )
+
+    # 게시글을 먼저 SELECT로 읽어와서 작성자를 비교하고, 수정 후 다시 SELECT(refresh)하던 방식 대신
+    # UPDATE ... WHERE id = :id AND author_id = :user_id RETURNING ... 한 문장으로 권한 확인, 수정, 결과 조회를 끝냅니다.
+    # DB 왕복이 줄어들고, SQLite에서 쓰기 잠금을 잡고 있는 시간도 짧아집니다.
+    # expected_versions가 주어지면 "version이 그 값 중 하나일 때만 수정"하는 compare-and-swap(CAS)이 됩니다. (If-Match)
+    # 행 잠금(SELECT ... FOR UPDATE) 없이 UPDATE 한 문장의 WHERE 조건만으로 동시 수정을 막습니다.
+    async def update_post(
+        self,
+        post_id: int,
+        post_update: PostUpdate,
+        user: User,
+        expected_versions: Optional[list[int]] = None,
+    ):
         update_dict = {
             key: value
             for key, value in post_update.model_dump().items()
             if value is not None
         }
 
-        for key, value in update_dict.items():
-            setattr(post, key, value)
+        conditions = [Post.id == post_id, Post.author_id == user.id]
+        if expected_versions is not None:
+            conditions.append(Post.version.in_(expected_versions))
 
-        self.db.commit()
-        self.db.refresh(post)
+        # 바꿀 값이 없으면 UPDATE 없이 본인 글인지(와 버전이 맞는지)만 확인해서 그대로 돌려줍니다.
+        if not update_dict:
+            post = (await self.db.execute(select(Post).where(*conditions))).scalar_one_or_none()
 
-        return post
+            if post is None:
+                await self._raise_if_forbidden(post_id, user)
 
-    def delete_post(self, post_id: int, user: User):
-        query = select(Post).where(Post.id == post_id)
-        post = self.db.execute(query).scalar_one_or_none()
+            return post
+
+        query = (
+            update(Post)
+            .where(*conditions)
+            .values(**update_dict, version=Post.version + 1)
+            .returning(Post)
+            # 세션에 이미 같은 게시글 객체가 있어도 RETURNING으로 받은 새 값으로 덮어씁니다.
+            .execution_options(synchronize_session=False, populate_existing=True)
+        )
+
+        async def job(db: AsyncSession):
+            change_seq = await _next_change_seq(db)
+            result = await db.execute(query.values(change_seq=change_seq))
+            return result.scalar_one_or_none()
+
+        post = await run_write(self.db, job)
 
         if post is None:
-            return False
+            await self._raise_if_forbidden(post_id, user)
+            return None
 
-        if post.author_id != user.id:
-            raise HTTPException(status_code=403, detail="접근 권한 없습니다.")
+        # 수정된 게시글의 캐시를 지워서 다음 조회 때 새 내용을 읽도록 하고, 목록 버전도 올립니다.
+        await post_cache.invalidate(post_id)
+        await post_cache.bump_list_version()
+        await post_events.publish("updated", _event_data(post))
+
+        return post
 
-        self.db.delete(post)
-        self.db.commit()
+    # DELETE ... WHERE id = :id AND author_id = :user_id RETURNING id 한 문장으로 삭제합니다.
+    async def delete_post(self, post_id: int, user: User):
+        query = (
+            delete(Post)
+            .where(Post.id == post_id, Post.author_id == user.id)
+            .returning(Post.id)
+            .execution_options(synchronize_session=False)
+        )
+
+        async def job(db: AsyncSession):
+            result = await db.execute(query)
+            return result.scalar_one_or_none()
+
+        deleted_id = await run_write(self.db, job)
+
+        if deleted_id is None:
+            await self._raise_if_forbidden(post_id, user)
+            return False
+
+        await post_cache.invalidate(post_id)
+        await post_cache.bump_list_version()
+        await post_events.publish("deleted", {"id": post_id})
 
         return True
 
 
-def get_post_service(db: Session = Depends(get_db)):
+# 게시글 변경 순번을 하나 받습니다. 게시글을 생성/수정하는 쓰기 작업(job) 안에서, 같은 트랜잭션으로 호출합니다.
+# 카운터 행의 잠금은 commit할 때까지 유지되어 다른 쓰기 트랜잭션의 순번 받기를 기다리게 하므로,
+# 잠금을 쥐는 시간이 짧도록 트랜잭션 안에서 다른 조회를 하지 않는 쓰기 작업에서만 씁니다.
+# 글이 수정되지 않더라도(조건 불일치) 순번 하나가 건너뛰어질 뿐 순서에는 영향이 없습니다.
+async def _next_change_seq(db: AsyncSession) -> int:
+    result = await db.execute(
+        update(PostChangeCounter)
+        .where(PostChangeCounter.id == 1)
+        .values(value=PostChangeCounter.value + 1)
+        .returning(PostChangeCounter.value)
+    )
+    return result.scalar_one()
+
+
+# 게시글 변경 알림(/posts/stream)에 담을 게시글 내용 (PostResponse와 같은 형식)
+def _event_data(post) -> dict:
+    return PostResponse.model_validate(post).model_dump(mode="json")
+
+
+# 게시글 캐시(post_cache)의 loader. 요청 세션과 상관없이 이 함수 안에서 세션을 열고 닫습니다.
+async def _load_post(post_id: int):
+    async with SessionLocal() as db:
+        return await PostService(db).get_post(post_id)
+
+
+# 게시글 전체 내보내기 (StreamingResponse에 넘기는 async generator)
+# 전체 목록을 리스트로 만들어서 한 번에 JSON으로 바꾸지 않고, DB에서 batch_size개씩 읽어서 바로 응답으로 흘려보냅니다.
+# 메모리에는 항상 한 묶음만 올라가므로 게시글이 아무리 많아도 메모리 사용량이 일정하고, 첫 묶음을 읽자마자 전송이 시작됩니다.
+# - fmt="ndjson": 한 줄에 게시글 하나(JSON)씩. 받는 쪽도 한 줄씩 처리할 수 있습니다.
+# - fmt="json": 하나의 JSON 배열. 조각(chunk)으로 나눠 보내지만 받는 쪽에서 모두 합치면 일반 JSON 배열입니다.
+# id 오름차순으로 내보내므로, 중간에 끊기면 마지막으로 받은 게시글 id를 after_id로 넘겨 이어받을 수 있습니다.
+# 응답을 보내는 동안 계속 DB를 읽어야 하므로 요청 세션(get_db) 대신 이 함수 안에서 세션을 직접 엽니다.
+async def export_posts(
+    after_id: Optional[int] = None,
+    fmt: str = "ndjson",
+    batch_size: int = POST_EXPORT_BATCH_SIZE,
+):
+    # ORM 객체 대신 필요한 컬럼만 튜플(Row)로 읽어서 세션의 identity map에 객체가 쌓이지 않게 합니다.
+    query = select(*POST_COLUMNS).order_by(Post.id)
+    if after_id is not None:
+        query = query.where(Post.id > after_id)
+
+    separator = "\n" if fmt == "ndjson" else ","
+    first = True
+
+    if fmt == "json":
+        yield "["
+
+    async with SessionLocal() as db:
+        # yield_per: 결과를 한꺼번에 가져오지 않고 batch_size개씩 나눠 가져옵니다. (서버 측 커서)
+        result = await db.stream(query.execution_options(yield_per=batch_size))
+
+        async for rows in result.partitions():
+            if FAST_JSON_ENABLED:
+                lines = [orjson.dumps(row._asdict(), option=FAST_JSON_OPTIONS).decode() for row in rows]
+            else:
+                lines = [PostResponse.model_validate(row).model_dump_json() for row in rows]
+            chunk = separator.join(lines)
+
+            if fmt == "ndjson":
+                yield chunk + "\n"
+            else:
+                yield chunk if first else "," + chunk
+            first = False
+
+    if fmt == "json":
+        yield "]"
+
+
+def get_post_service(db: AsyncSession = Depends(get_db)):
     return PostService(db)
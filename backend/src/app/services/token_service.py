@@ -1,35 +1,75 @@
 from datetime import time, timedelta
-from app.utils.auth import ACCESS_TOKEN_EXPIRE_MINUTES, ALGORITHM, REFRESH_TOKEN_EXPIRE_DAYS, SECRET_KEY
-from app.core.redis_config import redis_client
+from app.utils.auth import ACCESS_TOKEN_EXPIRE_MINUTES, ALGORITHM, REFRESH_TOKEN_EXPIRE_DAYS, SECRET_KEY, verify_token
+from app.core.redis_config import async_redis_client, redis_client
+from app.services.blacklist_filter import BLACKLIST_CHANNEL, BlacklistFilter
 from jose import jwt
 
 # Redis 내의 다른 데이터와 섞이지 않도록 식별자(Prefix)를 붙입니다. (예: blacklist:abcd123...)
-TOKEN_BLACKLIST_PREFIX = "blacklist"
+# 토큰 전체(수백 바이트) 대신 토큰의 고유 ID(jti, 16자)를 키로 사용해서 Redis 메모리와 해싱 비용을 줄입니다.
+TOKEN_BLACKLIST_PREFIX = "blacklist:"
+# jti가 없는 예전 토큰은 만료될 때까지 기존 방식(blacklist + 토큰 전체)의 키로 계속 처리합니다.
+LEGACY_TOKEN_BLACKLIST_PREFIX = "blacklist"
 # 블랙리스트에 등록할 기간입니다. 기본값은 30분($60 \times 30$초)으로 설정되어 있습니다
 DEFAULT_TOKEN_EXPIRY = 60 * 30
 
 REFRESH_TOKEN_PREFIX="refresh:"
 
+# 블랙리스트 키를 워커 메모리에 복사해 둔 블룸 필터. 필터가 "없다"고 하면 Redis를 조회하지 않습니다.
+blacklist_filter = BlacklistFilter(TOKEN_BLACKLIST_PREFIX)
+
 # Redis를 활용한 JWT(또는 Access Token) 블랙리스트 관리 서비스입니다. 보통 사용자가 로그아웃을 하거나, 특정 토큰을 강제로 무효화해야 할 때 보안상의 이유로 사용
 
 
 class TokenService:
+    # 토큰에서 Redis에 저장할 ID를 꺼냅니다.
+    # jti가 있으면 jti를, 없으면(이전 버전에서 발급된 토큰) None을 반환합니다.
+    # verify_token은 검증 결과를 캐시하므로 같은 토큰을 여러 번 확인해도 다시 디코딩하지 않습니다.
+    @staticmethod
+    def get_token_id(token: str):
+        payload = verify_token(token)
+        if payload is None:
+            return None
+        return payload.get("jti")
+
+    @classmethod
+    def _blacklist_key(cls, token: str, token_id: str = None) -> str:
+        if token_id:
+            return f"{TOKEN_BLACKLIST_PREFIX}{token_id}"
+        return f"{LEGACY_TOKEN_BLACKLIST_PREFIX}{token}"
+
+    # refresh 토큰 Set에 넣을 값. jti가 있으면 jti, 없으면 토큰 전체
+    @classmethod
+    def _refresh_member(cls, refresh_token: str) -> str:
+        return cls.get_token_id(refresh_token) or refresh_token
+
     # blacklist_token 메서드 (토큰 무효화) 사용자가 로그아웃을 요청하면 해당 토큰을 Redis에 저장하여 "사용 불가" 상태로 만듭니다.
     #이 메서드는 개별 '객체(인스턴스)'가 아니라, '클래스 그 자체'에 속하는 메서드야"라고 선언하는 것입니다.
     @classmethod
     def blacklist_token(cls, token: str, expires_in: int = DEFAULT_TOKEN_EXPIRY):
-        key = f"{TOKEN_BLACKLIST_PREFIX}{token}"
+        token_id = cls.get_token_id(token)
+        key = cls._blacklist_key(token, token_id)
         # Redis에 'key: "1"' 형태의 데이터를 저장하고 유효기간(ex) 설정
         # 작동 원리: Redis의 SET 명령어를 사용합니다. ex 옵션을 주어 특정 시간이 지나면 Redis에서 자동으로 삭제되게 합니다.
-        redis_client.set(key, "1", ex=expires_in)
+        # 다른 워커의 블룸 필터에도 추가되도록 같은 파이프라인에서 PUBLISH로 알립니다.
+        with redis_client.pipeline() as pipe:
+            pipe.set(key, "1", ex=expires_in)
+            if token_id:
+                pipe.publish(BLACKLIST_CHANNEL, token_id)
+            pipe.execute()
+        if token_id:
+            blacklist_filter.add(token_id)
         return True
 
     # API 요청이 들어올 때마다 해당 토큰이 블랙리스트에 있는지 확인합니다.
     @classmethod
     def is_token_blacklisted(cls, token: str) -> bool:
-        key = f"{TOKEN_BLACKLIST_PREFIX}{token}"
+        token_id = cls.get_token_id(token)
+        key = cls._blacklist_key(token, token_id)
         # 해당 키가 Redis에 존재하는지 확인 (있으면 1, 없으면 0 반환)
         # 작동 원리: EXISTS 명령어를 통해 해당 토큰이 블랙리스트에 등록되어 있는지 체크합니다. 만약 결과가 True라면 서버는 해당 요청을 거부(Unauthorized)해야 합니다.
+        # 블룸 필터가 확실히 없다고 답하면 Redis까지 가지 않습니다. (필터에는 jti만 들어있으므로 예전 토큰은 항상 Redis로 확인)
+        if token_id and not blacklist_filter.might_contain(token_id):
+            return False
         return redis_client.exists(key) == 1
     
     @classmethod
@@ -40,7 +80,8 @@ class TokenService:
         with redis_client.pipeline() as pipe:
             
             #해당 유저의 키(user_key)라는 주머니(Set)에 refresh_token을 집어넣습니다.  한 유저가 여러 기기에서 로그인할 수 있으니 집합 구조를 씁니다.
-            pipe.sadd(user_key,refresh_token)
+            # 토큰 전체 대신 jti만 넣어서 세션 하나당 메모리 사용량을 줄입니다.
+            pipe.sadd(user_key, cls._refresh_member(refresh_token))
             
             #만료 시간 설정 (expire)
             #이 데이터는 며칠 뒤에 자동으로 삭제해라"**라고 유효기간을 초 단위로 설정하는 것입니다.
@@ -63,7 +104,7 @@ class TokenService:
         # 결과값:
         # 주머니 안에 토큰이 있으면? True (인증 성공!)
         # 없으면(만료되었거나, 로그아웃했거나, 가짜 토큰이면)? False (인증 실패!)
-        return redis_client.sismember(user_key, refresh_token)
+        return redis_client.sismember(user_key, cls._refresh_member(refresh_token))
     
     #모든 refresh 토큰 무효화
     @classmethod
@@ -72,10 +113,60 @@ class TokenService:
         user_key = f"{REFRESH_TOKEN_PREFIX}{user_id}"
 
         if refresh_token:
-            redis_client.srem(user_key,refresh_token)
+            redis_client.srem(user_key, cls._refresh_member(refresh_token))
         else:
             redis_client.delete(user_key)
         return True
-    
 
-    
+    # ---- 비동기 버전 ----
+    # async def 요청 처리 코드에서는 아래 메서드를 await로 호출합니다.
+    # 동기 버전과 동작은 같지만 Redis 응답을 기다리는 동안 이벤트 루프(와 쓰레드)를 막지 않습니다.
+    @classmethod
+    async def blacklist_token_async(cls, token: str, expires_in: int = DEFAULT_TOKEN_EXPIRY):
+        token_id = cls.get_token_id(token)
+        key = cls._blacklist_key(token, token_id)
+        async with async_redis_client.pipeline() as pipe:
+            pipe.set(key, "1", ex=expires_in)
+            if token_id:
+                pipe.publish(BLACKLIST_CHANNEL, token_id)
+            await pipe.execute()
+        if token_id:
+            blacklist_filter.add(token_id)
+        return True
+
+    @classmethod
+    async def is_token_blacklisted_async(cls, token: str) -> bool:
+        token_id = cls.get_token_id(token)
+        key = cls._blacklist_key(token, token_id)
+        if token_id and not blacklist_filter.might_contain(token_id):
+            return False
+        return await async_redis_client.exists(key) == 1
+
+    @classmethod
+    async def store_refresh_token_async(cls, user_id: int, refresh_token: str):
+        user_key = f"{REFRESH_TOKEN_PREFIX}{user_id}"
+        expire_seconds = int(timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS + 1).total_seconds())
+
+        async with async_redis_client.pipeline() as pipe:
+            pipe.sadd(user_key, cls._refresh_member(refresh_token))
+            pipe.expire(user_key, expire_seconds)
+            await pipe.execute()
+
+        return True
+
+    @classmethod
+    async def validate_refresh_token_async(cls, user_id: int, refresh_token: str) -> bool:
+        user_key = f"{REFRESH_TOKEN_PREFIX}{user_id}"
+        return bool(
+            await async_redis_client.sismember(user_key, cls._refresh_member(refresh_token))
+        )
+
+    @classmethod
+    async def revoke_refresh_token_async(cls, user_id: int, refresh_token: str = None):
+        user_key = f"{REFRESH_TOKEN_PREFIX}{user_id}"
+
+        if refresh_token:
+            await async_redis_client.srem(user_key, cls._refresh_member(refresh_token))
+        else:
+            await async_redis_client.delete(user_key)
+        return True
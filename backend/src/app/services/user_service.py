@@ -1,38 +1,75 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import select
+import os
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import insert, select
+from app.core.cache import TTLCache
 from app.models.user import User
-from app.utils.security import get_password_hash
+from app.utils.security import password_hasher
 from schemas.user import UserCreate
-from app.database import get_db
+from app.database import get_db, run_write
 from fastapi import Depends
 
+# 인증된 사용자 조회 결과를 담아두는 프로세스 내부 캐시 설정
+# USER_CACHE_TTL_SECONDS: 캐시된 사용자 정보를 믿고 쓰는 시간(초). 이 시간 동안은 DB를 조회하지 않습니다.
+# USER_CACHE_MAXSIZE: 캐시에 담아둘 최대 사용자 수
+USER_CACHE_TTL_SECONDS = float(os.getenv("USER_CACHE_TTL_SECONDS", "30"))
+USER_CACHE_MAXSIZE = int(os.getenv("USER_CACHE_MAXSIZE", "1024"))
+
+# key: (user_id, username) -> 세션에서 분리(expunge)된 User 객체
+# get_current_user에서 채우고, 사용자 정보가 바뀌는 곳에서 invalidate_user_cache로 지웁니다.
+user_cache = TTLCache(maxsize=USER_CACHE_MAXSIZE, ttl=USER_CACHE_TTL_SECONDS)
+
+
+def user_cache_key(user_id: int, username: str):
+    return (user_id, username)
+
+
+# 사용자 정보가 바뀌었을 때(생성/수정/삭제) 캐시에서 지우는 함수
+def invalidate_user_cache(user: User):
+    user_cache.delete(user_cache_key(user.id, user.username))
+
 
 class UserService:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
 
-    def create_user(self, user: UserCreate):
-        hashed_password = get_password_hash(user.password)
-        db_user = User(
-            email=user.email, username=user.username, password=hashed_password
+    async def create_user(self, user: UserCreate):
+        # bcrypt 해싱은 CPU를 오래 쓰므로 별도의 프로세스 풀에서 실행합니다.
+        hashed_password = await password_hasher.hash(user.password)
+        query = (
+            insert(User)
+            .values(email=user.email, username=user.username, password=hashed_password)
+            .returning(User)
         )
 
-        self.db.add(db_user)
-        self.db.commit()
-        self.db.refresh(db_user)
+        # 해싱은 큐 밖에서 끝내고, 쓰기 큐에는 INSERT 한 문장만 넣어서 쓰기 잠금을 짧게 잡습니다.
+        async def job(db: AsyncSession):
+            result = await db.execute(query)
+            return result.scalar_one()
+
+        db_user = await run_write(self.db, job)
+
+        # 같은 (id, username)으로 남아있을 수 있는 예전 캐시 항목을 지웁니다.
+        invalidate_user_cache(db_user)
 
         return db_user
 
-    def get_user_by_email(self, email: str):
+    async def get_user_by_id(self, user_id: int):
+        return await self.db.get(User, user_id)
+
+    async def get_user_by_email(self, email: str):
         query = select(User).where(User.email == email)
 
-        return self.db.execute(query).scalar_one_or_none()
+        result = await self.db.execute(query)
 
-    def get_user_by_username(self, username: str):
+        return result.scalar_one_or_none()
+
+    async def get_user_by_username(self, username: str):
         query = select(User).where(User.username == username)
 
-        return self.db.execute(query).scalar_one_or_none()
+        result = await self.db.execute(query)
+
+        return result.scalar_one_or_none()
 
 
-def get_user_service(db: Session = Depends(get_db)):
+def get_user_service(db: AsyncSession = Depends(get_db)):
     return UserService(db)
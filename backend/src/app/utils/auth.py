@@ -1,17 +1,39 @@
-from datetime import datetime, time, timedelta
+import os
+import secrets
+import time
+from datetime import datetime, timedelta
 from typing import Optional
 from jose import jwt, JWTError
 
+from app.core.cache import TTLCache
+
 SECRET_KEY = "1234567890ABCDEFGHIJKLMNOPQRSTUVWXYZ"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 REFRESH_TOKEN_EXPIRE_DAYS = 7
 
+# 검증이 끝난 토큰의 payload를 담아두는 캐시 크기
+# 같은 토큰으로 반복해서 들어오는 요청은 HMAC 검증과 JSON 디코딩을 다시 하지 않습니다.
+TOKEN_CACHE_MAXSIZE = int(os.getenv("TOKEN_CACHE_MAXSIZE", "4096"))
+
+# key: 토큰의 서명(signature) 부분 -> (서명 대상인 header.payload 부분, 디코딩된 payload)
+# 각 항목은 토큰의 exp까지만 유효하도록 저장합니다.
+token_cache = TTLCache(maxsize=TOKEN_CACHE_MAXSIZE)
+
+# jti(JWT ID): 토큰마다 붙이는 짧은 고유 ID (12바이트 난수 -> 16자 문자열)
+# 블랙리스트/refresh 토큰 저장소에서 토큰 전체 대신 이 값을 키로 사용합니다.
+TOKEN_ID_BYTES = 12
+
 # 쉽게 비유하자면, **인코딩은 '암호화해서 편지 봉투에 담는 것'**이고, **디코딩은 '봉투를 뜯어서 내용을 해석하는 것
 # 인코딩: 데이터를 특정 형식(포맷)으로 변환하는 과정  예시 (JWT):사용자 정보({"id": "user123"})를 jwt.encode를 통해 eyJhbGciOiJIUzI1... 같은 복잡한 문자열로 만드는 것,
 # 디코딩 :인코딩된 데이터를 다시 원래의 상태로 되돌리는 과정입니다.  예시 (JWT):클라이언트가 보낸 복잡한 토큰 문자열을 서버가 비밀키로 풀어서 "아, 이 사람은 user123이구나!"라고 알아내는 것이 jwt.decode입니다.
 
 
+# 토큰에 넣을 새 jti를 만듭니다.
+def new_token_id() -> str:
+    return secrets.token_urlsafe(TOKEN_ID_BYTES)
+
+
 # access토큰을 생성하는 유틸함수
 # optional-> 값이 있을 수도 있고 없을 수도 있다.
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -25,8 +47,8 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     else:
         expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
 
-    # 복사한 데이터에 exp(만료일)라는 약속된 키를 집어넣습니다.
-    to_encode.update({"exp": expire})
+    # 복사한 데이터에 exp(만료일)와 jti(토큰 고유 ID)라는 약속된 키를 집어넣습니다.
+    to_encode.update({"exp": expire, "jti": new_token_id()})
 
     # jwt.encode 함수가 데이터 + 비밀키 + 알고리즘을 섞어서 암호화된 긴 문자열을 만들어냅니다.
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
@@ -43,7 +65,8 @@ def create_refresh_token(data:dict)->str:
     refresh_payload={
         "user_id": user_id,
         "exp":expire,
-        "type":"refresh"
+        "type":"refresh",
+        "jti": new_token_id(),
     }
     
     encoded_jwt=jwt.encode(refresh_payload, SECRET_KEY, algorithm=ALGORITHM)
@@ -51,18 +74,34 @@ def create_refresh_token(data:dict)->str:
 
 
 def verify_token(token: str) -> dict:
+    # JWT는 "header.payload.signature" 형태입니다. 서명 부분을 캐시 키로 사용합니다.
+    signing_input, _, signature = token.rpartition(".")
+
+    cached = token_cache.get(signature)
+    # 서명이 같더라도 header.payload 부분까지 똑같은지 확인해야 다른 내용을 붙인 위조 토큰을 걸러낼 수 있습니다.
+    if cached is not None and cached[0] == signing_input:
+        # exp가 지난 항목은 캐시에서 자동으로 사라지므로, 여기까지 왔다면 아직 유효한 토큰입니다.
+        return dict(cached[1])
+
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
     except JWTError:
         return None
 
+    # 토큰의 남은 만료 시간만큼만 캐시에 보관합니다. (exp가 없는 토큰은 캐시하지 않음)
+    exp = payload.get("exp")
+    if exp:
+        token_cache.set(signature, (signing_input, payload), ttl=exp - time.time())
+
+    return dict(payload)
+
 """
 JWT 토큰의 남은 만료 시간을 초 단위로 계산
 """
 def get_token_expiry(token: str) -> int:
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        # verify_token을 거치면 이미 검증한 토큰은 다시 디코딩하지 않습니다.
+        payload = verify_token(token)
         exp = payload.get("exp")
         
         if exp:
@@ -0,0 +1,71 @@
+import hashlib
+from typing import Optional
+
+from fastapi.responses import Response
+
+# 조건부 GET(ETag / If-None-Match)
+# 응답에 ETag(응답 내용의 버전 표시)를 붙여두면, 클라이언트는 다음 요청 때 If-None-Match 헤더로 그 값을 돌려보냅니다.
+# 값이 같으면 내용이 바뀌지 않은 것이므로 본문 없이 304 Not Modified만 보내서 DB 조회와 직렬화, 전송을 모두 아낍니다.
+# no-cache: 캐시해도 되지만 쓰기 전에 항상 서버에 확인(재검증)하라는 뜻입니다. (no-store와 다름)
+ETAG_CACHE_CONTROL = "no-cache"
+
+
+# 버전을 나타내는 값들로 strong ETag를 만듭니다. (예: "3f2a...")
+def make_etag(*parts) -> str:
+    raw = "|".join(str(part) for part in parts)
+    return '"' + hashlib.blake2b(raw.encode(), digest_size=12).hexdigest() + '"'
+
+
+# If-None-Match 헤더에 etag가 들어있는지 확인합니다.
+# 헤더에는 여러 값이 쉼표로 들어올 수 있고, If-None-Match는 약한 비교(W/ 접두사 무시)를 씁니다. "*"는 모든 값과 일치
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+
+    return False
+
+
+# 게시글 하나의 ETag. 게시글 id와 version으로 만듭니다. (예: "12-3")
+# 조회(GET)에서 받은 이 값을 그대로 수정(PATCH)의 If-Match에 넣으면 동시 수정을 막을 수 있습니다.
+def post_etag(post_id: int, version: int) -> str:
+    return f'"{post_id}-{version}"'
+
+
+# 게시글 수정 요청의 If-Match 헤더에서 기대하는 version 목록을 꺼냅니다.
+# 헤더가 없거나 "*"이면 버전을 확인하지 않는다는 뜻으로 None을 반환합니다.
+# If-Match는 강한 비교를 쓰므로 약한 ETag(W/"...")나 이 게시글의 ETag 모양이 아닌 값은 어떤 버전과도 일치하지 않습니다.
+# (빈 목록이면 수정하지 않고 412)
+def parse_if_match_versions(if_match: Optional[str], post_id: int) -> Optional[list[int]]:
+    if if_match is None:
+        return None
+
+    versions = []
+    prefix = f'"{post_id}-'
+    for candidate in if_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return None
+        if not (candidate.startswith(prefix) and candidate.endswith('"')):
+            continue
+        version = candidate[len(prefix):-1]
+        if version.isdigit():
+            versions.append(int(version))
+
+    return versions
+
+
+def etag_headers(etag: str) -> dict:
+    return {"ETag": etag, "Cache-Control": ETAG_CACHE_CONTROL}
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers=etag_headers(etag))
@@ -0,0 +1,95 @@
+import base64
+import json
+import os
+from datetime import datetime
+from typing import Optional, Tuple
+
+import orjson
+from fastapi.responses import Response
+
+# 한 페이지에 기본으로 내려줄 게시글 수와, 클라이언트가 요청할 수 있는 최대값
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+# 목록 응답 빠른 경로 (FAST_JSON_ENABLED=true로 켭니다. 기본값은 response_model 검증 경로)
+# 목록 API는 DB에서 읽은 Row를 그대로 dict로 바꿔서 orjson으로 바로 직렬화합니다.
+# response_model(PostResponse)을 거치면 게시글마다 Pydantic 모델 생성, 검증, jsonable_encoder 변환을 하는데,
+# DB에서 막 읽은 값은 이미 스키마와 같은 모양이라서 다시 검증할 필요가 없습니다.
+# response_model은 API 문서(/docs)용으로 그대로 둡니다. (Response 객체를 반환하면 FastAPI가 검증을 건너뜁니다)
+FAST_JSON_ENABLED = os.getenv("FAST_JSON_ENABLED", "false").lower() == "true"
+# 빠른 경로의 orjson 옵션. 시간대가 있는 UTC 시각(PostgreSQL)을 Pydantic처럼 "+00:00" 대신 "Z"로 씁니다.
+# 두 경로의 응답이 글자 하나까지 같아야 ETag와 클라이언트 파싱 결과가 설정에 따라 달라지지 않습니다.
+FAST_JSON_OPTIONS = orjson.OPT_UTC_Z
+
+
+# 커서(cursor) 기반 페이지네이션
+# OFFSET 방식은 뒤쪽 페이지로 갈수록 앞의 행을 모두 읽고 버려야 해서 느려집니다.
+# 대신 "마지막으로 본 게시글의 (created_at, id)"를 기억해두고, 그보다 오래된 행만 인덱스를 타고 읽으면
+# 테이블이 아무리 커져도 한 페이지를 읽는 비용이 일정합니다.
+# 클라이언트에게는 내부 구조를 알 수 없도록 base64로 감싼 불투명(opaque) 문자열로 전달합니다.
+def encode_cursor(created_at: datetime, post_id: int) -> str:
+    raw = json.dumps([created_at.isoformat(), post_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+# 잘못된 커서가 들어오면 None을 반환하고, 호출하는 쪽에서 400 에러로 처리합니다.
+def decode_cursor(cursor: str) -> Optional[Tuple[datetime, int]]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, post_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(created_at), int(post_id)
+    except (ValueError, TypeError):
+        return None
+
+
+# 변경분 조회(GET /posts/changes)의 커서. 마지막으로 받은 게시글의 (change_seq, id)
+def encode_change_cursor(change_seq: int, post_id: int) -> str:
+    raw = json.dumps([change_seq, post_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+# 잘못된 커서나 예전 형식(수정 시각 기준) 커서는 None (호출하는 쪽에서 400)
+def decode_change_cursor(cursor: str) -> Optional[Tuple[int, int]]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        change_seq, post_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not (isinstance(change_seq, int) and isinstance(post_id, int)):
+            return None
+        return change_seq, post_id
+    except (ValueError, TypeError):
+        return None
+
+
+# 한 페이지 분량의 게시글로 PostPage 응답을 만듭니다.
+# 다음 페이지가 있을 때만 마지막 게시글 기준으로 커서를 만들어 줍니다.
+def build_page(posts, has_next: bool) -> dict:
+    next_cursor = None
+    if has_next:
+        last_post = posts[-1]
+        next_cursor = encode_cursor(last_post.created_at, last_post.id)
+
+    return {"items": posts, "next_cursor": next_cursor}
+
+
+# 페이지 응답(dict)을 반환할 형태로 바꿉니다.
+# 빠른 경로에서는 items의 Row를 dict로 바꿔서 orjson으로 직렬화한 Response로 감싸고, 아니면 그대로 돌려줘서 response_model로 검증합니다.
+# headers: 빠른 경로에서 응답에 붙일 헤더 (검증 경로에서는 라우트의 Response 파라미터로 따로 붙입니다)
+def page_response(page: dict, headers: Optional[dict] = None):
+    if not FAST_JSON_ENABLED:
+        return page
+
+    content = orjson.dumps({**page, "items": _as_dicts(page["items"])}, option=FAST_JSON_OPTIONS)
+    return Response(content=content, media_type="application/json", headers=headers)
+
+
+# 페이지로 나누지 않은 목록(배열) 응답. page_response와 같은 방식입니다.
+def list_response(items: list, headers: Optional[dict] = None):
+    if not FAST_JSON_ENABLED:
+        return items
+
+    content = orjson.dumps(_as_dicts(items), option=FAST_JSON_OPTIONS)
+    return Response(content=content, media_type="application/json", headers=headers)
+
+
+def _as_dicts(items: list) -> list:
+    return [item if isinstance(item, dict) else item._asdict() for item in items]
@@ -0,0 +1,25 @@
+from passlib.context import CryptContext
+
+# bcrypt 해싱/검증 함수만 모아둔 모듈
+# 프로세스 풀(spawn)의 자식 프로세스는 작업으로 넘긴 함수가 들어있는 모듈만 import합니다.
+# 여기서는 passlib만 import해서 자식 프로세스가 FastAPI/SQLAlchemy까지 불러오지 않고 빨리 뜨게 합니다.
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+# 비밀번호를 암호화해서 저장하기 위한 함수
+# Type Hinting: password: str은 입력값이 문자열임을, -> str은 결과값도 문자열로 반환함을 명시
+def get_password_hash(password: str) -> str:
+    # 입력받은 평문 비밀번호(예: "mysecret123")를 bcrypt 알고리즘을 이용해 알아볼 수 없는 긴 문자열(해시)로 바꿉니다.
+    return pwd_context.hash(password)
+
+
+# 사용자가 로그인할 때 비밀번호가 맞는지 확인(검증)하기 위한 함수
+def verify_password(plain_pasword: str, hashed_Password: str) -> bool:
+    return pwd_context.verify(plain_pasword, hashed_Password)
+
+
+# passlib은 bcrypt를 처음 쓸 때 사용할 백엔드를 찾고 자체 검사를 실행합니다. (수십 ms)
+# 서버 시작 시 미리 실행해서 첫 로그인 요청이 이 시간을 기다리지 않게 합니다.
+def load_backend() -> str:
+    return pwd_context.handler("bcrypt").get_backend()
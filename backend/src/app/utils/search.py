@@ -0,0 +1,88 @@
+import html
+import re
+
+# 게시글 전문 검색(Full-text search) 설정 - SQLite FTS5
+# posts_fts: posts 테이블의 title, content를 역색인(inverted index)으로 들고 있는 FTS5 가상 테이블
+# - content='posts': 본문은 복사하지 않고 posts 테이블을 그대로 참조합니다. (색인만 따로 저장해서 용량 절약)
+# - prefix='2 3': 2~3글자 접두사 색인도 만들어서 "게시*" 같은 접두사 검색을 빠르게 합니다.
+# - 트리거로 posts에 INSERT/UPDATE/DELETE가 일어날 때마다 색인을 함께 고칩니다.
+#   그래서 PostService의 어떤 쓰기 경로(일괄 등록 포함)로 바뀌어도 색인이 어긋나지 않습니다.
+POST_SEARCH_TABLE = "posts_fts"
+
+POST_SEARCH_DDL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {POST_SEARCH_TABLE} USING fts5(
+        title, content, content='posts', content_rowid='id',
+        tokenize='unicode61', prefix='2 3'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS posts_fts_ai AFTER INSERT ON posts BEGIN
+        INSERT INTO {POST_SEARCH_TABLE}(rowid, title, content) VALUES (new.id, new.title, new.content);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS posts_fts_ad AFTER DELETE ON posts BEGIN
+        INSERT INTO {POST_SEARCH_TABLE}({POST_SEARCH_TABLE}, rowid, title, content)
+        VALUES ('delete', old.id, old.title, old.content);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS posts_fts_au AFTER UPDATE OF title, content ON posts BEGIN
+        INSERT INTO {POST_SEARCH_TABLE}({POST_SEARCH_TABLE}, rowid, title, content)
+        VALUES ('delete', old.id, old.title, old.content);
+        INSERT INTO {POST_SEARCH_TABLE}(rowid, title, content) VALUES (new.id, new.title, new.content);
+    END
+    """,
+]
+
+# BM25 점수를 계산할 때 제목에서 일치한 단어를 본문보다 두 배 중요하게 봅니다.
+POST_SEARCH_TITLE_WEIGHT = 2.0
+POST_SEARCH_CONTENT_WEIGHT = 1.0
+
+# snippet()이 일치한 단어 앞뒤에 붙이는 표시. 본문에 나올 일이 없는 제어 문자를 써서
+# HTML 이스케이프를 먼저 하고 나중에 <mark> 태그로 바꿉니다. (게시글 내용이 HTML로 해석되지 않도록)
+SNIPPET_START = "\x02"
+SNIPPET_END = "\x03"
+
+# 검색어에서 단어로 쓸 문자만 남깁니다. (FTS5 문법 문자 " * ( ) : ^ 등은 사용자가 넣어도 무시)
+_TERM_PATTERN = re.compile(r"\w+")
+
+
+# 검색 테이블과 트리거를 만듭니다. (동기 연결에서 실행, migrate.create_tables에서 호출)
+# 처음 만들 때는 이미 저장된 게시글도 검색되도록 posts 테이블 전체로 색인을 채웁니다.
+def create_post_search_index(conn):
+    exists = conn.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+        (POST_SEARCH_TABLE,),
+    ).first()
+
+    for statement in POST_SEARCH_DDL:
+        conn.exec_driver_sql(statement)
+
+    if exists is None:
+        conn.exec_driver_sql(
+            f"INSERT INTO {POST_SEARCH_TABLE}({POST_SEARCH_TABLE}) VALUES ('rebuild')"
+        )
+
+
+# 사용자가 입력한 검색어를 FTS5 MATCH 식으로 바꿉니다.
+# 단어마다 접두사 검색("게시글"*)으로 만들고 모두 AND로 묶습니다.
+# 한국어는 "게시글을", "게시글이"처럼 조사가 붙어서 색인되므로 접두사 검색이어야 "게시글"로 찾을 수 있습니다.
+# 검색할 단어가 하나도 없으면 None
+def build_match_query(q: str):
+    terms = _TERM_PATTERN.findall(q)
+    if not terms:
+        return None
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+# snippet() 결과를 HTML 이스케이프한 뒤 일치한 부분만 <mark>로 감쌉니다.
+def highlight(snippet):
+    if snippet is None:
+        return None
+    return (
+        html.escape(snippet)
+        .replace(SNIPPET_START, "<mark>")
+        .replace(SNIPPET_END, "</mark>")
+    )
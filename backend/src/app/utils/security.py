@@ -1,16 +1,95 @@
-from passlib.context import CryptContext
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
 
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from app.core.metrics import metrics, record_hash
+from app.utils.password import get_password_hash, load_backend, pwd_context, verify_password  # noqa: F401
 
 
-# 비밀번호를 암호화해서 저장하기 위한 함수
-# Type Hinting: password: str은 입력값이 문자열임을, -> str은 결과값도 문자열로 반환함을 명시
-def get_password_hash(password: str) -> str:
-    # 입력받은 평문 비밀번호(예: "mysecret123")를 bcrypt 알고리즘을 이용해 알아볼 수 없는 긴 문자열(해시)로 바꿉니다.
-    return pwd_context.hash(password)
+# bcrypt 해싱 전용 프로세스 풀 설정
+# HASH_POOL_SIZE: 해싱을 수행할 프로세스 수 (기본값: CPU 코어 수). 0이면 프로세스 풀 없이 쓰레드풀에서 실행
+# HASH_QUEUE_LIMIT: 모든 프로세스가 바쁠 때 대기열에 쌓아둘 수 있는 최대 작업 수. 넘치면 503으로 거절
+HASH_POOL_SIZE = int(os.getenv("HASH_POOL_SIZE", os.cpu_count() or 1))
+HASH_QUEUE_LIMIT = int(os.getenv("HASH_QUEUE_LIMIT", "64"))
 
 
-# 사용자가 로그인할 때 비밀번호가 맞는지 확인(검증)하기 위한 함수
-def verify_password(plain_pasword: str, hashed_Password: str) -> bool:
-    return pwd_context.verify(plain_pasword, hashed_Password)
+# bcrypt는 한 번에 수십 ms 동안 CPU를 쓰면서 GIL을 잡고 있기 때문에,
+# 같은 프로세스의 쓰레드풀에서 돌리면 로그인이 몰릴 때 다른 요청까지 함께 느려집니다.
+# 그래서 별도의 프로세스 풀에서 해싱/검증을 수행하고, 결과만 await로 받아옵니다.
+# 코어 수만큼 프로세스를 늘리면 로그인 처리량도 코어 수에 비례해서 늘어납니다.
+class PasswordHasher:
+    def __init__(self, pool_size: int = HASH_POOL_SIZE, queue_limit: int = HASH_QUEUE_LIMIT):
+        self.pool_size = pool_size
+        self.queue_limit = queue_limit
+        self._executor = None
+        # 현재 실행 중이거나 대기 중인 작업 수 (이벤트 루프 하나에서만 바뀌므로 락이 필요 없습니다)
+        self._in_flight = 0
+
+    # 프로세스 풀은 처음 사용할 때 만듭니다.
+    # spawn 방식으로 띄워서 부모 프로세스의 이벤트 루프/쓰레드 상태를 물려받지 않게 합니다.
+    def _get_executor(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.pool_size,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    async def _run(self, operation, func, *args):
+        # 대기열이 가득 차면 더 쌓지 않고 바로 503을 돌려줘서 클라이언트가 잠시 후 다시 시도하게 합니다. (back-pressure)
+        if self._in_flight >= self.pool_size + self.queue_limit:
+            raise HTTPException(
+                status_code=503,
+                detail="요청이 많아 잠시 후 다시 시도해주세요.",
+                headers={"Retry-After": "1"},
+            )
+
+        self._in_flight += 1
+        started = time.perf_counter()
+        try:
+            if self.pool_size <= 0:
+                return await run_in_threadpool(func, *args)
+
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), func, *args)
+        finally:
+            self._in_flight -= 1
+            record_hash(operation, time.perf_counter() - started)
+
+    # 프로세스 풀의 프로세스를 모두 미리 띄우고, 각 프로세스에서 bcrypt 백엔드를 로드해둡니다.
+    # 처음 로그인한 사용자가 프로세스 시작(spawn + import) 시간을 기다리지 않게 서버 시작 시 호출합니다.
+    # 프로세스는 작업이 쌓일 때만 하나씩 늘어나므로 작업을 프로세스 수만큼 한꺼번에 넣습니다.
+    async def warmup(self) -> str:
+        if self.pool_size <= 0:
+            return await run_in_threadpool(load_backend)
+
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        backends = await asyncio.gather(
+            *(loop.run_in_executor(executor, load_backend) for _ in range(self.pool_size))
+        )
+        return backends[0]
+
+    async def hash(self, password: str) -> str:
+        return await self._run("hash", get_password_hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run("verify", verify_password, plain_password, hashed_password)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher()
+
+metrics.gauge(
+    "password_hash_in_flight", "실행 중이거나 대기 중인 비밀번호 해싱/검증 작업 수",
+    lambda: password_hasher._in_flight,
+)
@@ -0,0 +1,28 @@
+"""
+빌드 단계 (컨테이너 이미지를 만들 때 한 번 실행)
+
+워커가 새로 뜰 때마다 반복하던 작업을 미리 해서 파일로 남겨둡니다.
+- 템플릿 컴파일 결과(바이트코드)를 TEMPLATE_CACHE_DIR에 저장
+- OpenAPI 스키마를 OPENAPI_CACHE_PATH에 저장 (워커는 /docs 요청 때 이 파일을 읽기만 함)
+
+실행할 때와 같은 TEMPLATE_CACHE_DIR, OPENAPI_CACHE_PATH를 지정합니다.
+
+    TEMPLATE_CACHE_DIR=/app/.template_cache OPENAPI_CACHE_PATH=/app/openapi.json python build.py
+"""
+import os
+import sys
+
+from app.core.openapi import OPENAPI_CACHE_PATH, write_openapi
+from app.core.templates import TEMPLATE_CACHE_DIR, precompile_templates
+from main import app
+
+
+if __name__ == "__main__":
+    if not TEMPLATE_CACHE_DIR or not OPENAPI_CACHE_PATH:
+        sys.exit("TEMPLATE_CACHE_DIR와 OPENAPI_CACHE_PATH를 지정해주세요.")
+
+    count = precompile_templates()
+    print(f"Templates compiled: {count} -> {TEMPLATE_CACHE_DIR}")
+
+    schema = write_openapi(app, OPENAPI_CACHE_PATH)
+    print(f"OpenAPI schema written: {len(schema['paths'])} paths -> {os.path.abspath(OPENAPI_CACHE_PATH)}")
@@ -1,20 +1,152 @@
 
+import asyncio
+import os
+import signal
+import threading
+from contextlib import asynccontextmanager
+
+import anyio.to_thread
+
 from fastapi import FastAPI,Request
+from sqlalchemy import text
 from app.apis import auth, post, user
-from app.core.redis_config import init_redis
-from app.database import engine, Base
-
-from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
+from app.core.metrics import PROMETHEUS_CONTENT_TYPE, MetricsMiddleware, metrics
+from app.core.openapi import OPENAPI_CACHE_PATH, load_cached_openapi, use_cached_openapi
+from app.core.redis_config import close_redis, init_redis
+from app.core.templates import precompile_templates
+from app.database import ENGINE_PID, engine, pool_status, write_queue
+from app.services.post_events import post_events
+from app.services.token_service import blacklist_filter
+from app.utils.security import password_hasher
+from migrate import init_db
+
+from fastapi.responses import HTMLResponse, PlainTextResponse
 from fastapi.staticfiles import StaticFiles # 정적 파일(CSS/JS) 사용 시 필요
 
 
+# 워커 프로세스 설정
+# DB_AUTO_MIGRATE: 서버 시작 시 마이그레이션(migrate.py)을 실행할지 여부. 개발용 단일 프로세스에서는 켜두고,
+#                  워커를 여러 개 띄울 때는 serve.py가 먼저 한 번만 실행한 뒤 워커에서는 끕니다.
+# THREADPOOL_SIZE: 동기 함수(def 엔드포인트, run_in_threadpool)를 실행하는 쓰레드풀 크기 (워커 프로세스마다)
+DB_AUTO_MIGRATE = os.getenv("DB_AUTO_MIGRATE", "true").lower() == "true"
+THREADPOOL_SIZE = int(os.getenv("THREADPOOL_SIZE", "40"))
+# STARTUP_WARMUP: true면 첫 요청에서 하던 준비 작업을 서버 시작 시 미리 합니다. (템플릿 컴파일, bcrypt 프로세스 풀 시작)
+#                 워커가 요청을 받기 시작하는 시간은 늦추지 않도록 프로세스 풀은 백그라운드에서 띄웁니다.
+#                 기본값은 false로, 워커를 빨리 띄우는 것(콜드 스타트)을 우선합니다.
+STARTUP_WARMUP = os.getenv("STARTUP_WARMUP", "false").lower() == "true"
+
+
+# 서버(uvicorn)가 종료 신호를 받으면 callback을 이벤트 루프에서 실행한 뒤, 원래 처리(서버 종료 시작)를 이어서 합니다.
+# uvicorn은 열려 있는 연결이 모두 끝나야 lifespan 종료를 실행하므로, 스스로 끝나지 않는 응답(SSE)은 여기서 끝내야 합니다.
+# 설치한 처리기를 원래대로 되돌리는 함수를 반환합니다.
+def on_shutdown_signal(callback):
+    # 신호 처리기는 메인 쓰레드에서만 바꿀 수 있습니다.
+    if threading.current_thread() is not threading.main_thread():
+        return lambda: None
+
+    loop = asyncio.get_running_loop()
+    previous_handlers = {}
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        previous = signal.getsignal(sig)
+        if not callable(previous):
+            continue
+
+        def handler(signum, frame, previous=previous):
+            try:
+                loop.call_soon_threadsafe(callback)
+            except RuntimeError:
+                # 이벤트 루프가 이미 닫힌 경우
+                pass
+            previous(signum, frame)
+
+        previous_handlers[sig] = previous
+        signal.signal(sig, handler)
+
+    def restore():
+        for sig, previous in previous_handlers.items():
+            signal.signal(sig, previous)
+
+    return restore
+
+
+# 서버 시작/종료 시 실행할 작업 (deprecated된 @app.on_event 대신 lifespan 사용)
+# yield 이전: 서버가 요청을 받기 전에 실행 / yield 이후: 서버가 종료될 때 실행
+# 워커 프로세스마다 한 번씩 실행되므로, 여기서 만드는 연결/작업은 모두 그 프로세스 전용입니다.
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 부모 프로세스에서 app을 미리 import한 뒤 fork하는 방식(gunicorn --preload 등)이면 부모가 만든 DB 연결을 물려받을 수 있습니다.
+    # 물려받은 연결은 부모의 것이므로 닫지 않고 버리기만 해서(close=False) 이 프로세스는 자신만의 새 연결 풀로 시작합니다.
+    # 같은 프로세스에서 미리 열어둔 연결(시작 전 데이터 준비 등)은 버리면 aiosqlite 쓰레드가 남아 프로세스가 끝나지 않으므로 닫습니다.
+    # (uvicorn --workers는 워커를 spawn으로 띄우므로 어느 쪽도 아니고, 풀이 비어 있어 아무 일도 하지 않습니다.)
+    if os.getpid() != ENGINE_PID:
+        await engine.dispose(close=False)
+    else:
+        await engine.dispose()
+    anyio.to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+
+    if DB_AUTO_MIGRATE:
+        await init_db()
+    # SQLite일 때 쓰기 작업을 묶어서 처리하는 단일 쓰기 큐를 시작합니다.
+    if write_queue is not None:
+        await write_queue.start()
+    await init_redis()
+    # Redis에서 블랙리스트를 읽어 블룸 필터를 만들고, 다른 워커의 추가 알림을 구독합니다.
+    await blacklist_filter.start()
+    # 게시글 변경 알림 채널을 구독해서 이 워커의 SSE 연결들에 나눠줍니다.
+    await post_events.start()
+    restore_signal_handlers = on_shutdown_signal(post_events.close_subscribers)
+
+    # 빌드 때 만든 OpenAPI 스키마 파일이 있으면 읽어둡니다. (없으면 /docs를 처음 요청받을 때 만듭니다)
+    if OPENAPI_CACHE_PATH:
+        load_cached_openapi(app)
+
+    warmup_task = None
+    if STARTUP_WARMUP:
+        precompile_templates()
+        # 첫 로그인이 프로세스 시작을 기다리지 않게 하되, 요청은 풀이 준비되기 전에도 받습니다.
+        warmup_task = asyncio.create_task(password_hasher.warmup())
+
+    yield
+
+    if warmup_task is not None and not warmup_task.done():
+        warmup_task.cancel()
+        await asyncio.wait({warmup_task})
+    restore_signal_handlers()
+    await post_events.stop()
+    await blacklist_filter.stop()
+    await close_redis()
+    # 비밀번호 해싱용 프로세스 풀 정리
+    password_hasher.shutdown()
+    # 큐에 남은 쓰기를 모두 처리한 뒤에 DB 연결을 닫습니다.
+    if write_queue is not None:
+        await write_queue.stop()
+    await engine.dispose()
+
+
 app = FastAPI(
     title="FastApi Ncp Mailing Service",
     description="게시판과 Ncp 메일 발송 기능을 제공하는 서비스입니다.",
     version="1.0.0",
     docs_url="/docs",
     redot_url="/redoc",
+    lifespan=lifespan,
+)
+
+# /docs, /openapi.json의 스키마를 빌드 때 만들어 둔 파일(OPENAPI_CACHE_PATH)에서 읽습니다.
+use_cached_openapi(app)
+
+# 요청마다 처리 시간과 DB/Redis 사용량을 기록하고 Server-Timing 헤더를 붙입니다. (/metrics에서 확인)
+app.add_middleware(MetricsMiddleware)
+
+# 워커의 큐/연결 상태 게이지
+if write_queue is not None:
+    metrics.gauge(
+        "write_queue_pending", "SQLite 쓰기 큐에서 기다리는 작업 수",
+        lambda: write_queue.stats()["queued"],
+    )
+metrics.gauge(
+    "post_stream_subscribers", "열려 있는 게시글 변경 알림(SSE) 연결 수",
+    lambda: post_events.stats()["subscribers"],
 )
 
 
@@ -30,8 +162,13 @@ app.include_router(post.router, prefix="/posts", tags=["post"])
 # app.apis.auth
 app.include_router(auth.router, tags=["auth"])
 
-# Redis 초기화
-init_redis(app)
+
+# Prometheus가 수집하는 메트릭 (텍스트 형식)
+# 요청 처리 시간(라우트별), SQL/Redis 실행 시간과 요청당 실행 횟수, bcrypt 시간, 쓰레드풀/연결 풀 사용량
+# 워커 프로세스마다 따로 집계하므로 워커가 여러 개면 Prometheus에서 합쳐서 봅니다.
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    return PlainTextResponse(metrics.render(), media_type=PROMETHEUS_CONTENT_TYPE)
 
 
 @app.get("/")
@@ -39,20 +176,13 @@ def health_check():
     return {"status": "ok"}
 
 
-# sqlite와 제대로 연결되었는지 확인
+# DB와 제대로 연결되었는지 확인
+# pool: 연결 풀 상태 (checkedin: 쉬고 있는 연결 수, checkedout: 사용 중인 연결 수)
 @app.get("/ping")
 async def ping_db():
     try:
-        with engine.connect() as conn:
-            return {"status": "connected"}
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+        return {"status": "connected", "pool": pool_status()}
     except Exception as e:
-        return {"status": "error", "message": str(e)}
-
-
-# 설계한 DB테이블을 실제로 DB에생성
-# Base.metadata: 앞서 models.py에서 class Post(Base)처럼 Base를 상속받아 만들었던 모든 모델(설계도)의 정보를 수집해 놓은 보관함입니다.
-# create_all: "보관함에 담긴 모든 설계도를 바탕으로 DB에 테이블을 만들어라"라는 명령입니다.
-# bind=engine: "어떤 DB에 만들까?"에 대한 답입니다. engine에는 SQLite나 PostgreSQL 같은 실제 DB 연결 정보가 담겨 있습니다.
-@app.on_event("startup")
-def init_db():
-    Base.metadata.create_all(bind=engine)
+        return {"status": "error", "message": str(e), "pool": pool_status()}
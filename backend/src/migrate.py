@@ -0,0 +1,99 @@
+"""
+DB 스키마 마이그레이션 (한 번만 실행하는 단계)
+
+테이블/컬럼/인덱스/검색 색인을 만들고, 새로 추가된 컬럼에 기존 행의 값을 채웁니다.
+워커가 여러 개일 때 워커마다 서버 시작 시 DDL을 실행하면 SQLite 잠금을 두고 서로 경쟁하므로,
+운영 환경에서는 워커를 띄우기 전에 이 스크립트를 한 번만 실행합니다. (serve.py가 자동으로 실행)
+이미 만들어진 것은 건너뛰므로 여러 번 실행해도 안전합니다.
+
+    python migrate.py
+"""
+import asyncio
+
+from sqlalchemy import inspect
+from sqlalchemy.schema import CreateColumn
+
+from app.database import Base, engine
+from app.utils.search import create_post_search_index
+
+# 모든 모델을 import해서 Base.metadata에 테이블 정보가 등록되게 합니다.
+import app.models.post  # noqa: F401
+import app.models.user  # noqa: F401
+
+
+# 설계한 DB테이블을 실제로 DB에생성
+# Base.metadata: 앞서 models.py에서 class Post(Base)처럼 Base를 상속받아 만들었던 모든 모델(설계도)의 정보를 수집해 놓은 보관함입니다.
+# create_all: "보관함에 담긴 모든 설계도를 바탕으로 DB에 테이블을 만들어라"라는 명령입니다.
+# bind=engine: "어떤 DB에 만들까?"에 대한 답입니다. engine에는 SQLite나 PostgreSQL 같은 실제 DB 연결 정보가 담겨 있습니다.
+# 비동기 엔진에서는 create_all 같은 동기 함수를 conn.run_sync()로 감싸서 실행합니다.
+def create_tables(conn):
+    Base.metadata.create_all(bind=conn)
+
+    # create_all은 이미 존재하는 테이블에 새로 추가된 컬럼도 만들어주지 않으므로 없는 컬럼을 따로 추가합니다.
+    add_missing_columns(conn)
+
+    # create_all은 이미 존재하는 테이블에는 새로 추가된 인덱스를 만들어주지 않습니다.
+    # 기존 sql_app.db에도 인덱스(예: ix_posts_created_at_id)가 생기도록 없는 인덱스만 따로 생성합니다.
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=conn, checkfirst=True)
+
+    # 게시글 변경 순번 카운터 행이 없으면 기존 게시글의 가장 큰 순번에서 시작하게 만듭니다.
+    conn.exec_driver_sql(
+        "INSERT INTO post_change_counter (id, value) "
+        "SELECT 1, (SELECT COALESCE(MAX(change_seq), 0) FROM posts) "
+        "WHERE NOT EXISTS (SELECT 1 FROM post_change_counter)"
+    )
+
+    # 게시글 검색용 FTS5 색인은 SQLite에서만 만듭니다. (다른 DB에서는 검색이 LIKE 조회로 동작)
+    if conn.dialect.name == "sqlite":
+        create_post_search_index(conn)
+
+
+# 기존 행에 채워 넣을 값 (테이블, 컬럼) -> UPDATE 문
+# SQLite의 updated_at은 마이크로초까지 저장하는 포맷("... HH:MM:SS.ffffff")에 맞춰서 채웁니다.
+COLUMN_BACKFILLS = {
+    ("posts", "updated_at"): {
+        "sqlite": "UPDATE posts SET updated_at = created_at || '.000000' WHERE created_at IS NOT NULL",
+        "default": "UPDATE posts SET updated_at = created_at",
+    },
+    # 변경 순번이 없던 기존 게시글은 id 순서로 채웁니다. (카운터는 그 다음 값부터 시작)
+    ("posts", "change_seq"): {
+        "default": "UPDATE posts SET change_seq = id",
+    },
+}
+
+
+# 모델에는 있지만 DB 테이블에는 없는 컬럼을 ALTER TABLE ... ADD COLUMN으로 추가합니다.
+# (예전 sql_app.db에 posts.updated_at, posts.version, posts.change_seq 추가)
+def add_missing_columns(conn):
+    inspector = inspect(conn)
+
+    for table in Base.metadata.sorted_tables:
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+
+        for column in table.columns:
+            if column.name in existing:
+                continue
+
+            column_ddl = CreateColumn(column).compile(dialect=conn.dialect)
+            conn.exec_driver_sql(f"ALTER TABLE {table.name} ADD COLUMN {column_ddl}")
+
+            backfill = COLUMN_BACKFILLS.get((table.name, column.name))
+            if backfill is not None:
+                conn.exec_driver_sql(backfill.get(conn.dialect.name, backfill["default"]))
+
+
+async def init_db():
+    async with engine.begin() as conn:
+        await conn.run_sync(create_tables)
+
+
+async def migrate():
+    await init_db()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(migrate())
+    print("Migration complete")
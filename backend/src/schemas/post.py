@@ -1,6 +1,7 @@
 # 스키마란 쉽게 말해 "데이터가 어떻게 생겨야 하는지 정의한 설계도
 
 from datetime import datetime
+from typing import List
 from pydantic import BaseModel
 
 
@@ -22,9 +23,50 @@ class PostResponse(BaseModel):
     title: str
     content: str
     created_at: datetime
+    # 마지막 수정 시각과 버전 번호. 조회 응답의 ETag("<id>-<version>")를 수정할 때 If-Match 헤더로 보내면 동시 수정을 막을 수 있습니다.
+    updated_at: datetime | None = None
+    version: int
 
     # 이 설정은 Pydantic 모델이 데이터베이스 객체(ORM 모델)를 읽을 수 있게 해주는 스위치입니다.
     # 기본적으로 Pydantic은 dict 형태의 데이터만 읽을 수 있습니다.
     # 하지만 실제 개발 시에는 SQLAlchemy 같은 DB 모델을 결과값으로 받게 되는데, 이 설정이 있어야 post.title 같은 객체 속성 접근 방식을 이해하고 자동으로 JSON 데이터로 변환해 줍니다. (Pydantic V1에서는 orm_mode = True라고 썼던 설정입니다.)
     class Config:
         from_attributes = True
+
+
+# 게시글 일괄 등록 응답 형식
+# 등록한 게시글 전체를 다시 내려주지 않고, 개수와 생성된 id 목록(요청 순서와 같음)만 돌려줍니다.
+class PostBulkResponse(BaseModel):
+    count: int
+    ids: List[int]
+
+
+# 커서 기반 페이지네이션 응답 형식
+# next_cursor를 다음 요청의 cursor 파라미터로 넘기면 이어지는 게시글을 받을 수 있습니다. 마지막 페이지면 None
+class PostPage(BaseModel):
+    items: List[PostResponse]
+    next_cursor: str | None = None
+
+
+# 검색 결과 한 건
+# title_snippet, content_snippet: 검색어와 일치한 부분을 <mark>로 감싼 HTML 조각 (나머지 글자는 이스케이프되어 있음)
+# score: BM25 관련도 점수. 작을수록(더 음수일수록) 검색어와 더 관련 있는 글입니다.
+class PostSearchResult(PostResponse):
+    title_snippet: str | None = None
+    content_snippet: str | None = None
+    score: float | None = None
+
+
+# 검색 결과 페이지. next_offset을 다음 요청의 offset으로 넘기면 이어지는 결과를 받습니다. 마지막 페이지면 None
+class PostSearchPage(BaseModel):
+    items: List[PostSearchResult]
+    next_offset: int | None = None
+
+
+# 변경분 조회(GET /posts/changes) 응답 형식
+# next_cursor: 다음 요청의 cursor로 넘기면 그 뒤의 변경분을 받습니다.
+#              더 받을 게 없어도(has_more=False) 다음 동기화 때 쓸 수 있도록 항상 내려줍니다.
+class PostChangesPage(BaseModel):
+    items: List[PostResponse]
+    next_cursor: str | None = None
+    has_more: bool
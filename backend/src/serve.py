@@ -0,0 +1,72 @@
+"""
+운영용 실행 진입점 (멀티 워커)
+
+1. 마이그레이션(migrate.py)을 이 프로세스에서 한 번만 실행합니다.
+2. uvicorn으로 워커 프로세스를 --workers개 띄웁니다. 워커는 서로 메모리를 공유하지 않고,
+   각 워커의 lifespan에서 DB 엔진/연결 풀, Redis 연결 풀, 쓰기 큐, bcrypt 프로세스 풀, SSE 구독을 따로 만듭니다.
+   그래서 워커 간에 함께 봐야 하는 상태(토큰 블랙리스트, 요청 횟수 제한, 캐시 무효화, 게시글 알림)는 모두 Redis를 거칩니다.
+
+워커 수를 정할 때 주의할 점
+- DB 연결 수: 워커마다 연결 풀이 따로 있으므로 최대 연결 수는 워커 수 x (DB_POOL_SIZE + DB_MAX_OVERFLOW)입니다.
+  PostgreSQL의 max_connections를 넘지 않게 맞춥니다.
+- bcrypt 프로세스 풀: 워커마다 HASH_POOL_SIZE개씩 만들어지므로, 따로 정하지 않으면 코어 수 / 워커 수로 나눠서
+  전체 프로세스 수가 코어 수를 크게 넘지 않게 합니다.
+- SQLite는 쓰기가 파일 하나로 모이므로 워커를 늘려도 쓰기 처리량은 늘지 않습니다. (읽기와 bcrypt만 나눠짐)
+
+    python serve.py
+    python serve.py --workers 4 --port 8000
+    WEB_CONCURRENCY=4 THREADPOOL_SIZE=40 python serve.py
+"""
+import argparse
+import asyncio
+import os
+
+import uvicorn
+
+# 실행 설정 (명령행 인자가 없을 때의 기본값)
+# WEB_CONCURRENCY: 워커 프로세스 수 (기본값: CPU 코어 수)
+# FORWARDED_ALLOW_IPS: X-Forwarded-For/X-Forwarded-Proto를 믿을 프록시 주소 (nginx 등 뒤에서 실행할 때)
+HOST = os.getenv("HOST", "0.0.0.0")
+PORT = int(os.getenv("PORT", "8000"))
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1))
+FORWARDED_ALLOW_IPS = os.getenv("FORWARDED_ALLOW_IPS", "127.0.0.1")
+LOG_LEVEL = os.getenv("LOG_LEVEL", "info")
+# SHUTDOWN_TIMEOUT_SECONDS: 종료 신호를 받은 뒤 처리 중인 요청이 끝나기를 기다리는 최대 시간(초). 지나면 남은 연결을 끊습니다.
+SHUTDOWN_TIMEOUT_SECONDS = float(os.getenv("SHUTDOWN_TIMEOUT_SECONDS", "10"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--workers", type=int, default=WEB_CONCURRENCY, help="워커 프로세스 수")
+    parser.add_argument("--log-level", default=LOG_LEVEL)
+    parser.add_argument("--skip-migrate", action="store_true", help="마이그레이션을 따로 실행한 경우")
+    args = parser.parse_args()
+    workers = max(1, args.workers)
+
+    # 워커 프로세스는 이 프로세스의 환경 변수를 물려받으므로, import 전에 워커용 설정을 정해둡니다.
+    # 마이그레이션은 아래에서 한 번만 실행하므로 워커의 lifespan에서는 건너뜁니다.
+    os.environ["DB_AUTO_MIGRATE"] = "false"
+    os.environ.setdefault("HASH_POOL_SIZE", str(max(1, (os.cpu_count() or 1) // workers)))
+
+    if not args.skip_migrate:
+        from migrate import migrate
+
+        asyncio.run(migrate())
+
+    # app을 여기서 import하지 않고 문자열로 넘겨서, 각 워커가 app을 새로 import하고 자신만의 연결을 만들게 합니다.
+    uvicorn.run(
+        "main:app",
+        host=args.host,
+        port=args.port,
+        workers=workers,
+        log_level=args.log_level,
+        proxy_headers=True,
+        forwarded_allow_ips=FORWARDED_ALLOW_IPS,
+        timeout_graceful_shutdown=SHUTDOWN_TIMEOUT_SECONDS,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+import asyncio
+import os
+import sys
+import tempfile
+
+import httpx
+import pytest
+
+# 테스트에서 src 아래의 app 패키지를 import할 수 있도록 경로를 추가합니다.
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+# app이 import되기 전에 정해야 하는 설정
+# 테스트마다 새 SQLite 파일을 쓰고, 같은 사용자가 짧은 시간에 여러 번 요청하므로 요청 횟수 제한은 끕니다.
+_work_dir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(_work_dir, 'test.db')}"
+os.environ["RATE_LIMIT_ENABLED"] = "false"
+# bcrypt를 프로세스 풀 대신 쓰레드풀에서 실행해서 테스트 중에 자식 프로세스를 띄우지 않습니다.
+os.environ["HASH_POOL_SIZE"] = "0"
+
+
+# Redis 서버 없이 실행할 수 있도록 app의 Redis 클라이언트를 fakeredis로 바꿔 끼웁니다.
+# app 모듈들은 import 시점에 클라이언트를 가져가므로 다른 app 모듈보다 먼저 실행해야 합니다.
+def _use_fake_redis():
+    import fakeredis
+
+    from app.core import redis_config
+
+    server = fakeredis.FakeServer()
+    redis_config.redis_client = fakeredis.FakeRedis(server=server, decode_responses=True)
+    redis_config.async_redis_client = fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+
+
+_use_fake_redis()
+
+
+@pytest.fixture
+def app():
+    from main import app
+
+    return app
+
+
+# app을 lifespan 안에서 실행하고, httpx 클라이언트로 요청을 보내는 body(client)를 실행합니다.
+@pytest.fixture
+def run_with_client(app):
+    async def session(body):
+        from main import lifespan
+
+        async with lifespan(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await body(client)
+
+    return lambda body: asyncio.run(session(body))
+
+
+# 회원가입 후 로그인해서 인증 헤더를 반환합니다.
+@pytest.fixture
+def login():
+    async def login(client, email):
+        await client.post(
+            "/register", json={"email": email, "username": email.split("@")[0], "password": "password1"}
+        )
+        response = await client.post("/login", json={"email": email, "password": "password1"})
+        return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    return login
@@ -0,0 +1,27 @@
+from datetime import datetime, timezone
+
+from app.utils import pagination
+from schemas.post import PostPage
+
+
+# 빠른 경로(orjson)와 response_model 경로(Pydantic)의 JSON이 같아야 합니다.
+# PostgreSQL에서 읽은 시각은 시간대(UTC)가 붙어 있으므로 "Z"로 끝나는지도 함께 확인합니다.
+def test_fast_path_matches_response_model(monkeypatch):
+    created_at = datetime(2026, 1, 2, 3, 4, 5, 678000, tzinfo=timezone.utc)
+    post = {
+        "id": 1,
+        "author_id": 2,
+        "title": "t",
+        "content": "c",
+        "created_at": created_at,
+        "updated_at": created_at,
+        "version": 1,
+    }
+    page = {"items": [post], "next_cursor": None}
+
+    monkeypatch.setattr(pagination, "FAST_JSON_ENABLED", True)
+    fast = pagination.page_response(page).body.decode()
+
+    expected = PostPage.model_validate(page).model_dump_json()
+    assert fast == expected
+    assert '"created_at":"2026-01-02T03:04:05.678000Z"' in fast
@@ -0,0 +1,43 @@
+from sqlalchemy import update
+
+from app.database import SessionLocal
+from app.models.post import Post
+
+
+# 변경분 조회는 commit 순서(change_seq)로 읽어야 합니다.
+# 커서를 받은 뒤에 commit된 변경은, updated_at(문장 실행 시각)이 커서보다 앞서더라도 다음 조회에 나와야 합니다.
+def test_late_commit_is_not_skipped(run_with_client, login):
+    async def body(client):
+        headers = await login(client, "changes@test.com")
+        ids = []
+        for n in range(3):
+            created = await client.post(
+                "/posts/create", json={"title": f"t{n}", "content": "c"}, headers=headers
+            )
+            ids.append(created.json()["id"])
+
+        first = (await client.get("/posts/changes", params={"limit": 2})).json()
+        assert [item["id"] for item in first["items"]] == ids[:2]
+        assert first["has_more"] is True
+        assert "change_seq" not in first["items"][0]
+
+        rest = (await client.get("/posts/changes", params={"cursor": first["next_cursor"]})).json()
+        assert [item["id"] for item in rest["items"]] == ids[2:]
+        cursor = rest["next_cursor"]
+
+        # 먼저 시작했지만 늦게 commit한 수정을 흉내 냅니다. (updated_at이 이미 읽어간 글들보다 앞섬)
+        await client.patch(f"/posts/posts/{ids[0]}", json={"title": "late"}, headers=headers)
+        async with SessionLocal() as db:
+            await db.execute(update(Post).where(Post.id == ids[0]).values(updated_at=Post.created_at))
+            await db.commit()
+
+        late = (await client.get("/posts/changes", params={"cursor": cursor})).json()
+        assert [item["title"] for item in late["items"]] == ["late"]
+        assert late["has_more"] is False
+
+        # 더 바뀐 게 없으면 같은 커서를 돌려받습니다.
+        empty = (await client.get("/posts/changes", params={"cursor": late["next_cursor"]})).json()
+        assert empty["items"] == []
+        assert empty["next_cursor"] == late["next_cursor"]
+
+    run_with_client(body)
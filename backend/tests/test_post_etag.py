@@ -0,0 +1,50 @@
+# 게시글 조회의 ETag를 수정 요청의 If-Match로 그대로 보낼 수 있어야 합니다.
+def test_get_etag_is_accepted_by_if_match(run_with_client, login):
+    async def body(client):
+        headers = await login(client, "etag@test.com")
+        created = await client.post("/posts/create", json={"title": "t", "content": "c"}, headers=headers)
+        post_id = created.json()["id"]
+
+        etag = (await client.get(f"/posts/posts/{post_id}")).headers["ETag"]
+        assert etag == f'"{post_id}-1"'
+
+        updated = await client.patch(
+            f"/posts/posts/{post_id}", json={"title": "t2"}, headers={**headers, "If-Match": etag}
+        )
+        assert updated.status_code == 200
+        assert updated.headers["ETag"] == f'"{post_id}-2"'
+
+        # 예전 ETag로 다시 수정하면 412, 새 ETag는 조건부 GET에서 304
+        stale = await client.patch(
+            f"/posts/posts/{post_id}", json={"title": "t3"}, headers={**headers, "If-Match": etag}
+        )
+        assert stale.status_code == 412
+        cached = await client.get(f"/posts/posts/{post_id}", headers={"If-None-Match": updated.headers["ETag"]})
+        assert cached.status_code == 304
+
+    run_with_client(body)
+
+
+# If-Match는 ETag 목록을 받고 강한 비교를 씁니다. 약한 ETag나 알 수 없는 값은 일치하지 않는 것(412)이고 400이 아닙니다.
+def test_if_match_list_and_weak_tags(run_with_client, login):
+    async def body(client):
+        headers = await login(client, "ifmatch@test.com")
+        created = await client.post("/posts/create", json={"title": "t", "content": "c"}, headers=headers)
+        post_id = created.json()["id"]
+        url = f"/posts/posts/{post_id}"
+
+        for if_match in (f'W/"{post_id}-1"', '"abc"', f'"{post_id + 1}-1"', "garbage"):
+            response = await client.patch(url, json={"title": "x"}, headers={**headers, "If-Match": if_match})
+            assert response.status_code == 412, if_match
+
+        listed = await client.patch(
+            url, json={"title": "y"}, headers={**headers, "If-Match": f'"{post_id}-9", "{post_id}-1"'}
+        )
+        assert listed.status_code == 200
+        assert listed.json()["version"] == 2
+
+        anything = await client.patch(url, json={"title": "z"}, headers={**headers, "If-Match": "*"})
+        assert anything.status_code == 200
+        assert anything.json()["version"] == 3
+
+    run_with_client(body)
@@ -0,0 +1,28 @@
+import pytest
+
+from app.utils import pagination
+
+
+# cursor와 limit이 없으면 예전처럼 전체 목록(배열), 있으면 페이지({items, next_cursor})로 응답합니다.
+@pytest.mark.parametrize("fast_json", [False, True])
+def test_list_keeps_array_without_paging_params(run_with_client, login, monkeypatch, fast_json):
+    monkeypatch.setattr(pagination, "FAST_JSON_ENABLED", fast_json)
+
+    async def body(client):
+        headers = await login(client, f"list-{fast_json}@test.com")
+        for n in range(3):
+            await client.post("/posts/create", json={"title": f"t{n}", "content": "c"}, headers=headers)
+
+        everything = (await client.get("/posts/posts/")).json()
+        assert isinstance(everything, list)
+        assert len(everything) >= 3
+        assert everything[0]["title"] == "t2"
+
+        page = (await client.get("/posts/posts/", params={"limit": 2})).json()
+        assert [item["title"] for item in page["items"]] == ["t2", "t1"]
+        assert page["next_cursor"] is not None
+
+        rest = (await client.get("/posts/posts/", params={"cursor": page["next_cursor"]})).json()
+        assert rest["items"][0]["title"] == "t0"
+
+    run_with_client(body)
@@ -0,0 +1,75 @@
+import asyncio
+
+from sqlalchemy import insert, select, update
+
+from app.core.write_queue import WriteQueue
+from app.database import SessionLocal
+from app.models.post import Post
+from app.models.user import User
+
+
+# 같은 묶음(batch)의 작업들이 같은 게시글을 UPDATE ... RETURNING 해도,
+# 각 작업은 앞 작업이 읽어둔 객체가 아니라 자신이 바꾼 직후의 값을 돌려받아야 합니다.
+def test_batched_jobs_do_not_share_orm_objects(run_with_client, login):
+    async def body(client):
+        await login(client, "queue@test.com")
+        async with SessionLocal() as db:
+            author_id = (await db.execute(select(User.id))).scalars().first()
+            post_id = (await db.execute(
+                insert(Post).values(title="t", content="c", author_id=author_id).returning(Post.id)
+            )).scalar_one()
+            await db.commit()
+
+        def bump(n):
+            async def job(db):
+                result = await db.execute(
+                    update(Post)
+                    .where(Post.id == post_id)
+                    .values(title=f"title-{n}", version=Post.version + 1)
+                    .returning(Post)
+                    .execution_options(synchronize_session=False)
+                )
+                return result.scalar_one()
+
+            return job
+
+        queue = WriteQueue(SessionLocal, max_batch=64)
+        await queue.start()
+        try:
+            # 한꺼번에 넣어서 한 묶음으로 처리되게 합니다.
+            posts = await asyncio.gather(*(queue.submit(bump(n)) for n in range(6)))
+        finally:
+            await queue.stop()
+
+        assert queue.commits < len(posts)
+        assert [(post.title, post.version) for post in posts] == [(f"title-{n}", n + 2) for n in range(6)]
+
+    run_with_client(body)
+
+
+# 동시에 들어온 PATCH들이 쓰기 큐에서 한 묶음으로 처리되어도
+# 응답마다 서로 다른 버전을 돌려받고, 마지막 버전의 응답이 DB의 최종 상태와 같아야 합니다.
+def test_concurrent_patches_return_their_own_state(run_with_client, login):
+    async def body(client):
+        headers = await login(client, "patch@test.com")
+        created = await client.post(
+            "/posts/create", json={"title": "t", "content": "c"}, headers=headers
+        )
+        post_id = created.json()["id"]
+
+        responses = await asyncio.gather(
+            *(
+                client.patch(f"/posts/posts/{post_id}", json={"title": f"title-{n}"}, headers=headers)
+                for n in range(6)
+            )
+        )
+        bodies = [response.json() for response in responses]
+        assert all(response.status_code == 200 for response in responses)
+        assert sorted(body["version"] for body in bodies) == list(range(2, 8))
+
+        latest = max(bodies, key=lambda body: body["version"])
+        current = (await client.get(f"/posts/posts/{post_id}")).json()
+        assert current["version"] == 7
+        assert current["title"] == latest["title"]
+
+    run_with_client(body)